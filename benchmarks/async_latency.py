@@ -0,0 +1,129 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Event-loop latency while many coroutines normalize concurrently.
+
+``--clients`` coroutines normalize the corpus lines while a ticker sleeps
+``--tick`` milliseconds at a time and records how late it wakes up.
+``blocking`` calls ``normalize`` on the loop; the other modes await
+``anormalize`` through ``configure_async``::
+
+    python -m benchmarks.async_latency --language zh --clients 32
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.normalize import load_corpus, load_file
+from tn.cli import LANGUAGES, create_processor, parse_args
+
+# Each mode maps to ``configure_async`` options; ``None`` blocks the loop.
+MODES = {
+    "blocking": None,
+    "thread": {
+        "executor": "thread"
+    },
+    "thread-batch": {
+        "executor": "thread",
+        "batch_window": 0.002
+    },
+    "process": {
+        "executor": "process"
+    },
+}
+
+
+async def run_mode(processor, lines, clients, tick, blocking):
+    lags = []
+    pending = iter(enumerate(lines))
+    outputs = {}
+    finished = False
+
+    async def ticker():
+        while not finished:
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            lags.append(time.perf_counter() - start - tick)
+
+    async def client():
+        for index, line in pending:
+            if blocking:
+                outputs[index] = processor.normalize(line)
+                # A request handler would yield between requests.
+                await asyncio.sleep(0)
+            else:
+                outputs[index] = await processor.anormalize(line)
+
+    ticker_task = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    finished = True
+    await ticker_task
+    return [outputs[index] for index in range(len(lines))], elapsed, sorted(lags)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--direction", choices=("tn", "itn"), default="tn")
+    parser.add_argument("--language", choices=LANGUAGES, nargs="+", default=["zh"])
+    parser.add_argument("--modes", choices=tuple(MODES), nargs="+", default=list(MODES))
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--max_concurrency", "--max-concurrency", type=int, default=None)
+    parser.add_argument("--tick", type=float, default=1.0, help="ticker period in milliseconds")
+    parser.add_argument("--cache_dir", "--cache-dir", default=None)
+    parser.add_argument("--file", default=None)
+    args = parser.parse_args(argv)
+
+    for language in args.language:
+        options = ["--language", language]
+        if args.cache_dir is not None:
+            options += ["--cache-dir", args.cache_dir]
+        processor = create_processor(args.direction, parse_args(args.direction, options))
+        processor.result_cache = None
+        lines = load_corpus(args.direction, language) if args.file is None else load_file(args.file)
+        reference = None
+        for mode in args.modes:
+            executor = None
+            if MODES[mode] is not None:
+                executor = processor.configure_async(max_concurrency=args.max_concurrency, **MODES[mode])
+            try:
+                outputs, seconds, lags = asyncio.run(
+                    run_mode(processor, lines, args.clients, args.tick / 1e3, executor is None))
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+            if reference is None:
+                reference = outputs
+            mismatches = sum(output != expected for output, expected in zip(outputs, reference))
+            print("{}_{} {:<12} {:5d} lines {:8.1f} lines/s  loop lag p50 {:7.2f} ms  p99 {:7.2f} ms  "
+                  "max {:7.2f} ms  mismatches={}".format(
+                      language,
+                      args.direction,
+                      mode,
+                      len(lines),
+                      len(lines) / seconds,
+                      percentile(lags, 0.5) * 1e3,
+                      percentile(lags, 0.99) * 1e3,
+                      lags[-1] * 1e3 if lags else 0.0,
+                      mismatches,
+                  ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-line latency benchmark over the bundled test corpora.
+
+Run from the repository root::
+
+    python -m benchmarks.normalize --language zh en ja --direction tn
+
+``--file PATH`` times the lines of a UTF-8 file instead, e.g. plain prose for
+the passthrough fast path.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from tn.cli import LANGUAGES, create_processor, parse_args
+
+_ROOT = Path(__file__).resolve().parent.parent
+_LANGUAGE_DIRECTORIES = {"zh": "chinese", "en": "english", "ja": "japanese"}
+
+
+def _joint(processor, text):
+    return processor._joint_candidates(text, 1)[0].output
+
+
+# Each mode maps a processor and a non-empty input line to its output. The
+# first mode is the reference; every other mode must reproduce its outputs.
+MODES = {
+    "joint": _joint,
+    "normalize": lambda processor, text: processor.normalize(text),
+}
+
+
+def load_corpus(direction, language):
+    """Returns the written side of every test case for one pipeline."""
+
+    data = _ROOT / direction / _LANGUAGE_DIRECTORIES[language] / "test" / "data"
+    lines = []
+    for path in sorted(data.glob("*.txt")):
+        with open(path, encoding="utf-8") as corpus:
+            for line in corpus:
+                written = line.split("=>", 1)[0].strip()
+                if written:
+                    lines.append(written)
+    return lines
+
+
+def load_file(path):
+    with open(path, encoding="utf-8") as corpus:
+        return [line.rstrip("\r\n") for line in corpus if line.strip()]
+
+
+def time_mode(function, processor, lines, repeat):
+    outputs = [function(processor, line) for line in lines]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            function(processor, line)
+    elapsed = time.perf_counter() - start
+    return outputs, elapsed / (repeat * len(lines))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--direction", choices=("tn", "itn"), default="tn")
+    parser.add_argument("--language", choices=LANGUAGES, nargs="+", default=list(LANGUAGES))
+    parser.add_argument("--modes", choices=tuple(MODES), nargs="+", default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cache_dir", "--cache-dir", default=None)
+    parser.add_argument("--file", default=None)
+    args = parser.parse_args(argv)
+
+    for language in args.language:
+        options = ["--language", language]
+        if args.cache_dir is not None:
+            options += ["--cache-dir", args.cache_dir]
+        processor = create_processor(args.direction, parse_args(args.direction, options))
+        lines = load_corpus(args.direction, language) if args.file is None else load_file(args.file)
+        reference = None
+        baseline = None
+        for mode in args.modes:
+            outputs, seconds = time_mode(MODES[mode], processor, lines, args.repeat)
+            if reference is None:
+                reference, baseline = outputs, seconds
+            mismatches = sum(output != expected for output, expected in zip(outputs, reference))
+            print("{}_{} {:<12} {:5d} lines {:9.1f} us/line  x{:.2f}  mismatches={}".format(
+                language,
+                args.direction,
+                mode,
+                len(lines),
+                seconds * 1e6,
+                baseline / seconds,
+                mismatches,
+            ))
+
+
+if __name__ == "__main__":
+    main()
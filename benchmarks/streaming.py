@@ -0,0 +1,88 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-utterance cost of streaming normalization over simulated partials.
+
+Utterances join ``--lines`` corpus lines and arrive one character at a
+time. ``prefix`` re-normalizes the whole prefix after every partial;
+``stream`` feeds a ``Processor.stream()``. Only pipelines with a token
+alphabet can stream, so English is not offered::
+
+    python -m benchmarks.streaming --direction itn --language zh ja
+"""
+
+import argparse
+import time
+
+from benchmarks.normalize import load_corpus, load_file
+from tn.cli import create_processor, parse_args
+
+
+def _prefix(processor, pieces):
+    prefix = ""
+    output = ""
+    for piece in pieces:
+        prefix += piece
+        output = processor.normalize(prefix)
+    return output
+
+
+def _stream(processor, pieces):
+    stream = processor.stream()
+    outputs = [stream.feed(piece) for piece in pieces]
+    outputs.append(stream.finalize())
+    return "".join(outputs)
+
+
+# The first mode is the reference; mismatches are counted against it.
+MODES = {"prefix": _prefix, "stream": _stream}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--direction", choices=("tn", "itn"), default="itn")
+    parser.add_argument("--language", choices=("zh", "ja"), nargs="+", default=["zh"])
+    parser.add_argument("--lines", type=int, default=8)
+    parser.add_argument("--cache_dir", "--cache-dir", default=None)
+    parser.add_argument("--file", default=None)
+    args = parser.parse_args(argv)
+
+    for language in args.language:
+        options = ["--language", language]
+        if args.cache_dir is not None:
+            options += ["--cache-dir", args.cache_dir]
+        processor = create_processor(args.direction, parse_args(args.direction, options))
+        lines = load_corpus(args.direction, language) if args.file is None else load_file(args.file)
+        utterances = ["，".join(lines[i:i + args.lines]) for i in range(0, len(lines), args.lines)]
+        reference = None
+        baseline = None
+        for mode, function in MODES.items():
+            start = time.perf_counter()
+            outputs = [function(processor, list(utterance)) for utterance in utterances]
+            seconds = (time.perf_counter() - start) / len(utterances)
+            if reference is None:
+                reference, baseline = outputs, seconds
+            mismatches = sum(output != expected for output, expected in zip(outputs, reference))
+            print("{}_{} {:<8} {:5d} utterances {:9.2f} ms/utterance  x{:.2f}  mismatches={}".format(
+                language,
+                args.direction,
+                mode,
+                len(utterances),
+                seconds * 1e3,
+                baseline / seconds,
+                mismatches,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Throughput of one shared processor under threads and worker processes.
+
+``threads`` runs a thread pool over a single processor; ``processes`` uses
+``normalize_batch`` workers. Pynini holds the GIL while searching, so thread
+scaling stays near x1 and CPU scaling comes from processes::
+
+    python -m benchmarks.threads --language zh --workers 1 2 4 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.normalize import load_corpus, load_file
+from tn.cli import LANGUAGES, create_processor, parse_args
+
+
+def _threads(processor, lines, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(processor.normalize, lines))
+
+
+def _processes(processor, lines, workers):
+    return processor.normalize_batch(lines, workers=workers, chunksize=max(1, len(lines) // (4 * workers)))
+
+
+MODES = {"threads": _threads, "processes": _processes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--direction", choices=("tn", "itn"), default="tn")
+    parser.add_argument("--language", choices=LANGUAGES, nargs="+", default=["zh"])
+    parser.add_argument("--modes", choices=tuple(MODES), nargs="+", default=list(MODES))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=4, help="copies of the corpus per run")
+    parser.add_argument("--cache_dir", "--cache-dir", default=None)
+    parser.add_argument("--file", default=None)
+    args = parser.parse_args(argv)
+
+    for language in args.language:
+        options = ["--language", language]
+        if args.cache_dir is not None:
+            options += ["--cache-dir", args.cache_dir]
+        processor = create_processor(args.direction, parse_args(args.direction, options))
+        processor.result_cache = None
+        lines = load_corpus(args.direction, language) if args.file is None else load_file(args.file)
+        lines = lines * args.repeat
+        reference = [processor.normalize(line) for line in lines]
+        for mode in args.modes:
+            baseline = None
+            for workers in args.workers:
+                start = time.perf_counter()
+                outputs = MODES[mode](processor, lines, workers)
+                rate = len(lines) / (time.perf_counter() - start)
+                baseline = rate if baseline is None else baseline
+                mismatches = sum(output != expected for output, expected in zip(outputs, reference))
+                print("{}_{} {:<9} {:3d} workers {:9.1f} lines/s  x{:.2f}  mismatches={}".format(
+                    language,
+                    args.direction,
+                    mode,
+                    workers,
+                    rate,
+                    rate / baseline,
+                    mismatches,
+                ))
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,7 @@ class InverseNormalizer(Processor):
         enable_million=False,
     ):
         super().__init__(name="zh_inverse_normalizer", ordertype="itn", token_orders=TOKEN_ORDERS)
+        self.enable_token_memo()
         self.remove_interjections = remove_interjections
         self.convert_number = enable_standalone_number
         self.enable_0_to_9 = enable_0_to_9
@@ -65,22 +66,23 @@ class InverseNormalizer(Processor):
                 "enable_standalone_number": self.convert_number,
                 "remove_interjections": self.remove_interjections,
             },
+            tagger_options=("enable_0_to_9", "enable_million", "enable_standalone_number"),
         )
 
-    def build_tagger_and_verbalizer(self):
-        cardinal = Cardinal(self.convert_number, self.enable_0_to_9, self.enable_million)
-        char = Char()
-        date = Date()
-        fraction = Fraction(cardinal=cardinal)
-        train_number = TrainNumber()
-        math = Math(cardinal=cardinal)
-        measure = Measure(enable_0_to_9=self.enable_0_to_9, cardinal=cardinal)
-        money = Money(enable_0_to_9=self.enable_0_to_9, cardinal=cardinal)
-        time = Time()
-        license_plate = LicensePlate()
-        whitelist = Whitelist()
+    def build_rules(self):
+        cardinal = self.compile_rule(Cardinal, self.convert_number, self.enable_0_to_9, self.enable_million)
+        char = self.compile_rule(Char)
+        date = self.compile_rule(Date)
+        fraction = self.compile_rule(Fraction, cardinal=cardinal)
+        train_number = self.compile_rule(TrainNumber)
+        math = self.compile_rule(Math, cardinal=cardinal)
+        measure = self.compile_rule(Measure, enable_0_to_9=self.enable_0_to_9, cardinal=cardinal)
+        money = self.compile_rule(Money, enable_0_to_9=self.enable_0_to_9, cardinal=cardinal)
+        time = self.compile_rule(Time)
+        license_plate = self.compile_rule(LicensePlate)
+        whitelist = self.compile_rule(Whitelist)
 
-        rules = (
+        return (
             RuleSpec(date, 1.02),
             RuleSpec(whitelist, 1.01),
             RuleSpec(fraction, 1.05),
@@ -91,14 +93,20 @@ class InverseNormalizer(Processor):
             RuleSpec(math, 1.10),
             RuleSpec(license_plate, 1.0),
             RuleSpec(train_number, 1.0),
-            RuleSpec(char, 100),
+            RuleSpec(char, 100, passthrough=True),
         )
+
+    def build_tagger(self):
+        rules = self.rule_specs()
         tagger = self.tagger_union(rules)
 
         tagger = tagger.star
         self.tagger = tagger @ self.build_rule(delete(" "), "", "[EOS]")
+        self.trigger_alphabet = self.build_trigger_alphabet(rules)
+        self.token_alphabet = self.build_token_alphabet(rules)
 
-        verbalizer = self.verbalizer_union(rules)
-        postprocessor = PostProcessor(remove_interjections=self.remove_interjections).processor
+    def build_verbalizer(self):
+        verbalizer = self.verbalizer_union(self.rule_specs())
+        postprocessor = self.compile_rule(PostProcessor, remove_interjections=self.remove_interjections).processor
 
         self.verbalizer = (verbalizer @ postprocessor).star
@@ -140,6 +140,11 @@ class TestNormalizer:
         assert normalizer.normalize("一点零二") == "1.02"
         assert normalizer.normalize("早上一点零二") == "1:02a.m."
 
+    def test_nbest_ties_resolve_like_the_best_path(self, normalizer):
+        # measure and time tag "两点零二分" with the same weight.
+        assert normalizer._joint_candidates("两点零二分", 1)[0].output == "2:02"
+        assert normalizer.normalize("两点零二分", nbest=3)[0] == normalizer.normalize("两点零二分")
+
     def test_cardinal_raw_field_keeps_minimum_input_weight(self, normalizer):
         cardinal = Cardinal(
             enable_standalone_number=True,
@@ -48,19 +48,19 @@ class InverseNormalizer(Processor):
         self.build_fst("en_itn", cache_dir, overwrite_cache, {})
 
     def build_tagger_and_verbalizer(self):
-        cardinal = Cardinal()
-        ordinal = Ordinal(cardinal=cardinal)
-        decimal = Decimal(cardinal=cardinal)
-        date = Date(cardinal=cardinal, ordinal=ordinal)
-        time = Time(cardinal=cardinal)
-        measure = Measure(cardinal=cardinal, decimal=decimal)
-        money = Money(cardinal=cardinal, decimal=decimal)
-        telephone = Telephone(cardinal=cardinal)
-        electronic = Electronic()
-        whitelist = Whitelist()
-        word = Word()
-        char = Char()
-        punctuation = Punctuation()
+        cardinal = self.compile_rule(Cardinal)
+        ordinal = self.compile_rule(Ordinal, cardinal=cardinal)
+        decimal = self.compile_rule(Decimal, cardinal=cardinal)
+        date = self.compile_rule(Date, cardinal=cardinal, ordinal=ordinal)
+        time = self.compile_rule(Time, cardinal=cardinal)
+        measure = self.compile_rule(Measure, cardinal=cardinal, decimal=decimal)
+        money = self.compile_rule(Money, cardinal=cardinal, decimal=decimal)
+        telephone = self.compile_rule(Telephone, cardinal=cardinal)
+        electronic = self.compile_rule(Electronic)
+        whitelist = self.compile_rule(Whitelist)
+        word = self.compile_rule(Word)
+        char = self.compile_rule(Char)
+        punctuation = self.compile_rule(Punctuation)
 
         rules = (
             RuleSpec(date, 1.09),
@@ -129,3 +129,7 @@ class TestNormalizer:
         assert first.weight == pytest.approx(1.099, abs=1e-5)
         assert second.weight >= 1.1 - 1e-5
         assert normalizer.normalize(spoken) == "1.2.3.4"
+
+    def test_stream_is_rejected_without_a_token_alphabet(self, normalizer):
+        with pytest.raises(ValueError, match="token alphabet"):
+            normalizer.stream()
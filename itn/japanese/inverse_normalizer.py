@@ -50,6 +50,7 @@ class InverseNormalizer(Processor):
         enable_million=False,
     ):
         super().__init__(name="ja_inverse_normalizer", ordertype="itn", token_orders=TOKEN_ORDERS)
+        self.enable_token_memo()
         self.full_to_half = full_to_half
         self.convert_number = enable_standalone_number
         self.enable_0_to_9 = enable_0_to_9
@@ -67,35 +68,38 @@ class InverseNormalizer(Processor):
         )
 
     def build_tagger_and_verbalizer(self):
-        processor = PreProcessor(full_to_half=self.full_to_half).processor
-        cardinal = Cardinal(
+        processor = self.compile_rule(PreProcessor, full_to_half=self.full_to_half).processor
+        cardinal = self.compile_rule(
+            Cardinal,
             self.convert_number,
             self.enable_0_to_9,
             self.enable_million,
             input_processor=processor,
         )
-        cardinal_million = Cardinal(enable_million=True, input_processor=processor)
-        char = Char(input_processor=processor)
-        date = Date(cardinal=cardinal, input_processor=processor)
-        fraction = Fraction(cardinal=cardinal_million, input_processor=processor)
-        math = Math(cardinal=cardinal, input_processor=processor)
-        measure = Measure(
+        cardinal_million = self.compile_rule(Cardinal, enable_million=True, input_processor=processor)
+        char = self.compile_rule(Char, input_processor=processor)
+        date = self.compile_rule(Date, cardinal=cardinal, input_processor=processor)
+        fraction = self.compile_rule(Fraction, cardinal=cardinal_million, input_processor=processor)
+        math = self.compile_rule(Math, cardinal=cardinal, input_processor=processor)
+        measure = self.compile_rule(
+            Measure,
             enable_0_to_9=self.enable_0_to_9,
             cardinal=cardinal,
             input_processor=processor,
         )
-        money = Money(
+        money = self.compile_rule(
+            Money,
             enable_0_to_9=self.enable_0_to_9,
             cardinal=cardinal,
             input_processor=processor,
         )
-        ordinal = Ordinal(cardinal=cardinal, input_processor=processor)
-        time = Time(input_processor=processor)
-        whitelist = Whitelist(input_processor=processor)
+        ordinal = self.compile_rule(Ordinal, cardinal=cardinal, input_processor=processor)
+        time = self.compile_rule(Time, input_processor=processor)
+        whitelist = self.compile_rule(Whitelist, input_processor=processor)
 
         rules = (
             RuleSpec(cardinal, 1.06),
-            RuleSpec(char, 100),
+            RuleSpec(char, 100, passthrough=True),
             RuleSpec(date, 1.02),
             RuleSpec(fraction, 1.05),
             RuleSpec(math, 90),
@@ -107,5 +111,7 @@ class InverseNormalizer(Processor):
         )
         tagger = self.tagger_union(rules).star
         self.tagger = tagger @ self.build_rule(delete(" "), "", "[EOS]")
+        self.trigger_alphabet = self.build_trigger_alphabet(rules)
+        self.token_alphabet = self.build_token_alphabet(rules)
 
         self.verbalizer = self.verbalizer_union(rules).star
@@ -15,6 +15,7 @@
 
 from pathlib import Path
 
+from tn.rule_cache import record_data_file
 from tn.utils import augment_labels_with_punct_at_end, get_formats, load_labels, str2bool
 
 _PACKAGE_ROOT = Path(__file__).resolve().parent
@@ -28,6 +29,7 @@ def get_abs_path(rel_path):
         path.relative_to(_PACKAGE_ROOT)
     except ValueError as error:
         raise ValueError("ITN resource path escapes the package: {!r}".format(rel_path)) from error
+    record_data_file(path)
     return str(path)
 
 
@@ -52,7 +52,8 @@ class MainActivity : ComponentActivity() {
     companion object {
         private const val LOG_TAG = "WETEXTPROCESSING"
         private val resource = listOf(
-            "zh_tn_tagger.fst", "zh_tn_verbalizer.fst", "zh_itn_tagger.fst", "zh_itn_verbalizer.fst"
+            "zh_tn_tagger.fst", "zh_tn_verbalizer.fst", "zh_tn_token_orders.tsv",
+            "zh_itn_tagger.fst", "zh_itn_verbalizer.fst", "zh_itn_token_orders.tsv"
         )
 
         // Unzip the FST models bundled in assets into the app's files dir on first run.
@@ -14,6 +14,7 @@
 
 #include <fstream>
 #include <iostream>
+#include <memory>
 #include <string>
 
 #include "processor/wetext_processor.h"
@@ -26,6 +27,9 @@ DEFINE_string(text, "", "input string");
 DEFINE_string(file, "", "input file");
 DEFINE_string(tagger, "", "tagger fst path");
 DEFINE_string(verbalizer, "", "verbalizer fst path");
+DEFINE_string(token_orders, "",
+              "token orders path (default: *_token_orders.tsv next to the "
+              "tagger)");
 
 int main(int argc, char* argv[]) {
   gflags::ParseCommandLineFlags(&argc, &argv, false);
@@ -34,12 +38,18 @@ int main(int argc, char* argv[]) {
   if (FLAGS_tagger.empty() || FLAGS_verbalizer.empty()) {
     LOG(FATAL) << "Please provide the tagger and verbalizer fst files.";
   }
-  wetext::Processor processor(FLAGS_tagger, FLAGS_verbalizer);
+  std::unique_ptr<wetext::Processor> processor;
+  if (FLAGS_token_orders.empty()) {
+    processor.reset(new wetext::Processor(FLAGS_tagger, FLAGS_verbalizer));
+  } else {
+    processor.reset(new wetext::Processor(FLAGS_tagger, FLAGS_verbalizer,
+                                          FLAGS_token_orders));
+  }
 
   if (!FLAGS_text.empty()) {
-    std::string tagged_text = processor.Tag(FLAGS_text);
+    std::string tagged_text = processor->Tag(FLAGS_text);
     std::cout << tagged_text << std::endl;
-    std::string normalized_text = processor.Verbalize(tagged_text);
+    std::string normalized_text = processor->Verbalize(tagged_text);
     std::cout << normalized_text << std::endl;
   }
 
@@ -47,9 +57,9 @@ int main(int argc, char* argv[]) {
     std::ifstream file(FLAGS_file);
     std::string line;
     while (getline(file, line)) {
-      std::string tagged_text = processor.Tag(line);
+      std::string tagged_text = processor->Tag(line);
       std::cout << tagged_text << std::endl;
-      std::string normalized_text = processor.Verbalize(tagged_text);
+      std::string normalized_text = processor->Verbalize(tagged_text);
       std::cout << normalized_text << std::endl;
     }
   }
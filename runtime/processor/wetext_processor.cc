@@ -14,32 +14,71 @@
 
 #include "processor/wetext_processor.h"
 
+#include <fstream>
+
 #include "utils/wetext_log.h"
 
 namespace wetext {
-Processor::Processor(const std::string& tagger_path,
-                     const std::string& verbalizer_path) {
-  tagger_.reset(StdVectorFst::Read(tagger_path));
-  verbalizer_.reset(StdVectorFst::Read(verbalizer_path));
-  compiler_ = std::make_shared<StringCompiler<StdArc>>();
-  printer_ = std::make_shared<StringPrinter<StdArc>>();
+namespace {
+const char TAGGER_SUFFIX[] = "tagger.fst";
+const char TOKEN_ORDERS_SUFFIX[] = "token_orders.tsv";
 
+// Graphs exported before token-order schemas existed are recognized by the
+// pipeline prefix in their file name.
+ParseType GuessParseType(const std::string& tagger_path) {
   if (tagger_path.find("zh_tn_") != tagger_path.npos) {
-    parse_type_ = ParseType::kZH_TN;
+    return ParseType::kZH_TN;
   } else if (tagger_path.find("zh_itn_") != tagger_path.npos) {
-    parse_type_ = ParseType::kZH_ITN;
+    return ParseType::kZH_ITN;
   } else if (tagger_path.find("en_tn_") != tagger_path.npos) {
-    parse_type_ = ParseType::kEN_TN;
+    return ParseType::kEN_TN;
   } else if (tagger_path.find("en_itn_") != tagger_path.npos) {
-    parse_type_ = ParseType::kEN_ITN;
+    return ParseType::kEN_ITN;
   } else if (tagger_path.find("ja_tn_") != tagger_path.npos) {
-    parse_type_ = ParseType::kJA_TN;
+    return ParseType::kJA_TN;
   } else if (tagger_path.find("ja_itn_") != tagger_path.npos) {
-    parse_type_ = ParseType::kJA_ITN;
-  } else {
-    LOG(FATAL) << "Invalid fst prefix, prefix should contain"
-               << " either \"_tn_\" or \"_itn_\".";
+    return ParseType::kJA_ITN;
   }
+  LOG(FATAL) << "Invalid fst prefix, prefix should contain"
+             << " either \"_tn_\" or \"_itn_\".";
+  return ParseType::kZH_TN;
+}
+}  // namespace
+
+Processor::Processor(const std::string& tagger_path,
+                     const std::string& verbalizer_path) {
+  Load(tagger_path, verbalizer_path);
+
+  const std::string suffix = TAGGER_SUFFIX;
+  if (tagger_path.size() >= suffix.size() &&
+      tagger_path.compare(tagger_path.size() - suffix.size(), suffix.size(),
+                          suffix) == 0) {
+    std::string token_orders_path =
+        tagger_path.substr(0, tagger_path.size() - suffix.size()) +
+        TOKEN_ORDERS_SUFFIX;
+    if (std::ifstream(token_orders_path).good()) {
+      orders_ = ReadTokenOrders(token_orders_path);
+      return;
+    }
+  }
+  orders_ = TokenOrders(GuessParseType(tagger_path));
+}
+
+Processor::Processor(const std::string& tagger_path,
+                     const std::string& verbalizer_path,
+                     const std::string& token_orders_path) {
+  Load(tagger_path, verbalizer_path);
+  orders_ = ReadTokenOrders(token_orders_path);
+}
+
+void Processor::Load(const std::string& tagger_path,
+                     const std::string& verbalizer_path) {
+  // Python exports const, input-label sorted graphs; StdFst::Read accepts
+  // them as well as older vector graphs.
+  tagger_.reset(StdFst::Read(tagger_path));
+  verbalizer_.reset(StdFst::Read(verbalizer_path));
+  compiler_ = std::make_shared<StringCompiler<StdArc>>();
+  printer_ = std::make_shared<StringPrinter<StdArc>>();
 }
 
 std::string Processor::ShortestPath(const StdVectorFst& lattice) {
@@ -51,8 +90,7 @@ std::string Processor::ShortestPath(const StdVectorFst& lattice) {
   return output;
 }
 
-std::string Processor::Compose(const std::string& input,
-                               const StdVectorFst* fst) {
+std::string Processor::Compose(const std::string& input, const StdFst* fst) {
   StdVectorFst input_fst;
   compiler_->operator()(input, &input_fst);
 
@@ -72,7 +110,7 @@ std::string Processor::Verbalize(const std::string& input) {
   if (input.empty()) {
     return "";
   }
-  TokenParser parser(parse_type_);
+  TokenParser parser(orders_);
   std::string output = parser.Reorder(input);
 
   output = Compose(output, verbalizer_.get());
@@ -17,12 +17,15 @@
 
 #include <memory>
 #include <string>
+#include <unordered_map>
+#include <vector>
 
 #include "fst/fstlib.h"
 
 #include "processor/wetext_token_parser.h"
 
 using fst::StdArc;
+using fst::StdFst;
 using fst::StdVectorFst;
 using fst::StringCompiler;
 using fst::StringPrinter;
@@ -30,18 +33,24 @@ using fst::StringPrinter;
 namespace wetext {
 class Processor {
  public:
+  // Reads the token orders from "<prefix>_token_orders.tsv" next to a
+  // "<prefix>_tagger.fst", as written by `wetn cache export-runtime`, and
+  // falls back to guessing them from the tagger file name.
   Processor(const std::string& tagger_path, const std::string& verbalizer_path);
+  Processor(const std::string& tagger_path, const std::string& verbalizer_path,
+            const std::string& token_orders_path);
   std::string Tag(const std::string& input);
   std::string Verbalize(const std::string& input);
   std::string Normalize(const std::string& input);
 
  private:
+  void Load(const std::string& tagger_path, const std::string& verbalizer_path);
   std::string ShortestPath(const StdVectorFst& lattice);
-  std::string Compose(const std::string& input, const StdVectorFst* fst);
+  std::string Compose(const std::string& input, const StdFst* fst);
 
-  ParseType parse_type_;
-  std::shared_ptr<StdVectorFst> tagger_ = nullptr;
-  std::shared_ptr<StdVectorFst> verbalizer_ = nullptr;
+  std::unordered_map<std::string, std::vector<std::string>> orders_;
+  std::shared_ptr<StdFst> tagger_ = nullptr;
+  std::shared_ptr<StdFst> verbalizer_ = nullptr;
   std::shared_ptr<StringCompiler<StdArc>> compiler_ = nullptr;
   std::shared_ptr<StringPrinter<StdArc>> printer_ = nullptr;
 };
@@ -14,6 +14,7 @@
 
 #include "processor/wetext_token_parser.h"
 
+#include <fstream>
 #include <stdexcept>
 
 #include "utils/wetext_log.h"
@@ -49,21 +50,58 @@ const std::unordered_map<std::string, std::vector<std::string>> ITN_ORDERS = {
     {"telephone", {"country_code", "number_part"}},
     {"electronic", {"username", "domain", "protocol"}}};
 
-TokenParser::TokenParser(ParseType type) {
+const std::unordered_map<std::string, std::vector<std::string>>& TokenOrders(
+    ParseType type) {
   if (type == ParseType::kZH_TN) {
-    orders_ = ZH_TN_ORDERS;
+    return ZH_TN_ORDERS;
   } else if (type == ParseType::kZH_ITN || type == ParseType::kEN_ITN ||
              type == ParseType::kJA_ITN) {
-    orders_ = ITN_ORDERS;
+    return ITN_ORDERS;
   } else if (type == ParseType::kEN_TN) {
-    orders_ = EN_TN_ORDERS;
+    return EN_TN_ORDERS;
   } else if (type == ParseType::kJA_TN) {
-    orders_ = JA_TN_ORDERS;
-  } else {
-    LOG(FATAL) << "Invalid order";
+    return JA_TN_ORDERS;
   }
+  LOG(FATAL) << "Invalid order";
+  return ITN_ORDERS;
 }
 
+std::unordered_map<std::string, std::vector<std::string>> ReadTokenOrders(
+    const std::string& path) {
+  std::ifstream file(path);
+  if (!file.is_open()) {
+    LOG(FATAL) << "Failed to open token orders: " << path;
+  }
+
+  std::unordered_map<std::string, std::vector<std::string>> orders;
+  std::string line;
+  while (getline(file, line)) {
+    if (!line.empty() && line.back() == '\r') {
+      line.pop_back();
+    }
+    if (line.empty()) {
+      continue;
+    }
+    std::vector<std::string> fields;
+    Split(line, "\t", &fields);
+    for (const auto& field : fields) {
+      if (field.empty()) {
+        LOG(FATAL) << "Invalid token orders line in " << path << ": " << line;
+      }
+    }
+    std::string name = fields[0];
+    fields.erase(fields.begin());
+    orders[name] = fields;
+  }
+  return orders;
+}
+
+TokenParser::TokenParser(ParseType type) : orders_(TokenOrders(type)) {}
+
+TokenParser::TokenParser(
+    const std::unordered_map<std::string, std::vector<std::string>>& orders)
+    : orders_(orders) {}
+
 void TokenParser::Load(const std::string& input) {
   wetext::SplitUTF8StringToChars(input, &text_);
   if (text_.empty()) {
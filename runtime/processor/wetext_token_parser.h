@@ -15,6 +15,7 @@
 #ifndef PROCESSOR_WETEXT_TOKEN_PARSER_H_
 #define PROCESSOR_WETEXT_TOKEN_PARSER_H_
 
+#include <algorithm>
 #include <set>
 #include <string>
 #include <unordered_map>
@@ -49,7 +50,15 @@ struct Token {
     std::string output = name + " {";
     if (orders.count(name) > 0 && (members.count("preserve_order") == 0 ||
                                    members.at("preserve_order") != "true")) {
-      order = orders.at(name);
+      // Fields outside the schema follow it in their parsed order.
+      std::vector<std::string> canonical = orders.at(name);
+      for (const auto& key : order) {
+        if (std::find(canonical.begin(), canonical.end(), key) ==
+            canonical.end()) {
+          canonical.emplace_back(key);
+        }
+      }
+      order = canonical;
     }
 
     for (const auto& key : order) {
@@ -71,9 +80,21 @@ enum ParseType {
   kJA_ITN = 0x05   // Japanese Inverse Text Normalization
 };
 
+// Returns the built-in token orders of the pipelines named by `type`.
+const std::unordered_map<std::string, std::vector<std::string>>& TokenOrders(
+    ParseType type);
+
+// Reads a token-order schema written by `wetn cache export-runtime`. Each
+// line names a token followed by its fields in verbalization order, all
+// separated by tabs.
+std::unordered_map<std::string, std::vector<std::string>> ReadTokenOrders(
+    const std::string& path);
+
 class TokenParser {
  public:
   explicit TokenParser(ParseType type);
+  explicit TokenParser(
+      const std::unordered_map<std::string, std::vector<std::string>>& orders);
   std::string Reorder(const std::string& input);
 
  private:
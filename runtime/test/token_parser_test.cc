@@ -12,6 +12,7 @@
 // See the License for the specific language governing permissions and
 // limitations under the License.
 
+#include <fstream>
 #include <string>
 #include <vector>
 
@@ -120,3 +121,15 @@ TEST(TokenParserSchemaTest, ItnPreserveOrder) {
       "date { day: \"1\" month: \"2\" preserve_order: \"true\" }";
   ASSERT_EQ(parser.Reorder(input), input);
 }
+
+TEST(TokenParserSchemaTest, ExportedTokenOrders) {
+  std::string path = testing::TempDir() + "zh_tn_token_orders.tsv";
+  std::ofstream(path) << "time\thour\tminute\n"
+                      << "money\tvalue\tcurrency\n";
+  wetext::TokenParser parser(wetext::ReadTokenOrders(path));
+  std::string input =
+      "time { second: \"三秒\" minute: \"零二分\" hour: \"两点\" }";
+  std::string expected =
+      "time { hour: \"两点\" minute: \"零二分\" second: \"三秒\" }";
+  ASSERT_EQ(parser.Reorder(input), expected);
+}
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, Sequence, Tuple
 
 from pynini import accep, escape, shortestpath
 
@@ -95,6 +95,12 @@ def _character_spans_to_byte_spans(text, character_to_byte, spans, reject_empty=
     return tuple(normalized)
 
 
+def path_arcs(path):
+    """Returns the ``(ilabel, olabel)`` pairs of a linear shortest path."""
+
+    return tuple((arc.ilabel, arc.olabel) for arc in _linear_arcs(path))
+
+
 def _linear_arcs(path):
     state = path.start()
     if state == -1:
@@ -114,11 +120,22 @@ def _linear_arcs(path):
     raise AlignmentError("shortest WFST path contains a cycle")
 
 
-def trace_input_spans(input_text: str, output_text: str, fst, output_spans: Iterable[Tuple[int, int]]):
-    """Maps output character spans to input spans on one exact WFST path."""
+def trace_input_spans(
+    input_text: str,
+    output_text: str,
+    fst,
+    output_spans: Iterable[Tuple[int, int]],
+    arcs: Sequence[Tuple[int, int]] = None,
+):
+    """Maps output character spans to input spans on one exact WFST path.
 
-    lattice = accep(escape(input_text)) @ fst @ accep(escape(output_text))
-    path = shortestpath(lattice, nshortest=1, unique=True)
+    ``arcs`` may supply the ``path_arcs()`` of that path when the caller
+    already found it, which avoids composing the input and output again.
+    """
+
+    if arcs is None:
+        lattice = accep(escape(input_text)) @ fst @ accep(escape(output_text))
+        arcs = path_arcs(shortestpath(lattice, nshortest=1, unique=True))
     input_character_to_byte, input_byte_to_character, input_byte_is_whitespace = _text_boundaries(input_text)
     output_character_to_byte, _, _ = _text_boundaries(output_text)
     output_byte_spans = _character_spans_to_byte_spans(output_text, output_character_to_byte, output_spans)
@@ -128,26 +145,26 @@ def trace_input_spans(input_text: str, output_text: str, fst, output_spans: Iter
     output_offset = 0
     token_index = 0
 
-    for arc in _linear_arcs(path):
-        next_input_offset = input_offset + (1 if arc.ilabel else 0)
+    for ilabel, olabel in arcs:
+        next_input_offset = input_offset + (1 if ilabel else 0)
         while token_index < len(output_byte_spans) and output_offset >= output_byte_spans[token_index][1]:
             token_index += 1
         owner = None
         if token_index < len(output_byte_spans):
             start, end = output_byte_spans[token_index]
-            if arc.ilabel and start <= output_offset < end and (output_offset != start or arc.olabel):
-                is_deleted_leading_space = (not arc.olabel and input_byte_is_whitespace[input_offset]
+            if ilabel and start <= output_offset < end and (output_offset != start or olabel):
+                is_deleted_leading_space = (not olabel and input_byte_is_whitespace[input_offset]
                                             and consumed_starts[token_index] is None)
                 if not is_deleted_leading_space:
                     owner = token_index
-            elif (arc.ilabel and arc.olabel and output_offset + 1 == start and not input_byte_is_whitespace[input_offset]):
+            elif (ilabel and olabel and output_offset + 1 == start and not input_byte_is_whitespace[input_offset]):
                 owner = token_index
         if owner is not None:
             if consumed_starts[owner] is None:
                 consumed_starts[owner] = input_offset
             consumed_ends[owner] = next_input_offset
         input_offset = next_input_offset
-        output_offset += 1 if arc.olabel else 0
+        output_offset += 1 if olabel else 0
 
     spans = []
     for start, end in zip(consumed_starts, consumed_ends):
@@ -165,6 +182,7 @@ def transduce_with_spans(
         fst,
         input_spans: Iterable[Tuple[int, int]] = (),
         output_text: str = None,
+        arcs: Sequence[Tuple[int, int]] = None,
 ):
     """Runs one exact WFST path and maps input token spans to its output.
 
@@ -174,7 +192,8 @@ def transduce_with_spans(
     preceding token. A fully deleted token gets a zero-width span after all
     output already emitted at its starting boundary. When ``output_text`` is
     provided, the traced path is constrained to that selected output instead
-    of silently falling back to the shortest output.
+    of silently falling back to the shortest output. ``arcs`` may supply the
+    ``path_arcs()`` of an already selected path instead.
     """
 
     character_spans = tuple(input_spans)
@@ -185,13 +204,17 @@ def transduce_with_spans(
         character_spans,
         reject_empty=True,
     )
-    lattice = accep(escape(input_text)) @ fst
-    if output_text is not None:
-        lattice @= accep(escape(output_text))
-    path = shortestpath(lattice, nshortest=1, unique=True)
-    if path.start() == -1:
-        raise AlignmentError("no WFST path for the requested input")
-    selected_output = path.string()
+    if arcs is None:
+        lattice = accep(escape(input_text)) @ fst
+        if output_text is not None:
+            lattice @= accep(escape(output_text))
+        path = shortestpath(lattice, nshortest=1, unique=True)
+        if path.start() == -1:
+            raise AlignmentError("no WFST path for the requested input")
+        selected_output = path.string()
+        arcs = path_arcs(path)
+    else:
+        selected_output = bytes(olabel for _, olabel in arcs if olabel).decode("utf-8")
     output_character_to_byte, output_byte_to_character, output_byte_is_whitespace = _text_boundaries(selected_output)
     emitted_starts = [None] * len(input_byte_spans)
     emitted_ends = [None] * len(input_byte_spans)
@@ -200,12 +223,12 @@ def transduce_with_spans(
     output_offset = 0
     token_index = 0
 
-    for arc in _linear_arcs(path):
+    for ilabel, olabel in arcs:
         boundary_offsets[input_offset] = output_offset
         while token_index < len(input_byte_spans) and input_offset >= input_byte_spans[token_index][1]:
             token_index += 1
         owner = None
-        if arc.ilabel:
+        if ilabel:
             if token_index < len(input_byte_spans):
                 start, end = input_byte_spans[token_index]
                 if start <= input_offset < end:
@@ -215,17 +238,17 @@ def transduce_with_spans(
                 start, end = input_byte_spans[token_index]
                 if start < input_offset < end or (token_index == 0 and input_offset == start):
                     owner = token_index
-            is_boundary_whitespace = arc.olabel and output_byte_is_whitespace[output_offset]
-            if owner is None and arc.olabel and not is_boundary_whitespace:
+            is_boundary_whitespace = olabel and output_byte_is_whitespace[output_offset]
+            if owner is None and olabel and not is_boundary_whitespace:
                 previous_index = token_index - 1
                 if previous_index >= 0 and input_byte_spans[previous_index][1] <= input_offset:
                     owner = previous_index
-        if arc.olabel and owner is not None:
+        if olabel and owner is not None:
             if emitted_starts[owner] is None:
                 emitted_starts[owner] = output_offset
             emitted_ends[owner] = output_offset + 1
-        input_offset += 1 if arc.ilabel else 0
-        output_offset += 1 if arc.olabel else 0
+        input_offset += 1 if ilabel else 0
+        output_offset += 1 if olabel else 0
 
     boundary_offsets[input_offset] = output_offset
     expected_input_bytes = input_character_to_byte[-1]
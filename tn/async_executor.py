@@ -0,0 +1,183 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Runs processor calls off the asyncio event loop."""
+
+import asyncio
+import os
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+
+def _call_each(function, texts):
+    """Runs one micro-batch, keeping each text's error to itself."""
+
+    results = []
+    for text in texts:
+        try:
+            results.append((True, function(text)))
+        except Exception as error:
+            results.append((False, error))
+    return results
+
+
+def _release_soon(loop, semaphore, _future):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # The loop is already closed; nothing waits on the semaphore.
+        pass
+
+
+class _LoopState:
+
+    def __init__(self, max_concurrency):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.batches = {}
+        self.tasks = set()
+
+
+class AsyncExecutor:
+    """Runs ``Processor`` calls in an executor with bounded concurrency.
+
+    ``executor`` is ``"thread"``, ``"process"`` or a caller-owned
+    ``concurrent.futures.Executor``. Threads share the processor and its
+    graphs; each worker process loads the published bundle once. Caller-owned
+    executors receive bound methods, so prefer ``"process"`` over passing a
+    process pool.
+
+    At most ``max_concurrency`` jobs (default: one per CPU) are in the
+    executor at a time; further calls wait on the event loop instead of
+    queuing work. With ``batch_window`` seconds, concurrent calls with the
+    same options are collected for that long, up to ``max_batch_size``
+    texts, and run as one job.
+
+    Cancelling a call that has not reached the executor drops it. A call that
+    is already running finishes in the background and keeps its slot until
+    then; its result is discarded.
+    """
+
+    def __init__(self, processor, executor="thread", max_concurrency=None, batch_window=None, max_batch_size=64):
+        max_concurrency = (os.cpu_count() or 1) if max_concurrency is None else max_concurrency
+        if isinstance(max_concurrency, bool) or not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        if batch_window is not None and not batch_window >= 0:
+            raise ValueError("batch_window must be a non-negative number of seconds")
+        if isinstance(max_batch_size, bool) or not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        self.processor = processor
+        self.max_concurrency = max_concurrency
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._in_workers = executor == "process"
+        self._owned = executor in ("thread", "process")
+        if executor == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="wetext")
+        elif executor == "process":
+            from tn.processor import _initialize_worker
+
+            self._executor = ProcessPoolExecutor(max_workers=max_concurrency,
+                                                 initializer=_initialize_worker,
+                                                 initargs=(processor, ))
+        elif isinstance(executor, Executor):
+            self._executor = executor
+        else:
+            raise ValueError("executor must be 'thread', 'process' or a concurrent.futures.Executor")
+        self._states = weakref.WeakKeyDictionary()
+
+    async def call(self, method, text, **kwargs):
+        """Awaits ``getattr(processor, method)(text, **kwargs)``."""
+
+        state = self._state()
+        if self.batch_window is None:
+            return await self._submit(state, self._function(method, kwargs), text)
+        return await self._enqueue(state, method, kwargs, text)
+
+    def shutdown(self, wait=True):
+        """Shuts down the executor unless the caller owns it."""
+
+        if self._owned:
+            self._executor.shutdown(wait=wait)
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self.max_concurrency)
+        return state
+
+    def _function(self, method, kwargs):
+        if self._in_workers:
+            from tn.processor import _call_worker
+
+            return partial(_call_worker, method, kwargs)
+        return partial(getattr(self.processor, method), **kwargs)
+
+    async def _submit(self, state, function, *args):
+        await state.semaphore.acquire()
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            state.semaphore.release()
+            raise
+        loop = asyncio.get_running_loop()
+        # Release only when the job ends, so cancelled but running jobs
+        # still count against the limit.
+        future.add_done_callback(partial(_release_soon, loop, state.semaphore))
+        return await asyncio.wrap_future(future)
+
+    def _enqueue(self, state, method, kwargs, text):
+        loop = asyncio.get_running_loop()
+        key = (method, tuple(sorted(kwargs.items())))
+        batch = state.batches.get(key)
+        if batch is None:
+            batch = state.batches[key] = []
+            loop.call_later(self.batch_window, self._dispatch, state, key, batch)
+        future = loop.create_future()
+        batch.append((text, future))
+        if len(batch) >= self.max_batch_size:
+            self._dispatch(state, key, batch)
+        return future
+
+    def _dispatch(self, state, key, batch):
+        if state.batches.get(key) is not batch:
+            return
+        del state.batches[key]
+        batch = [(text, future) for text, future in batch if not future.cancelled()]
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(state, key, batch))
+            state.tasks.add(task)
+            task.add_done_callback(state.tasks.discard)
+
+    async def _run_batch(self, state, key, batch):
+        method, kwargs = key[0], dict(key[1])
+        function = partial(_call_each, self._function(method, kwargs))
+        try:
+            results = await self._submit(state, function, [text for text, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), (ok, value) in zip(batch, results):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
@@ -15,6 +15,7 @@
 
 import hashlib
 import errno
+import io
 import json
 import math
 import os
@@ -22,26 +23,41 @@ import platform
 import re
 import stat
 import sys
+import tarfile
 import tempfile
 import time
 import uuid
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 import pynini
+import pywrapfst
 from pynini import Fst
 
-CACHE_FORMAT_VERSION = 2
+CACHE_FORMAT_VERSION = 4
 BUILDER_ABI_VERSION = 1
 DEFAULT_LOCK_TIMEOUT_SECONDS = 10 * 60
 LOCK_TIMEOUT_ENV = "WETEXTPROCESSING_CACHE_LOCK_TIMEOUT"
+VERIFY_POLICIES = ("full", "stamp", "none")
+DEFAULT_VERIFY_POLICY = "stamp"
+VERIFY_ENV = "WETEXTPROCESSING_CACHE_VERIFY"
+MAX_SIZE_ENV = "WETEXTPROCESSING_CACHE_MAX_SIZE"
+RULE_CACHE_DIRNAME = ".rules"
 _OWNER_PAYLOAD_MAX_BYTES = 64 * 1024
 _CACHE_APPLICATION = "wetextprocessing"
 _PRODUCTION_SUFFIXES = frozenset((".py", ".tsv", ".far"))
 _SAFE_PREFIX = re.compile(r"^[A-Za-z0-9_.-]+$")
+_GRAPH_NAMES = ("tagger", "verbalizer")
 _BUNDLE_FILENAMES = ("tagger.fst", "verbalizer.fst", "manifest.json")
 _MANIFEST_MAX_BYTES = 1024 * 1024
 _FST_MAX_BYTES = min(sys.maxsize, 2 * 1024 * 1024 * 1024)
+# Loads advance an entry's modification time at most this often; it is the
+# least-recently-used clock of ``collect_garbage``.
+_LAST_USED_RESOLUTION_SECONDS = 60 * 60
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+_RESIDUAL_NAME = re.compile(r"^\.([^.]+)\.(?:tmp|previous|corrupt)-")
 
 
 class CacheError(RuntimeError):
@@ -96,34 +112,118 @@ def _hash_bytes(value):
     return hashlib.sha256(value).hexdigest()
 
 
-def production_source_fingerprint(project_root=None):
-    """Hashes graph-producing Python and data resources by content."""
+_SOURCE_FINGERPRINTS = {}
+# File timestamps are coarser than the writes they record, so a file changed
+# this recently could change again without a visible stat difference.
+_RACY_SOURCE_SECONDS = 2
+
+
+def _production_sources(project_root, suffixes=_PRODUCTION_SUFFIXES):
+    """Returns ``(relative_path, stat)`` for every graph-producing file."""
 
-    project_root = Path(__file__).resolve().parent.parent if project_root is None else Path(project_root)
     sources = []
+    root = os.fspath(project_root)
     for package_name in ("tn", "itn"):
-        package_root = project_root / package_name
-        for path in package_root.rglob("*"):
-            if not path.is_file() or path.suffix not in _PRODUCTION_SUFFIXES:
-                continue
-            relative_parts = path.relative_to(package_root).parts
-            if "test" in relative_parts or "__pycache__" in relative_parts:
-                continue
-            if path.name == "_version.py":
-                continue
-            sources.append(path)
+        for directory, subdirectories, filenames in os.walk(os.path.join(root, package_name)):
+            subdirectories[:] = [name for name in subdirectories if name not in ("test", "__pycache__")]
+            relative_directory = Path(os.path.relpath(directory, root)).as_posix()
+            for filename in filenames:
+                if os.path.splitext(filename)[1] not in suffixes or filename == "_version.py":
+                    continue
+                try:
+                    source_stat = os.stat(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    continue
+                if stat.S_ISREG(source_stat.st_mode):
+                    sources.append((relative_directory + "/" + filename, source_stat))
+    sources.sort(key=lambda source: source[0].split("/"))
+    return sources
+
 
+def _hash_sources(project_root, sources):
     digest = hashlib.sha256()
-    for source in sorted(sources):
-        relative_path = source.relative_to(project_root).as_posix().encode("utf-8")
-        digest.update(len(relative_path).to_bytes(8, "big"))
-        digest.update(relative_path)
-        with open(source, "rb") as source_file:
+    for relative_path, _ in sources:
+        encoded_path = relative_path.encode("utf-8")
+        digest.update(len(encoded_path).to_bytes(8, "big"))
+        digest.update(encoded_path)
+        with open(project_root / relative_path, "rb") as source_file:
             for chunk in iter(lambda: source_file.read(1024 * 1024), b""):
                 digest.update(chunk)
     return digest.hexdigest()
 
 
+def production_source_fingerprint(project_root=None, sidecar_dir=None, suffixes=_PRODUCTION_SUFFIXES):
+    """Hashes graph-producing Python and data resources by content.
+
+    ``suffixes`` selects the hashed file types. The content hash is memoized
+    per process and, when ``sidecar_dir`` is given, in a sidecar file there.
+    Both are keyed by every source's path, size, inode, and modification and
+    change times, so only a changed or unseen tree is hashed again. Trees
+    with a file changed in the last two seconds are always hashed.
+    """
+
+    project_root = Path(__file__).resolve().parent.parent if project_root is None else Path(project_root)
+    sources = _production_sources(project_root, suffixes)
+    identity = [os.fspath(project_root), sorted(suffixes)]
+    signature = _hash_bytes(
+        _canonical_json(identity + [[
+            relative_path,
+            source_stat.st_size,
+            source_stat.st_ino,
+            source_stat.st_mtime_ns,
+            source_stat.st_ctime_ns,
+        ] for relative_path, source_stat in sources]))
+    racy_after = time.time_ns() - _RACY_SOURCE_SECONDS * 10**9
+    if any(max(source_stat.st_mtime_ns, source_stat.st_ctime_ns) >= racy_after for _, source_stat in sources):
+        return _hash_sources(project_root, sources)
+
+    fingerprint = _SOURCE_FINGERPRINTS.get(signature)
+    sidecar = None
+    if sidecar_dir is not None:
+        sidecar = Path(sidecar_dir).expanduser() / ".source-fingerprints" / "{}.json".format(
+            _hash_bytes(_canonical_json(identity)))
+        if fingerprint is None:
+            fingerprint = _read_source_sidecar(sidecar, signature)
+    if fingerprint is None:
+        fingerprint = _hash_sources(project_root, sources)
+        if sidecar is not None:
+            _write_source_sidecar(sidecar, signature, fingerprint)
+    _SOURCE_FINGERPRINTS[signature] = fingerprint
+    return fingerprint
+
+
+def _read_source_sidecar(sidecar, signature):
+    try:
+        sidecar_bytes, _ = _read_regular_file(sidecar, max_size=_MANIFEST_MAX_BYTES)
+        recorded = json.loads(sidecar_bytes.decode("utf-8"))
+    except (OSError, CacheError, UnicodeError, ValueError):
+        return None
+    if not isinstance(recorded, dict) or recorded.get("signature") != signature:
+        return None
+    fingerprint = recorded.get("fingerprint")
+    return fingerprint if isinstance(fingerprint, str) else None
+
+
+def _write_source_sidecar(sidecar, signature, fingerprint):
+    # Best effort: a read-only cache root only loses the cross-process memo.
+    try:
+        sidecar.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(prefix=".tmp-", dir=os.fspath(sidecar.parent))
+    except OSError:
+        return
+    try:
+        try:
+            _write_all(descriptor, _canonical_json({"fingerprint": fingerprint, "signature": signature}))
+        finally:
+            os.close(descriptor)
+        os.replace(temporary, os.fspath(sidecar))
+    except OSError:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+
+
 def _builder_identity():
     return {
         "abi": BUILDER_ABI_VERSION,
@@ -161,6 +261,49 @@ def _configured_lock_timeout():
     return timeout
 
 
+def _configured_verify_policy(verify=None):
+    if verify is None:
+        verify = os.environ.get(VERIFY_ENV, DEFAULT_VERIFY_POLICY)
+        if verify not in VERIFY_POLICIES:
+            raise ValueError("{} must be one of: {}".format(VERIFY_ENV, ", ".join(VERIFY_POLICIES)))
+    elif verify not in VERIFY_POLICIES:
+        raise ValueError("verify must be one of: {}".format(", ".join(VERIFY_POLICIES)))
+    return verify
+
+
+def parse_size(value):
+    """Parses a byte count such as ``"512M"``; K, M, G, and T are binary units."""
+
+    match = re.fullmatch(r"\s*(\d+)\s*([KMGT]?)(?:i?B)?\s*", str(value), re.IGNORECASE)
+    if match is None:
+        raise ValueError("invalid size: {!r}".format(value))
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).upper()]
+
+
+def _configured_max_size():
+    value = os.environ.get(MAX_SIZE_ENV)
+    if value is None or not value.strip():
+        return None
+    try:
+        return parse_size(value)
+    except ValueError as error:
+        raise ValueError("{} must be a size such as 512M or 2G".format(MAX_SIZE_ENV)) from error
+
+
+def _mark_used(target):
+    """Advances the modification time of a loaded entry, best effort."""
+
+    try:
+        if time.time() - os.stat(target).st_mtime >= _LAST_USED_RESOLUTION_SECONDS:
+            os.utime(target)
+    except OSError:
+        pass
+
+
+def _file_stamp(file_stat):
+    return [file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns]
+
+
 def _posix_try_lock(descriptor, fcntl_module=None):
     if fcntl_module is None:
         import fcntl as fcntl_module
@@ -168,6 +311,13 @@ def _posix_try_lock(descriptor, fcntl_module=None):
     fcntl_module.flock(descriptor, fcntl_module.LOCK_EX | fcntl_module.LOCK_NB)
 
 
+def _posix_try_shared_lock(descriptor, fcntl_module=None):
+    if fcntl_module is None:
+        import fcntl as fcntl_module
+
+    fcntl_module.flock(descriptor, fcntl_module.LOCK_SH | fcntl_module.LOCK_NB)
+
+
 def _posix_unlock(descriptor, fcntl_module=None):
     if fcntl_module is None:
         import fcntl as fcntl_module
@@ -379,17 +529,31 @@ def _remove_flat_bundle_impl(path, best_effort):
 
 
 class CacheBundle:
-    """One immutable tagger/verbalizer cache bundle.
+    """One immutable cache bundle of a pipeline's tagger and/or verbalizer.
+
+    ``graphs`` names the graphs stored in the bundle, in ``load()`` and
+    ``publish()`` order: both by default, or one of them for a pipeline that
+    caches its tagger and verbalizer as independent components. The names are
+    part of the bundle identity.
 
     ``cache_root`` is an explicitly trusted user-controlled root. It is
     resolved once; every generated child stays beneath it and must be a normal
     directory or regular file, never a symlink, junction, or special file.
+
+    ``verify`` selects how a load checks the graph files. ``"full"`` hashes
+    them every time. ``"stamp"`` hashes them once and then trusts files whose
+    ``(st_dev, st_ino, size, mtime_ns)`` still match the stamp recorded next
+    to the bundle. ``"none"`` only checks sizes. ``None`` reads
+    ``WETEXTPROCESSING_CACHE_VERIFY`` and defaults to ``"stamp"``.
     """
 
-    def __init__(self, cache_root, prefix, ordertype, cache_config, source_fingerprint):
+    def __init__(self, cache_root, prefix, ordertype, cache_config, source_fingerprint, verify=None, graphs=_GRAPH_NAMES):
         if (not isinstance(prefix, str) or prefix in (".", "..") or not _SAFE_PREFIX.fullmatch(prefix)
                 or Path(prefix).name != prefix):
             raise ValueError("cache prefix must be one safe path component")
+        graphs = tuple(graphs)
+        if not graphs or len(set(graphs)) != len(graphs) or any(name not in _GRAPH_NAMES for name in graphs):
+            raise ValueError("cache graphs must be distinct names from: {}".format(", ".join(_GRAPH_NAMES)))
 
         self.cache_root = Path(cache_root).expanduser().resolve(strict=False)
         self.prefix = prefix
@@ -397,9 +561,14 @@ class CacheBundle:
         self.cache_config = cache_config
         self.source_fingerprint = source_fingerprint
         self.builder = _builder_identity()
+        self.metadata = {}
+        self.verify = _configured_verify_policy(verify)
+        self.graphs = graphs
+        self.graph_filenames = tuple(name + ".fst" for name in graphs)
 
         config_identity = {
             "config": cache_config,
+            "graphs": list(graphs),
             "ordertype": ordertype,
             "prefix": prefix,
         }
@@ -413,9 +582,31 @@ class CacheBundle:
         self.parent = self.cache_root / prefix / self.config_digest
         self.path = self.parent / self.bundle_digest
         self.lock_path = self.parent / ".{}.lock".format(self.bundle_digest)
-        for path in (self.parent, self.path, self.lock_path):
+        self.stamp_path = self.parent / ".{}.stamp".format(self.bundle_digest)
+        for path in (self.parent, self.path, self.lock_path, self.stamp_path):
             self._assert_under_root(path)
 
+    @classmethod
+    def _at_path(cls, cache_root, path):
+        """Returns a handle that can only lock and remove the bundle at ``path``.
+
+        The handle has no identity, so it also reaches bundles of other
+        builders and configurations; it cannot load or publish.
+        """
+
+        bundle = cls.__new__(cls)
+        bundle.cache_root = Path(cache_root).expanduser().resolve(strict=False)
+        bundle.prefix = path.parent.parent.name
+        bundle.config_digest = path.parent.name
+        bundle.bundle_digest = path.name
+        bundle.parent = path.parent
+        bundle.path = path
+        bundle.lock_path = bundle.parent / ".{}.lock".format(bundle.bundle_digest)
+        bundle.stamp_path = bundle.parent / ".{}.stamp".format(bundle.bundle_digest)
+        for child in (bundle.parent, bundle.path, bundle.lock_path, bundle.stamp_path):
+            bundle._assert_under_root(child)
+        return bundle
+
     @property
     def tagger_path(self):
         return self.path / _BUNDLE_FILENAMES[0]
@@ -516,6 +707,7 @@ class CacheBundle:
             "cache_format": CACHE_FORMAT_VERSION,
             "config": self.cache_config,
             "config_digest": self.config_digest,
+            "graphs": list(self.graphs),
             "ordertype": self.ordertype,
             "prefix": self.prefix,
             "source_fingerprint": self.source_fingerprint,
@@ -524,7 +716,8 @@ class CacheBundle:
     def _check_bundle_directory(self, bundle_path):
         self._validate_directory_chain(bundle_path)
 
-    def _load_path(self, bundle_path):
+    def _load_path(self, bundle_path, verify=None):
+        verify = self.verify if verify is None else verify
         bundle_fd = None
         try:
             if os.name == "nt":
@@ -541,11 +734,12 @@ class CacheBundle:
                 def read_file(basename, **kwargs):
                     return _read_regular_at(bundle_fd, basename, **kwargs)
 
-            if entries != set(_BUNDLE_FILENAMES):
+            if entries != set(self.graph_filenames + ("manifest.json", )):
                 return None
 
+            stamp = {}
             try:
-                manifest_bytes, _ = read_file("manifest.json", max_size=_MANIFEST_MAX_BYTES)
+                manifest_bytes, stamp["manifest.json"] = read_file("manifest.json", max_size=_MANIFEST_MAX_BYTES)
                 manifest = json.loads(manifest_bytes.decode("utf-8"))
             except FileNotFoundError:
                 return None
@@ -558,11 +752,14 @@ class CacheBundle:
             if any(manifest.get(key) != value for key, value in expected.items()):
                 return None
             files = manifest.get("files")
-            if not isinstance(files, dict) or set(files) != {"tagger.fst", "verbalizer.fst"}:
+            if not isinstance(files, dict) or set(files) != set(self.graph_filenames):
+                return None
+            bundle_metadata = manifest.get("metadata", {})
+            if not isinstance(bundle_metadata, dict):
                 return None
 
-            graphs = []
-            for basename in ("tagger.fst", "verbalizer.fst"):
+            contents = []
+            for basename in self.graph_filenames:
                 metadata = files.get(basename)
                 if not isinstance(metadata, dict):
                     return None
@@ -571,7 +768,7 @@ class CacheBundle:
                         or expected_size > sys.maxsize):
                     return None
                 try:
-                    fst_bytes, _ = read_file(
+                    fst_bytes, stamp[basename] = read_file(
                         basename,
                         expected_size=expected_size,
                         max_size=_FST_MAX_BYTES,
@@ -584,12 +781,29 @@ class CacheBundle:
                     raise
                 except OSError:
                     return None
+                contents.append((fst_bytes, metadata.get("sha256")))
+
+            # Only the published path is stamped; recovery candidates are
+            # always hashed.
+            stamp = {basename: _file_stamp(file_stat) for basename, file_stat in stamp.items()}
+            stamped = bundle_path == self.path and verify != "none" and self._read_stamp() == stamp
+            if verify == "full" or (verify == "stamp" and not stamped):
+                if any(_hash_bytes(fst_bytes) != sha256 for fst_bytes, sha256 in contents):
+                    if bundle_path == self.path:
+                        self._remove_stamp()
+                    return None
+                if bundle_path == self.path and not stamped:
+                    self._write_stamp(stamp)
+            graphs = []
+            for fst_bytes, _ in contents:
                 try:
-                    if metadata.get("sha256") != hashlib.sha256(fst_bytes).hexdigest():
-                        return None
-                    graphs.append(Fst.read_from_string(fst_bytes).optimize())
+                    graphs.append(Fst.read_from_string(fst_bytes))
                 except (RuntimeError, TypeError, ValueError):
                     return None
+            if bundle_path == self.path:
+                use_fd = bundle_fd is not None and os.utime in os.supports_fd
+                _mark_used(bundle_fd if use_fd else os.fspath(bundle_path))
+            self.metadata = bundle_metadata
             return tuple(graphs)
         except FileNotFoundError:
             return None
@@ -597,10 +811,109 @@ class CacheBundle:
             if bundle_fd is not None:
                 os.close(bundle_fd)
 
-    def load(self):
-        """Loads only a complete, matching, checksummed bundle."""
+    def load(self, verify=None):
+        """Loads only a complete, matching, checksummed bundle.
+
+        ``verify`` overrides the bundle's verification policy for this load.
+        The manifest's optional ``metadata`` object is exposed as
+        ``self.metadata`` after a successful load.
+
+        While it reads, the load holds a shared lock on the key when it can,
+        so ``collect_garbage`` never evicts the bundle under it.
+        """
+
+        descriptor = self._lock_shared()
+        try:
+            return self._load_path(self.path, verify)
+        finally:
+            if descriptor is not None:
+                os.close(descriptor)
 
-        return self._load_path(self.path)
+    def _lock_shared(self):
+        # Best effort: a Windows or read-only cache, a missing anchor, or a
+        # key that a builder (maybe this process) holds loads unprotected,
+        # and a bundle evicted meanwhile reads as a miss.
+        if os.name == "nt":
+            return None
+        flags = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_NOFOLLOW", 0)
+        try:
+            descriptor = os.open(os.fspath(self.lock_path), flags)
+        except OSError:
+            return None
+        try:
+            if stat.S_ISREG(os.fstat(descriptor).st_mode):
+                _posix_try_shared_lock(descriptor)
+                return descriptor
+        except OSError:
+            pass
+        os.close(descriptor)
+        return None
+
+    def _published_files(self):
+        """Returns the ``(basename, contents)`` of the published bundle.
+
+        Every graph is re-hashed against the manifest, which must match this
+        bundle's identity.
+        """
+
+        descriptor = self._lock_shared()
+        try:
+            self._check_bundle_directory(self.path)
+            manifest_bytes, _ = _read_regular_file(self.manifest_path, max_size=_MANIFEST_MAX_BYTES)
+            manifest = json.loads(manifest_bytes.decode("utf-8"))
+            if any(manifest.get(key) != value for key, value in self._expected_manifest_identity().items()):
+                raise CacheIntegrityError("cache manifest does not match its bundle: {}".format(self.path))
+            files = [("manifest.json", bytes(manifest_bytes))]
+            for basename in self.graph_filenames:
+                metadata = manifest["files"][basename]
+                contents, _ = _read_regular_file(self.path / basename, expected_size=metadata["size"], max_size=_FST_MAX_BYTES)
+                if _hash_bytes(contents) != metadata["sha256"]:
+                    raise CacheIntegrityError("cache file does not match its manifest: {}".format(self.path / basename))
+                files.append((basename, bytes(contents)))
+            return files
+        except (AttributeError, KeyError, TypeError, UnicodeError, json.JSONDecodeError) as error:
+            raise CacheIntegrityError("cache manifest is malformed: {}".format(self.manifest_path)) from error
+        finally:
+            if descriptor is not None:
+                os.close(descriptor)
+
+    def _read_stamp(self):
+        try:
+            stamp_bytes, _ = _read_regular_file(self.stamp_path, max_size=_MANIFEST_MAX_BYTES)
+            stamp = json.loads(stamp_bytes.decode("utf-8"))
+        except (OSError, CacheError, UnicodeError, ValueError):
+            return None
+        if not isinstance(stamp, dict) or stamp.get("bundle_digest") != self.bundle_digest:
+            return None
+        return stamp.get("files")
+
+    def _write_stamp(self, files):
+        # Stamps live beside the bundle because a bundle directory holds
+        # exactly its published files. Read-only caches simply stay unstamped.
+        try:
+            descriptor, temporary = tempfile.mkstemp(
+                prefix=".{}.stamp-".format(self.bundle_digest),
+                dir=os.fspath(self.parent),
+            )
+        except OSError:
+            return
+        try:
+            try:
+                _write_all(descriptor, _canonical_json({"bundle_digest": self.bundle_digest, "files": files}))
+            finally:
+                os.close(descriptor)
+            os.replace(temporary, os.fspath(self.stamp_path))
+        except OSError:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def _remove_stamp(self):
+        try:
+            os.unlink(os.fspath(self.stamp_path))
+        except OSError:
+            pass
 
     def _open_lock_anchor(self):
         self._ensure_parent()
@@ -698,15 +1011,19 @@ class CacheBundle:
             os.close(descriptor)
 
     def remove_invalid(self):
-        """Quarantines exactly this non-link bundle under ``lock()``."""
+        """Quarantines exactly this non-link bundle under ``lock()``.
+
+        Returns False if the quarantined directory could not be removed.
+        """
 
         try:
             self._check_bundle_directory(self.path)
         except FileNotFoundError:
-            return
+            return True
         quarantine = self.parent / ".{}.corrupt-{}".format(self.bundle_digest, uuid.uuid4().hex)
         self._replace_with_retry(self.path, quarantine, "quarantining invalid cache bundle")
-        _remove_flat_bundle(quarantine, best_effort=True)
+        self._remove_stamp()
+        return _remove_flat_bundle(quarantine, best_effort=True)
 
     def recover_residuals(self):
         """Recovers a complete previous bundle, then cleans this exact key."""
@@ -753,15 +1070,28 @@ class CacheBundle:
                                                                                                           source)) from error
                 time.sleep(0.05)
 
-    def publish(self, tagger, verbalizer):
-        """Publishes a complete bundle under ``lock()``.
+    def publish(self, *graphs, metadata=None):
+        """Publishes a complete bundle of ``graphs`` under ``lock()``.
+
+        ``metadata`` is a JSON object of build-time facts derived from the
+        grammar, such as a pipeline's trigger alphabet. It is stored in the
+        manifest but is not part of the bundle identity.
+
+        A graph may also be given serialized, as read from another bundle; it
+        is then stored byte for byte.
 
         Replacing an existing directory has a short interval where the final
         name is absent, but it is never present with a mixed or partial pair.
         Readers that observe that interval miss, wait for the key lock, and
         retry the completed bundle.
+
+        When ``WETEXTPROCESSING_CACHE_MAX_SIZE`` is set, the least recently
+        used entries of other keys are then evicted to keep the cache root
+        within that size.
         """
 
+        if len(graphs) != len(self.graphs):
+            raise ValueError("expected {} graphs, got {}".format(len(self.graphs), len(graphs)))
         self._ensure_parent()
         temporary = Path(tempfile.mkdtemp(
             prefix=".{}.tmp-".format(self.bundle_digest),
@@ -769,13 +1099,12 @@ class CacheBundle:
         ))
         previous = None
         try:
-            tagger_path = temporary / "tagger.fst"
-            verbalizer_path = temporary / "verbalizer.fst"
-            self._write_fst(tagger, tagger_path)
-            self._write_fst(verbalizer, verbalizer_path)
+            paths = [temporary / basename for basename in self.graph_filenames]
+            for graph, path in zip(graphs, paths):
+                self._write_fst(graph, path)
 
             files = {}
-            for path in (tagger_path, verbalizer_path):
+            for path in paths:
                 fst_bytes, _ = _read_regular_file(path)
                 Fst.read_from_string(fst_bytes)
                 files[path.name] = {
@@ -785,6 +1114,7 @@ class CacheBundle:
 
             manifest = self._expected_manifest_identity()
             manifest["files"] = files
+            manifest["metadata"] = {} if metadata is None else metadata
             self._write_manifest(temporary / "manifest.json", manifest)
             _fsync_directory(temporary)
 
@@ -807,9 +1137,22 @@ class CacheBundle:
             if temporary is not None and os.path.lexists(os.fspath(temporary)):
                 _remove_flat_bundle(temporary, best_effort=True)
 
+        max_size = _configured_max_size()
+        if max_size is not None and os.name != "nt":
+            collect_garbage(self.cache_root, max_size=max_size, keep=(self.path, ))
+
     @staticmethod
     def _write_fst(graph, path):
-        graph.optimize().write(os.fspath(path))
+        if isinstance(graph, (bytes, bytearray)):
+            with open(path, "wb") as cache_file:
+                cache_file.write(graph)
+                cache_file.flush()
+                os.fsync(cache_file.fileno())
+            return
+        # Graphs are stored optimized and input-label sorted in the compact
+        # const layout, so loading is one linear read with no further
+        # optimization.
+        pywrapfst.convert(graph.optimize().arcsort("ilabel"), "const").write(os.fspath(path))
         with open(path, "rb+") as cache_file:
             os.fsync(cache_file.fileno())
 
@@ -820,3 +1163,378 @@ class CacheBundle:
             manifest_file.write("\n")
             manifest_file.flush()
             os.fsync(manifest_file.fileno())
+
+
+def _child_directories(path):
+    """Lists the child directories of ``path``, never links, sorted by name."""
+
+    try:
+        children = sorted(path.iterdir())
+    except OSError:
+        return []
+    found = []
+    for child in children:
+        try:
+            child_stat = os.lstat(os.fspath(child))
+        except OSError:
+            continue
+        if not stat.S_ISLNK(child_stat.st_mode) and not _is_reparse_point(child_stat) and stat.S_ISDIR(child_stat.st_mode):
+            found.append(child)
+    return found
+
+
+def _config_paths(cache_root):
+    """Yields ``prefix/config_digest`` directories, never links."""
+
+    for prefix in _child_directories(cache_root):
+        if not prefix.name.startswith("."):
+            yield from (config for config in _child_directories(prefix) if not config.name.startswith("."))
+
+
+def _bundle_paths(cache_root):
+    """Yields ``prefix/config_digest/bundle_digest`` directories, never links."""
+
+    for config in _config_paths(cache_root):
+        yield from (path for path in _child_directories(config) if not path.name.startswith("."))
+
+
+def _verify_bundle(cache_root, path):
+    try:
+        manifest_bytes, _ = _read_regular_file(path / "manifest.json", max_size=_MANIFEST_MAX_BYTES)
+        manifest = json.loads(manifest_bytes.decode("utf-8"))
+        if manifest.get("builder") != _builder_identity():
+            return "stale"
+        bundle = CacheBundle(
+            cache_root,
+            manifest["prefix"],
+            manifest["ordertype"],
+            manifest["config"],
+            manifest["source_fingerprint"],
+            verify="full",
+            graphs=manifest["graphs"],
+        )
+        if bundle.path != path:
+            return "corrupt"
+        return "ok" if bundle.load() is not None else "corrupt"
+    except (OSError, CacheError, KeyError, TypeError, UnicodeError, ValueError):
+        return "corrupt"
+
+
+def verify_cache(cache_root=None):
+    """Re-hashes every bundle under ``cache_root`` and refreshes its stamp.
+
+    Returns ``(path, status)`` pairs. ``"stale"`` bundles were published by
+    another builder version and are ignored by this one; ``"corrupt"``
+    bundles lose their stamp and are rebuilt on their next load.
+    """
+
+    cache_root = Path(default_cache_dir() if cache_root is None else cache_root).expanduser().resolve(strict=False)
+    return [(path, _verify_bundle(cache_root, path)) for path in _bundle_paths(cache_root)]
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """One evictable entry of a cache root.
+
+    ``kind`` is ``"bundle"``, ``"rule"`` for a compiled rule under
+    ``.rules``, or ``"residual"`` for a directory left behind by an
+    interrupted publish. ``prefix`` names the pipeline of a bundle or
+    residual. ``last_used`` is a POSIX timestamp that loads advance at most
+    once an hour.
+    """
+
+    path: Path
+    kind: str
+    prefix: Optional[str]
+    size: int
+    last_used: float
+
+
+def _directory_entry(path, kind, prefix):
+    try:
+        path_stat = os.lstat(os.fspath(path))
+        size = sum(
+            entry.stat(follow_symlinks=False).st_size for entry in os.scandir(os.fspath(path))
+            if entry.is_file(follow_symlinks=False))
+    except OSError:
+        return None
+    return CacheEntry(path, kind, prefix, size, path_stat.st_mtime)
+
+
+def _rule_entries(cache_root):
+    try:
+        children = sorted(os.scandir(os.fspath(cache_root / RULE_CACHE_DIRNAME)), key=lambda entry: entry.name)
+    except OSError:
+        return
+    for child in children:
+        # Hidden files are rule entries still being written.
+        if child.name.startswith(".") or not child.name.endswith(".rule"):
+            continue
+        try:
+            child_stat = child.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if stat.S_ISREG(child_stat.st_mode):
+            yield CacheEntry(Path(child.path), "rule", None, child_stat.st_size, child_stat.st_mtime)
+
+
+def list_cache(cache_root=None):
+    """Returns the bundles, residuals, and rule entries under ``cache_root``."""
+
+    cache_root = Path(default_cache_dir() if cache_root is None else cache_root).expanduser().resolve(strict=False)
+    entries = []
+    for config in _config_paths(cache_root):
+        for path in _child_directories(config):
+            if not path.name.startswith("."):
+                entries.append(_directory_entry(path, "bundle", config.parent.name))
+            elif _RESIDUAL_NAME.match(path.name):
+                entries.append(_directory_entry(path, "residual", config.parent.name))
+    entries.extend(_rule_entries(cache_root))
+    return [entry for entry in entries if entry is not None]
+
+
+def _evict(cache_root, entry):
+    if entry.kind == "rule":
+        # Rule entries are read in one call, so unlinking one never
+        # disturbs a reader.
+        try:
+            os.unlink(os.fspath(entry.path))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return "failed"
+        return "removed"
+
+    if entry.kind == "residual":
+        key = entry.path.parent / _RESIDUAL_NAME.match(entry.path.name).group(1)
+    else:
+        key = entry.path
+    try:
+        bundle = CacheBundle._at_path(cache_root, key)
+        with bundle.lock(timeout=0):
+            if entry.kind == "residual":
+                removed = _remove_flat_bundle(entry.path, best_effort=True)
+            else:
+                removed = bundle.remove_invalid()
+    except CacheLockTimeout:
+        return "in use"
+    except (OSError, CacheError):
+        return "failed"
+    return "removed" if removed else "failed"
+
+
+def collect_garbage(cache_root=None, max_size=None, max_age=None, keep=()):
+    """Evicts the least recently used entries under ``cache_root``.
+
+    Entries unused for more than ``max_age`` seconds are evicted, then the
+    least recently used ones until the entries total at most ``max_size``
+    bytes. Paths in ``keep`` are never evicted. A bundle or residual is only
+    removed while its key's ``lock()`` is free at once, so bundles that
+    another process is building or loading are skipped.
+
+    Returns ``(entry, status)`` pairs for the entries it tried to evict, with
+    status ``"removed"``, ``"in use"``, or ``"failed"``.
+    """
+
+    if os.name == "nt":
+        raise CacheError("cache garbage collection is disabled on Windows")
+    cache_root = Path(default_cache_dir() if cache_root is None else cache_root).expanduser().resolve(strict=False)
+    keep = {Path(path) for path in keep}
+    entries = sorted(list_cache(cache_root), key=lambda entry: entry.last_used)
+    total = sum(entry.size for entry in entries)
+    deadline = None if max_age is None else time.time() - max_age
+    results = []
+    for entry in entries:
+        expired = deadline is not None and entry.last_used < deadline
+        if not expired and (max_size is None or total <= max_size):
+            break
+        if entry.path in keep:
+            continue
+        status = _evict(cache_root, entry)
+        if status == "removed":
+            total -= entry.size
+        results.append((entry, status))
+    return results
+
+
+def export_bundles(bundles, archive):
+    """Writes the published ``bundles`` to the tar file ``archive``.
+
+    Members are named ``prefix/config_digest/bundle_digest/<file>``, as in
+    the cache root. Graphs are re-hashed before they are packed, and
+    ``archive`` is replaced only once it is complete.
+    """
+
+    members = []
+    for bundle in bundles:
+        directory = "/".join((bundle.prefix, bundle.config_digest, bundle.bundle_digest))
+        members.extend((directory + "/" + basename, contents) for basename, contents in bundle._published_files())
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for name, contents in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(contents)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(contents))
+    _replace_file(archive, buffer.getvalue())
+    return [bundle.path for bundle in bundles]
+
+
+def _replace_file(path, contents):
+    """Writes ``contents`` to a temporary sibling, then renames it to ``path``."""
+
+    path = Path(path)
+    descriptor, temporary = tempfile.mkstemp(prefix=".{}.tmp-".format(path.name), dir=os.fspath(path.parent))
+    try:
+        try:
+            _write_all(descriptor, contents)
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, os.fspath(path))
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def export_runtime(bundles, directory):
+    """Writes the published ``bundles`` of one pipeline for the C++ runtime.
+
+    ``directory`` receives ``<prefix>_tagger.fst`` and
+    ``<prefix>_verbalizer.fst``, the verified bundle graphs byte for byte in
+    their const, input-label sorted layout, and ``<prefix>_token_orders.tsv``,
+    the token-order schema recorded in the verbalizer manifest. Each schema
+    line is a token name followed by its fields in verbalization order,
+    separated by tabs. Returns the written paths.
+    """
+
+    directory = Path(directory)
+    files = {}
+    token_orders = None
+    for bundle in bundles:
+        published = dict(bundle._published_files())
+        for name in bundle.graphs:
+            files["{}_{}.fst".format(bundle.prefix, name)] = published[name + ".fst"]
+        if "verbalizer" in bundle.graphs:
+            manifest = json.loads(published["manifest.json"].decode("utf-8"))
+            token_orders = manifest.get("metadata", {}).get("token_orders")
+            schema = "{}_token_orders.tsv".format(bundle.prefix)
+    if len(files) != len(_GRAPH_NAMES) or len({bundle.prefix for bundle in bundles}) != 1:
+        raise ValueError("a runtime export needs the tagger and verbalizer of one pipeline")
+    if not isinstance(token_orders, dict):
+        raise CacheIntegrityError("verbalizer manifest has no token-order schema; rebuild with overwrite_cache")
+
+    lines = []
+    for token, fields in sorted(token_orders.items()):
+        row = [token] + list(fields)
+        if any(not isinstance(value, str) or not value or re.search(r"\s", value) for value in row):
+            raise CacheIntegrityError("invalid token-order schema entry: {!r}".format(token))
+        lines.append("\t".join(row) + "\n")
+    files[schema] = "".join(lines).encode("utf-8")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, contents in files.items():
+        _replace_file(directory / name, contents)
+    return [directory / name for name in files]
+
+
+def _read_archive(archive):
+    """Groups the files of an exported archive by their bundle directory."""
+
+    bundles = {}
+    try:
+        with tarfile.open(os.fspath(archive), mode="r") as tar:
+            for member in tar:
+                if member.isdir():
+                    continue
+                parts = member.name.split("/")
+                # Members are read into memory and never extracted.
+                if (not member.isreg() or len(parts) != 4 or any(part in ("", ".", "..") for part in parts)
+                        or parts[3] not in _BUNDLE_FILENAMES):
+                    raise CacheIntegrityError("unexpected cache archive member: {}".format(member.name))
+                limit = _MANIFEST_MAX_BYTES if parts[3] == "manifest.json" else _FST_MAX_BYTES
+                files = bundles.setdefault(tuple(parts[:3]), {})
+                if member.size > limit or parts[3] in files:
+                    raise CacheIntegrityError("invalid cache archive member: {}".format(member.name))
+                files[parts[3]] = tar.extractfile(member).read()
+    except tarfile.TarError as error:
+        raise CacheIntegrityError("cache archive is not a readable tar file: {}".format(archive)) from error
+    return bundles
+
+
+def _archived_bundle(cache_root, directory, files):
+    """Returns the bundle, graphs, and metadata of one archived directory.
+
+    Returns ``None`` for a bundle of another builder or grammar version.
+    """
+
+    try:
+        manifest = json.loads(files["manifest.json"].decode("utf-8"))
+        if manifest["builder"] != _builder_identity():
+            return None
+        bundle = CacheBundle(
+            cache_root,
+            manifest["prefix"],
+            manifest["ordertype"],
+            manifest["config"],
+            manifest["source_fingerprint"],
+            graphs=manifest["graphs"],
+        )
+        if (any(manifest.get(key) != value for key, value in bundle._expected_manifest_identity().items())
+                or (bundle.prefix, bundle.config_digest, bundle.bundle_digest) != directory
+                or set(files) != set(bundle.graph_filenames + ("manifest.json", ))):
+            raise CacheIntegrityError("cache archive bundle does not match its manifest: {}".format("/".join(directory)))
+        graphs = []
+        for basename in bundle.graph_filenames:
+            metadata = manifest["files"][basename]
+            contents = files[basename]
+            if len(contents) != metadata["size"] or _hash_bytes(contents) != metadata["sha256"]:
+                raise CacheIntegrityError("cache archive file does not match its manifest: {}/{}".format(
+                    "/".join(directory), basename))
+            graphs.append(contents)
+        return bundle, graphs, manifest.get("metadata", {})
+    except CacheIntegrityError:
+        raise
+    except (AttributeError, KeyError, TypeError, ValueError) as error:
+        raise CacheIntegrityError("cache archive manifest is malformed: {}".format("/".join(directory))) from error
+
+
+def import_bundles(archive, cache_root=None):
+    """Installs the bundles of an ``export_bundles`` archive into ``cache_root``.
+
+    The whole archive is checked before anything is installed; a malformed
+    archive raises ``CacheIntegrityError``. Each bundle is then published
+    under its ``lock()``, byte for byte. Returns ``(path, status)`` pairs:
+    ``"installed"``, ``"present"`` when a valid bundle was already there, or
+    ``"stale"`` for a bundle of another builder version or other grammar
+    sources, which this installation would never load.
+    """
+
+    cache_root = Path(default_cache_dir() if cache_root is None else cache_root).expanduser().resolve(strict=False)
+    source_fingerprint = production_source_fingerprint(sidecar_dir=cache_root)
+    archived = []
+    for directory, files in sorted(_read_archive(archive).items()):
+        archived.append((directory, _archived_bundle(cache_root, directory, files)))
+
+    results = []
+    for directory, prepared in archived:
+        if prepared is None or prepared[0].source_fingerprint != source_fingerprint:
+            results.append((cache_root.joinpath(*directory), "stale"))
+            continue
+        bundle, graphs, metadata = prepared
+        with bundle.lock():
+            bundle.recover_residuals()
+            if bundle.load() is not None:
+                results.append((bundle.path, "present"))
+                continue
+            bundle.remove_invalid()
+            bundle.publish(*graphs, metadata=metadata)
+            if bundle.load(verify="full") is None:
+                raise CacheIntegrityError("imported cache bundle failed verification: {}".format(bundle.path))
+        results.append((bundle.path, "installed"))
+    return results
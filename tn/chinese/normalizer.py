@@ -51,6 +51,7 @@ class Normalizer(Processor):
         tag_oov=False,
     ):
         super().__init__(name="zh_normalizer", token_orders=TOKEN_ORDERS)
+        self.enable_token_memo()
         self.remove_interjections = remove_interjections
         self.remove_erhua = remove_erhua
         self.traditional_to_simple = traditional_to_simple
@@ -69,22 +70,23 @@ class Normalizer(Processor):
                 "tag_oov": self.tag_oov,
                 "traditional_to_simple": self.traditional_to_simple,
             },
+            tagger_options=(),
         )
 
-    def build_tagger_and_verbalizer(self):
-        cardinal = Cardinal()
-        range_rule = Range()
-        date = Date(range_tagger=range_rule.tagger)
-        whitelist = Whitelist(remove_erhua=self.remove_erhua)
-        sport = Sport(cardinal=cardinal)
-        fraction = Fraction(cardinal=cardinal)
-        measure = Measure(cardinal=cardinal)
-        money = Money(cardinal=cardinal)
-        time = Time(range_tagger=range_rule.tagger)
-        math = Math(cardinal=cardinal)
-        char = Char()
+    def build_rules(self):
+        cardinal = self.compile_rule(Cardinal)
+        range_rule = self.compile_rule(Range)
+        date = self.compile_rule(Date, range_tagger=range_rule.tagger)
+        whitelist = self.compile_rule(Whitelist, remove_erhua=self.remove_erhua)
+        sport = self.compile_rule(Sport, cardinal=cardinal)
+        fraction = self.compile_rule(Fraction, cardinal=cardinal)
+        measure = self.compile_rule(Measure, cardinal=cardinal)
+        money = self.compile_rule(Money, cardinal=cardinal)
+        time = self.compile_rule(Time, range_tagger=range_rule.tagger)
+        math = self.compile_rule(Math, cardinal=cardinal)
+        char = self.compile_rule(Char)
 
-        rules = (
+        return (
             RuleSpec(date, 1.02),
             RuleSpec(whitelist, 1.03),
             RuleSpec(sport, 1.04),
@@ -94,15 +96,22 @@ class Normalizer(Processor):
             RuleSpec(time, 1.05),
             RuleSpec(cardinal, 1.06),
             RuleSpec(math, 90),
-            RuleSpec(char, 100),
+            RuleSpec(char, 100, passthrough=True),
             RuleSpec(range_rule),
         )
+
+    def build_tagger(self):
+        rules = self.rule_specs()
         tagger = self.tagger_union(rules).star
         self.tagger = tagger @ self.build_rule(delete(" "), r="[EOS]")
+        self.trigger_alphabet = self.build_trigger_alphabet(rules)
+        self.token_alphabet = self.build_token_alphabet(rules)
 
-        verbalizer = self.verbalizer_union(rules)
+    def build_verbalizer(self):
+        verbalizer = self.verbalizer_union(self.rule_specs())
 
-        postprocessor = PostProcessor(
+        postprocessor = self.compile_rule(
+            PostProcessor,
             remove_interjections=self.remove_interjections,
             remove_puncts=self.remove_puncts,
             full_to_half=self.full_to_half,
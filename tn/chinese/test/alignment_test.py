@@ -1,9 +1,9 @@
 import pytest
-from pynini import cross
+from pynini import accep, cross, shortestpath
 from pynini import union
 from pynini.lib.pynutil import add_weight, delete, insert
 
-from tn.alignment import NormalizationMapping, trace_input_spans, transduce_with_spans
+from tn.alignment import NormalizationMapping, path_arcs, trace_input_spans, transduce_with_spans
 
 
 def test_trace_input_spans_uses_the_wfst_path():
@@ -15,6 +15,22 @@ def test_trace_input_spans_uses_the_wfst_path():
     assert spans == ((0, 1), (1, 3))
 
 
+def test_span_tracing_reuses_supplied_path_arcs(monkeypatch):
+    tagged = 'char { value: "1" } math { value: "23" }'
+    tagger = cross("1", 'char { value: "1" }') + cross("23", ' math { value: "23" }')
+    verbalizer = cross("a", "A") + insert(" ") + cross("b", "B")
+    tagger_arcs = path_arcs(shortestpath(accep("123") @ tagger))
+    verbalizer_arcs = path_arcs(shortestpath(accep("ab") @ verbalizer))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("span tracing must not search the graph again")
+
+    monkeypatch.setattr("tn.alignment.shortestpath", fail)
+
+    assert trace_input_spans("123", tagged, tagger, ((0, 19), (20, len(tagged))), arcs=tagger_arcs) == ((0, 1), (1, 3))
+    assert transduce_with_spans("ab", verbalizer, ((0, 1), (1, 2)), arcs=verbalizer_arcs) == ("A B", ((0, 1), (2, 3)))
+
+
 def test_mapping_exposes_token_type():
     mapping = NormalizationMapping(
         kind="replace",
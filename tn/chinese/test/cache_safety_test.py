@@ -1,15 +1,18 @@
+import io
 import json
 import multiprocessing
 import os
+import tarfile
 import time
 from pathlib import Path
 
 import pytest
+import pywrapfst
 from pynini import cross
 
 import tn.cache as cache
 from tn.cache import CacheBundle, CacheLockTimeout, CachePathError
-from tn.chinese.test.processor_test import CountingProcessor
+from tn.chinese.test.processor_test import CountingProcessor, SplitProcessor
 from tn.processor import Processor
 
 
@@ -503,3 +506,162 @@ def test_preexisting_explicit_root_permissions_are_not_changed(tmp_path):
     CountingProcessor(explicit)
 
     assert explicit.stat().st_mode & 0o777 == 0o755
+
+
+def _published(cache_root, name, last_used):
+    bundle = CacheBundle(cache_root, "zh_tn", "tn", {"name": name}, "test-source")
+    with bundle.lock():
+        bundle.publish(cross("input", name), cross(name, "output"))
+    os.utime(bundle.path, (last_used, last_used))
+    return bundle
+
+
+def test_gc_evicts_least_recently_used_entries_first(tmp_path):
+    if os.name == "nt":
+        pytest.skip("Windows intentionally leaves cache entries untouched")
+    now = time.time()
+    oldest = _published(tmp_path, "oldest", now - 300)
+    newest = _published(tmp_path, "newest", now - 100)
+    middle = _published(tmp_path, "middle", now - 200)
+    rule = tmp_path / cache.RULE_CACHE_DIRNAME / "old.rule"
+    rule.parent.mkdir()
+    rule.write_bytes(b"rule")
+    os.utime(rule, (now - 400, now - 400))
+    size = next(entry.size for entry in cache.list_cache(tmp_path) if entry.path == newest.path)
+
+    results = cache.collect_garbage(tmp_path, max_size=size * 2)
+
+    assert [(entry.path, status) for entry, status in results] == [
+        (rule, "removed"),
+        (oldest.path, "removed"),
+    ]
+    assert oldest.load() is None and not rule.exists()
+    assert middle.load() is not None and newest.load() is not None
+    assert [entry.path for entry, _ in cache.collect_garbage(tmp_path, max_age=150)] == [middle.path]
+
+
+def test_gc_skips_a_bundle_that_is_being_loaded(tmp_path):
+    if os.name == "nt":
+        pytest.skip("Windows intentionally leaves cache entries untouched")
+    bundle = _published(tmp_path, "loading", time.time())
+
+    # A load holds this shared lock while it reads the bundle.
+    descriptor = bundle._lock_shared()
+    try:
+        results = cache.collect_garbage(tmp_path, max_size=0)
+    finally:
+        os.close(descriptor)
+
+    assert [(entry.path, status) for entry, status in results] == [(bundle.path, "in use")]
+    assert bundle.load() is not None
+    assert [status for _, status in cache.collect_garbage(tmp_path, max_size=0)] == ["removed"]
+    assert bundle.load() is None
+
+
+def test_load_refreshes_the_last_used_time(tmp_path):
+    bundle = _published(tmp_path, "stale", time.time() - 2 * 60 * 60)
+
+    assert bundle.load() is not None
+
+    assert time.time() - bundle.path.stat().st_mtime < 60
+
+
+def test_publish_evicts_other_bundles_above_the_size_limit(monkeypatch, tmp_path):
+    if os.name == "nt":
+        pytest.skip("Windows intentionally leaves cache entries untouched")
+    first = _published(tmp_path, "first", time.time() - 100)
+    monkeypatch.setenv("WETEXTPROCESSING_CACHE_MAX_SIZE", "1")
+
+    second = _published(tmp_path, "second", time.time())
+
+    assert first.load() is None
+    assert second.load() is not None
+
+
+def test_invalid_max_size_environment_is_rejected(monkeypatch, tmp_path):
+    monkeypatch.setenv("WETEXTPROCESSING_CACHE_MAX_SIZE", "lots")
+
+    with pytest.raises(ValueError, match="WETEXTPROCESSING_CACHE_MAX_SIZE"):
+        _published(tmp_path, "first", time.time())
+
+
+def test_exported_bundle_is_installed_byte_for_byte(tmp_path):
+    bundle = CountingProcessor(tmp_path / "ci").cache_bundles[0]
+    archive = tmp_path / "bundle.tar"
+
+    assert cache.export_bundles([bundle], archive) == [bundle.path]
+    results = cache.import_bundles(archive, tmp_path / "node")
+
+    installed = CacheBundle(tmp_path / "node", "zh_tn", "tn", {}, bundle.source_fingerprint)
+    assert results == [(installed.path, "installed")]
+    for name in ("tagger.fst", "verbalizer.fst", "manifest.json"):
+        assert (installed.path / name).read_bytes() == (bundle.path / name).read_bytes()
+    assert cache.import_bundles(archive, tmp_path / "node") == [(installed.path, "present")]
+    CountingProcessor.builds = 0
+    assert CountingProcessor(tmp_path / "node").normalize("input") == "output"
+    assert CountingProcessor.builds == 0
+
+
+def test_import_skips_bundles_of_other_sources(tmp_path):
+    bundle = _published(tmp_path / "ci", "other", time.time())
+    archive = tmp_path / "bundle.tar"
+    cache.export_bundles([bundle], archive)
+
+    results = cache.import_bundles(archive, tmp_path / "node")
+
+    assert [status for _, status in results] == ["stale"]
+    assert not list((tmp_path / "node").glob("**/manifest.json"))
+
+
+def test_import_rejects_unexpected_archive_members(tmp_path):
+    bundle = CountingProcessor(tmp_path / "ci").cache_bundles[0]
+    archive = tmp_path / "bundle.tar"
+    cache.export_bundles([bundle], archive)
+    with tarfile.open(archive, "a") as tar:
+        info = tarfile.TarInfo("../escape/manifest.json")
+        info.size = 2
+        tar.addfile(info, io.BytesIO(b"{}"))
+
+    with pytest.raises(cache.CacheIntegrityError, match="unexpected cache archive member"):
+        cache.import_bundles(archive, tmp_path / "node")
+    assert not (tmp_path / "node").exists() or not list((tmp_path / "node").glob("**/manifest.json"))
+    assert not (tmp_path / "escape").exists()
+
+
+def test_import_rejects_a_tampered_graph(tmp_path):
+    bundle = CountingProcessor(tmp_path / "ci").cache_bundles[0]
+    archive = tmp_path / "bundle.tar"
+    cache.export_bundles([bundle], archive)
+    with tarfile.open(archive) as tar:
+        members = [(member, bytearray(tar.extractfile(member).read())) for member in tar]
+    members[1][1][-1] ^= 0xFF
+    with tarfile.open(archive, "w") as tar:
+        for member, contents in members:
+            tar.addfile(member, io.BytesIO(bytes(contents)))
+
+    with pytest.raises(cache.CacheIntegrityError, match="does not match its manifest"):
+        cache.import_bundles(archive, tmp_path / "node")
+
+
+def test_runtime_export_writes_bundle_graphs_and_token_orders(tmp_path):
+    processor = SplitProcessor(tmp_path / "cache")
+    tagger, verbalizer = processor.cache_bundles
+
+    paths = cache.export_runtime(processor.cache_bundles, tmp_path / "runtime")
+
+    assert [path.name for path in paths] == ["zh_tn_tagger.fst", "zh_tn_verbalizer.fst", "zh_tn_token_orders.tsv"]
+    assert paths[0].read_bytes() == tagger.tagger_path.read_bytes()
+    assert paths[1].read_bytes() == verbalizer.verbalizer_path.read_bytes()
+    for path in paths[:2]:
+        graph = pywrapfst.Fst.read(os.fspath(path))
+        assert graph.fst_type() == "const"
+        assert graph.properties(pywrapfst.I_LABEL_SORTED, True) == pywrapfst.I_LABEL_SORTED
+    assert "time\tnoon\thour\tminute\tsecond" in paths[2].read_text(encoding="utf-8").splitlines()
+
+
+def test_runtime_export_requires_a_token_order_schema(tmp_path):
+    bundle = _published(tmp_path, "unordered", time.time())
+
+    with pytest.raises(cache.CacheIntegrityError, match="token-order schema"):
+        cache.export_runtime([bundle], tmp_path / "runtime")
+    assert not (tmp_path / "runtime").exists()
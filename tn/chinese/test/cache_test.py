@@ -16,6 +16,14 @@ def _build_small_graphs(processor):
     processor.verbalizer = cross("tagged", "output")
 
 
+def _build_small_tagger(processor):
+    processor.tagger = cross("input", "tagged")
+
+
+def _build_small_verbalizer(processor):
+    processor.verbalizer = cross("tagged", "output")
+
+
 @pytest.mark.parametrize(
     "normalizer_type,prefix,ordertype,kwargs,expected_config",
     [
@@ -106,13 +114,22 @@ def test_all_pipeline_configs_are_part_of_manifest(
     kwargs,
     expected_config,
 ):
-    monkeypatch.setattr(normalizer_type, "build_tagger_and_verbalizer", _build_small_graphs)
+    if hasattr(normalizer_type, "build_tagger_and_verbalizer"):
+        monkeypatch.setattr(normalizer_type, "build_tagger_and_verbalizer", _build_small_graphs)
+    else:
+        monkeypatch.setattr(normalizer_type, "build_tagger", _build_small_tagger)
+        monkeypatch.setattr(normalizer_type, "build_verbalizer", _build_small_verbalizer)
     cache_root = tmp_path / prefix
 
     normalizer_type(cache_dir=cache_root, **kwargs)
 
-    manifest_path = next(cache_root.glob("**/manifest.json"))
-    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
-    assert manifest["prefix"] == prefix
-    assert manifest["ordertype"] == ordertype
-    assert manifest["config"] == expected_config
+    manifests = {}
+    for manifest_path in cache_root.glob("**/manifest.json"):
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifests[tuple(manifest["graphs"])] = manifest
+        assert manifest["prefix"] == prefix
+        assert manifest["ordertype"] == ordertype
+    verbalizer_manifest = manifests.get(("verbalizer", ), manifests.get(("tagger", "verbalizer")))
+    assert verbalizer_manifest["config"] == expected_config
+    # A separately cached tagger is keyed on a subset of the same options.
+    assert manifests.get(("tagger", ), verbalizer_manifest)["config"].items() <= expected_config.items()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from itertools import chain
 
 import pytest
@@ -28,18 +29,19 @@ def normalizer(tmp_path_factory):
 
 class TestNormalizer:
 
-    normalizer_cases = chain(
-        parse_test_case("data/cardinal.txt"),
-        parse_test_case("data/char.txt"),
-        parse_test_case("data/date.txt"),
-        parse_test_case("data/fraction.txt"),
-        parse_test_case("data/math.txt"),
-        parse_test_case("data/money.txt"),
-        parse_test_case("data/time.txt"),
-        parse_test_case("data/whitelist.txt"),
-        parse_test_case("data/normalizer.txt"),
-        parse_test_case("data/normalizer_tag_oov.txt"),
-    )
+    normalizer_cases = list(
+        chain(
+            parse_test_case("data/cardinal.txt"),
+            parse_test_case("data/char.txt"),
+            parse_test_case("data/date.txt"),
+            parse_test_case("data/fraction.txt"),
+            parse_test_case("data/math.txt"),
+            parse_test_case("data/money.txt"),
+            parse_test_case("data/time.txt"),
+            parse_test_case("data/whitelist.txt"),
+            parse_test_case("data/normalizer.txt"),
+            parse_test_case("data/normalizer_tag_oov.txt"),
+        ))
 
     @pytest.mark.parametrize("written, spoken", normalizer_cases)
     def test_normalizer(self, normalizer, written, spoken):
@@ -93,3 +95,36 @@ class TestNormalizer:
         assert len(result.mappings) == 1
         assert (result.mappings[0].input_start, result.mappings[0].input_end) == (0, 1)
         assert (result.mappings[0].output_start, result.mappings[0].output_end) == (0, 1)
+
+    def test_shared_normalizer_is_thread_safe(self, normalizer):
+        cases = self.normalizer_cases
+        texts = [written for written, _ in cases]
+        mappings = [normalizer.normalize_with_mapping(text) for text in texts]
+        # Tiny caches make threads race on lookups, insertions and evictions.
+        normalizer.enable_result_cache(maxsize=8)
+        normalizer.enable_token_memo(maxsize=8)
+        failures = []
+
+        def work(offset):
+            try:
+                for repeat in range(2):
+                    for index in range(len(cases)):
+                        index = (index * 7 + offset + repeat) % len(cases)
+                        written, spoken = cases[index]
+                        if normalizer.normalize(written) != spoken:
+                            failures.append(("normalize", written))
+                        if (index + offset) % 3 == 0 and normalizer.normalize_with_mapping(written) != mappings[index]:
+                            failures.append(("normalize_with_mapping", written))
+            except Exception as error:
+                failures.append(("error", repr(error)))
+
+        threads = [threading.Thread(target=work, args=(offset, )) for offset in range(8)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            normalizer.disable_result_cache()
+            normalizer.enable_token_memo()
+        assert failures == []
@@ -1,14 +1,21 @@
+import gc
 import json
 import os
+import pickle
 import time
 from concurrent.futures import ThreadPoolExecutor
 
 import pytest
-from pynini import accep, cross, escape, union
-from pynini.lib.pynutil import add_weight
+import pywrapfst
+from pynini import I_LABEL_SORTED, accep, cross, escape, string_file, union
+from pynini.lib.pynutil import add_weight, delete, insert
 
-from tn.cache import CacheBundle, default_cache_dir, production_source_fingerprint
-from tn.processor import Processor, _UniqueOutputPathStream
+import tn.cache
+import tn.processor
+from tn.cache import CacheBundle, default_cache_dir, production_source_fingerprint, verify_cache
+from tn.chinese.rules.char import Char
+from tn.processor import Processor, RuleSpec, _UniqueOutputPathStream
+from tn.rule_cache import record_data_file
 
 
 class CountingProcessor(Processor):
@@ -25,6 +32,29 @@ class CountingProcessor(Processor):
         self.verbalizer = cross('counting { value: "output" }', "output")
 
 
+class SplitProcessor(Processor):
+
+    builds = []
+
+    def __init__(self, cache_dir, suffix=""):
+        super().__init__("split")
+        self.suffix = suffix
+        self.build_fst("zh_tn", cache_dir, False, {"suffix": suffix}, tagger_options=())
+
+    def build_rules(self):
+        type(self).builds.append("rules")
+        return (RuleSpec(TwelveRule(), 1.0), )
+
+    def build_tagger(self):
+        type(self).builds.append("tagger")
+        self.tagger = self.tagger_union(self.rule_specs())
+        self.trigger_alphabet = self.build_trigger_alphabet(self.rule_specs())
+
+    def build_verbalizer(self):
+        type(self).builds.append("verbalizer")
+        self.verbalizer = self.verbalizer_union(self.rule_specs()) + insert(self.suffix)
+
+
 class AmbiguousProcessor(Processor):
 
     def __init__(self, cache_dir):
@@ -89,6 +119,93 @@ class JointItnProcessor(Processor):
         )
 
 
+class LetterProcessor(Processor):
+
+    def __init__(self, cache_dir):
+        super().__init__("letter")
+        self.build_fst("zh_tn", cache_dir, False, {"letters": "abc"})
+
+    def build_tagger_and_verbalizer(self):
+        tagged = ['letter {{ value: "{}" }}'.format(letter) for letter in "abc"]
+        self.tagger = union(*[cross(letter, token) for letter, token in zip("abc", tagged)])
+        self.verbalizer = union(*[cross(token, letter.upper()) for letter, token in zip("abc", tagged)])
+
+
+class UnverbalizedBestTagProcessor(Processor):
+
+    def __init__(self):
+        super().__init__("counting")
+        first = 'counting { value: "first" }'
+        second = 'counting { value: "second" }'
+        self.tagger = union(
+            cross("input", first),
+            add_weight(cross("input", second), 1.0),
+        )
+        self.verbalizer = cross(second, "SECOND")
+
+
+class TwelveRule(Processor):
+
+    def __init__(self):
+        super().__init__("twelve")
+        self.tagger = self.add_tokens(self.tag_field("value", accep("12")))
+        self.verbalizer = self.delete_tokens(self.verbalize_field("value", cross("12", "十二")))
+
+
+class TableRule(Processor):
+
+    builds = []
+
+    def __init__(self, path):
+        super().__init__("table")
+        type(self).builds.append("table")
+        record_data_file(path)
+        self.graph = string_file(path)
+        self.tagger = self.add_tokens(self.tag_field("value", self.graph))
+        self.verbalizer = self.delete_tokens(self.verbalize_field("value", self.graph))
+
+
+class CountRule(Processor):
+
+    def __init__(self, table):
+        super().__init__("count")
+        TableRule.builds.append("count")
+        self.table = table
+        graph = table.graph + accep("个")
+        self.tagger = self.add_tokens(self.tag_field("value", graph))
+        self.verbalizer = self.delete_tokens(self.verbalize_field("value", graph))
+
+
+class RuleCacheProcessor(Processor):
+
+    def __init__(self, cache_dir, path, suffix=""):
+        super().__init__("rules")
+        self.path = path
+        self.suffix = suffix
+        self.build_fst("zh_tn", cache_dir, False, {"suffix": suffix})
+
+    def build_tagger_and_verbalizer(self):
+        table = self.compile_rule(TableRule, self.path)
+        count = self.compile_rule(CountRule, table=table)
+        rules = (RuleSpec(table, 1.1), RuleSpec(count, 1.0), RuleSpec(self.compile_rule(TwelveRule), 1.2))
+        self.tagger = self.tagger_union(rules)
+        self.verbalizer = self.verbalizer_union(rules) + insert(self.suffix)
+
+
+class PassthroughProcessor(Processor):
+
+    def __init__(self, cache_dir):
+        super().__init__("passthrough")
+        self.build_fst("zh_tn", cache_dir, False, {"passthrough": "twelve"})
+
+    def build_tagger_and_verbalizer(self):
+        rules = (RuleSpec(TwelveRule(), 1.0), RuleSpec(Char(), 100, passthrough=True))
+        self.tagger = self.tagger_union(rules).star @ self.build_rule(delete(" "), r="[EOS]")
+        self.trigger_alphabet = self.build_trigger_alphabet(rules)
+        self.token_alphabet = self.build_token_alphabet(rules)
+        self.verbalizer = self.verbalizer_union(rules).star
+
+
 class WeightedFieldProcessor(Processor):
 
     def __init__(self):
@@ -133,7 +250,7 @@ def test_source_fingerprint_is_content_addressed_and_reusable(monkeypatch, tmp_p
     monkeypatch.setattr(
         CountingProcessor,
         "_source_fingerprint",
-        staticmethod(lambda prefix: current["fingerprint"]),
+        staticmethod(lambda prefix, cache_root=None: current["fingerprint"]),
     )
     CountingProcessor.builds = 0
 
@@ -208,6 +325,29 @@ def test_production_fingerprint_uses_content_not_mtime(tmp_path):
     assert production_source_fingerprint(tmp_path) == before_test_change
 
 
+def test_production_fingerprint_is_memoized_by_source_stats(monkeypatch, tmp_path):
+    project = tmp_path / "project"
+    sidecar_dir = tmp_path / "cache"
+    source = project / "tn" / "rules" / "rule.py"
+    source.parent.mkdir(parents=True)
+    source.write_text("RULE = 1\n", encoding="utf-8")
+    monkeypatch.setattr(tn.cache, "_RACY_SOURCE_SECONDS", 0)
+    monkeypatch.setattr(tn.cache, "_SOURCE_FINGERPRINTS", {})
+    hashed = []
+    original = tn.cache._hash_sources
+    monkeypatch.setattr(tn.cache, "_hash_sources", lambda *args: hashed.append(args) or original(*args))
+
+    fingerprint = production_source_fingerprint(project, sidecar_dir=sidecar_dir)
+    assert production_source_fingerprint(project) == fingerprint
+    tn.cache._SOURCE_FINGERPRINTS.clear()
+    assert production_source_fingerprint(project, sidecar_dir=sidecar_dir) == fingerprint
+    assert len(hashed) == 1
+
+    source.write_text("RULE = 22\n", encoding="utf-8")
+    assert production_source_fingerprint(project, sidecar_dir=sidecar_dir) != fingerprint
+    assert len(hashed) == 2
+
+
 class SlowCountingProcessor(CountingProcessor):
 
     builds = 0
@@ -284,7 +424,66 @@ def test_incomplete_or_corrupt_bundle_is_rebuilt(tmp_path, damage):
 
     assert CountingProcessor.builds == 2
     assert processor.normalize("input") == "output"
-    assert json.loads(next(tmp_path.glob("**/manifest.json")).read_text(encoding="utf-8"))["cache_format"] == 2
+    assert json.loads(next(tmp_path.glob("**/manifest.json")).read_text(encoding="utf-8"))["cache_format"] == 4
+
+
+def test_bundle_stores_sorted_const_graphs(tmp_path):
+    processor = CountingProcessor(tmp_path)
+    tagger_path = next(tmp_path.glob("**/tagger.fst"))
+
+    assert pywrapfst.Fst.read(str(tagger_path)).fst_type() == "const"
+    assert processor.tagger.properties(I_LABEL_SORTED, True) == I_LABEL_SORTED
+    assert processor.normalize("input") == "output"
+
+
+def _corrupt_in_place(path):
+    # Same size, inode, and mtime: only a full re-hash can notice.
+    path_stat = path.stat()
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    with open(path, "r+b") as fst_file:
+        fst_file.write(data)
+    os.utime(path, ns=(path_stat.st_atime_ns, path_stat.st_mtime_ns))
+
+
+@pytest.mark.parametrize("verify,hashes", [("full", 2), ("stamp", 0), ("none", 0)])
+def test_verification_policy_controls_rehashing(monkeypatch, tmp_path, verify, hashes):
+    CountingProcessor(tmp_path)
+    monkeypatch.setenv("WETEXTPROCESSING_CACHE_VERIFY", verify)
+    hashed = []
+    original = tn.cache._hash_bytes
+    # Graph files are read into bytearrays; identity digests hash bytes.
+    monkeypatch.setattr(tn.cache, "_hash_bytes",
+                        lambda value: isinstance(value, bytearray) and hashed.append(value) or original(value))
+
+    processor = CountingProcessor(tmp_path)
+
+    assert len(hashed) == hashes
+    assert processor.cache_bundles[0].verify == verify
+    assert processor.cache_bundles[0].stamp_path.is_file()
+    assert processor.normalize("input") == "output"
+
+
+def test_verification_policy_must_be_known(monkeypatch, tmp_path):
+    monkeypatch.setenv("WETEXTPROCESSING_CACHE_VERIFY", "sometimes")
+
+    with pytest.raises(ValueError, match="WETEXTPROCESSING_CACHE_VERIFY"):
+        CountingProcessor(tmp_path)
+
+
+def test_verify_cache_rehashes_stamped_bundles(tmp_path):
+    CountingProcessor.builds = 0
+    bundle = CountingProcessor(tmp_path).cache_bundles[0]
+    assert verify_cache(tmp_path) == [(bundle.path, "ok")]
+
+    _corrupt_in_place(bundle.tagger_path)
+    assert bundle.load() is not None
+
+    assert verify_cache(tmp_path) == [(bundle.path, "corrupt")]
+    assert not bundle.stamp_path.exists()
+    CountingProcessor(tmp_path)
+    assert CountingProcessor.builds == 2
+    assert verify_cache(tmp_path) == [(bundle.path, "ok")]
 
 
 def test_legacy_flat_cache_is_left_untouched_and_not_trusted(tmp_path):
@@ -322,6 +521,156 @@ def test_failed_initial_publication_leaves_no_readable_partial_bundle(monkeypatc
     assert anchors[0].is_file()
 
 
+def test_pickled_processor_reloads_graphs_from_its_bundle(tmp_path):
+    CountingProcessor.builds = 0
+    processor = CountingProcessor(tmp_path)
+
+    state = processor.__getstate__()
+    restored = pickle.loads(pickle.dumps(processor))
+
+    assert state["tagger"] is None and state["verbalizer"] is None
+    assert [bundle.path for bundle in restored.cache_bundles] == [bundle.path for bundle in processor.cache_bundles]
+    assert restored.normalize("input") == "output"
+    assert CountingProcessor.builds == 1
+
+
+def test_processors_of_one_bundle_share_graphs_until_released(tmp_path):
+    CountingProcessor.builds = 0
+    first = CountingProcessor(tmp_path)
+    second = CountingProcessor(tmp_path)
+    path = first.cache_bundles[0].path
+
+    assert CountingProcessor.builds == 1
+    assert second.tagger is first.tagger
+    assert second.verbalizer is first.verbalizer
+    assert pickle.loads(pickle.dumps(first)).tagger is first.tagger
+    assert CountingProcessor(tmp_path, {"option": True}).tagger is not first.tagger
+
+    del first, second
+    gc.collect()
+    assert path not in tn.processor._SHARED_GRAPHS
+    assert CountingProcessor(tmp_path).normalize("input") == "output"
+
+
+def test_split_pipeline_rebuilds_only_the_changed_component(tmp_path):
+    SplitProcessor.builds = []
+    first = SplitProcessor(tmp_path)
+    assert SplitProcessor.builds == ["tagger", "rules", "verbalizer"]
+
+    SplitProcessor.builds = []
+    second = SplitProcessor(tmp_path, suffix="!")
+    assert SplitProcessor.builds == ["verbalizer", "rules"]
+    assert second.tagger is first.tagger
+    assert second.cache_bundles[0].path == first.cache_bundles[0].path
+    assert second.trigger_alphabet == frozenset("1")
+    assert (first.normalize("12"), second.normalize("12")) == ("十二", "十二!")
+
+    manifests = [json.loads(path.read_text(encoding="utf-8")) for path in tmp_path.glob("**/manifest.json")]
+    assert sorted((manifest["graphs"], json.dumps(manifest["config"])) for manifest in manifests) == [
+        (["tagger"], "{}"),
+        (["verbalizer"], '{"suffix": "!"}'),
+        (["verbalizer"], '{"suffix": ""}'),
+    ]
+    assert [status for _, status in verify_cache(tmp_path)] == ["ok"] * 3
+
+    restored = pickle.loads(pickle.dumps(second))
+    assert restored.normalize("12") == "十二!"
+    assert SplitProcessor.builds == ["verbalizer", "rules"]
+
+
+def test_rule_cache_recompiles_only_rules_with_changed_inputs(tmp_path):
+    table = tmp_path / "table.tsv"
+    table.write_text("1\t一\n", encoding="utf-8")
+    cache_root = tmp_path / "cache"
+    TableRule.builds = []
+
+    first = RuleCacheProcessor(cache_root, os.fspath(table))
+    assert TableRule.builds == ["table", "count"]
+    assert sorted(path.suffix for path in (cache_root / ".rules").iterdir()) == [".rule"] * 3
+
+    second = RuleCacheProcessor(cache_root, os.fspath(table), suffix="!")
+    assert TableRule.builds == ["table", "count"]
+    assert (first.normalize("1个"), second.normalize("1个"), second.normalize("12")) == ("一个", "一个!", "十二!")
+
+    table.write_text("1\t壹\n", encoding="utf-8")
+    third = RuleCacheProcessor(cache_root, os.fspath(table), suffix="?")
+    assert TableRule.builds == ["table", "count"] * 2
+    assert (third.normalize("1"), third.normalize("1个"), third.normalize("12")) == ("壹?", "壹个?", "十二?")
+    assert [status for _, status in verify_cache(cache_root)] == ["ok"] * 3
+
+
+@pytest.mark.parametrize("cache_dir", ["bundle", False])
+def test_rules_compile_in_worker_processes(monkeypatch, tmp_path, cache_dir):
+    table = tmp_path / "table.tsv"
+    table.write_text("1\t一\n", encoding="utf-8")
+    cache_root = tmp_path / "cache" if cache_dir == "bundle" else False
+    monkeypatch.setenv("WETEXTPROCESSING_BUILD_JOBS", "2")
+    TableRule.builds = []
+
+    processor = RuleCacheProcessor(cache_root, os.fspath(table))
+    assert TableRule.builds == []
+    assert (processor.normalize("1个"), processor.normalize("12")) == ("一个", "十二")
+    if cache_dir == "bundle":
+        monkeypatch.delenv("WETEXTPROCESSING_BUILD_JOBS")
+        assert RuleCacheProcessor(cache_root, os.fspath(table), suffix="!").normalize("1个") == "一个!"
+        assert TableRule.builds == []
+
+
+@pytest.mark.parametrize("jobs", ["0", "two"])
+def test_build_jobs_must_be_a_positive_integer(monkeypatch, tmp_path, jobs):
+    monkeypatch.setenv("WETEXTPROCESSING_BUILD_JOBS", jobs)
+    with pytest.raises(ValueError, match="WETEXTPROCESSING_BUILD_JOBS"):
+        CountingProcessor(tmp_path)
+
+
+@pytest.mark.parametrize("cache_dir", ["bundle", False])
+def test_batch_normalization_preserves_input_order(tmp_path, cache_dir):
+    processor = LetterProcessor(tmp_path if cache_dir == "bundle" else False)
+    texts = ["a", "b", "c", "", "a"]
+
+    assert processor.normalize_batch(texts, workers=2, chunksize=1) == ["A", "B", "C", "", "A"]
+    results = processor.normalize_with_mapping_batch(texts, workers=2, chunksize=2)
+    assert [result.output_text for result in results] == ["A", "B", "C", "", "A"]
+    assert [len(result.mappings) for result in results] == [1, 1, 1, 0, 1]
+    assert processor.normalize_batch(texts, nbest=2, workers=1)[0] == ["A"]
+
+
+@pytest.mark.parametrize("workers", [0, -1, 1.5, True])
+def test_batch_workers_must_be_a_positive_integer(tmp_path, workers):
+    processor = LetterProcessor(tmp_path)
+
+    with pytest.raises(ValueError, match="workers"):
+        processor.normalize_batch(["a"], workers=workers)
+
+
+def test_result_cache_reuses_normalization_results(monkeypatch, tmp_path):
+    processor = AmbiguousProcessor(tmp_path)
+    cache = processor.enable_result_cache(maxsize=2)
+    calls = []
+    original = processor._normalization_candidates
+
+    def counting_candidates(input, nbest, **kwargs):
+        calls.append((input, nbest))
+        return original(input, nbest, **kwargs)
+
+    monkeypatch.setattr(processor, "_normalization_candidates", counting_candidates)
+
+    first = processor.normalize("input", nbest=2)
+    first.append("mutated")
+    assert processor.normalize("input", nbest=2) == ["FIRST", "SECOND"]
+    assert processor.normalize_with_mapping("input").output_text == "FIRST"
+    assert processor.normalize_with_mapping("input").output_text == "FIRST"
+    assert processor.normalize("input") == "FIRST"
+
+    assert calls == [("input", 2), ("input", 1), ("input", 1)]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 3, 1, 2)
+
+    processor.disable_result_cache()
+    processor.normalize("input")
+    assert len(calls) == 4
+
+
 def test_normalize_with_mapping_uses_tagged_token_path(tmp_path):
     processor = CountingProcessor(tmp_path, {})
 
@@ -334,6 +683,18 @@ def test_normalize_with_mapping_uses_tagged_token_path(tmp_path):
     assert result.mappings[0].output_text == "output"
 
 
+def test_one_best_mapping_reuses_the_selected_paths(monkeypatch):
+    processor = PassthroughProcessor(False)
+    processor.enable_token_memo()
+    expected = processor.normalize_with_mapping("今天12点", include_identity=True)
+    candidate = processor._best_candidate("今天12点", with_arcs=True)
+
+    monkeypatch.setattr("tn.alignment.shortestpath", lambda *args, **kwargs: pytest.fail("graph searched again"))
+
+    assert candidate.tagger_arcs is not None
+    assert processor._normalize_candidate_with_mapping("今天12点", candidate, True) == expected
+
+
 def test_normalize_with_mapping_supports_nbest(tmp_path):
     processor = AmbiguousProcessor(tmp_path)
 
@@ -375,6 +736,29 @@ def test_itn_normalize_and_mapping_share_joint_candidates():
     assert [result.mappings[0].output_text for result in results] == outputs[:2]
 
 
+@pytest.mark.parametrize("processor_type", [RawAmbiguousProcessor, WeightedJointProcessor, JointItnProcessor])
+def test_one_best_fast_path_matches_joint_ranking(monkeypatch, processor_type):
+    processor = processor_type()
+    expected = processor._joint_candidates("input", 1)[0]
+
+    def fail_stream(lattice):
+        raise AssertionError("1-best normalization must not build n-best streams")
+
+    monkeypatch.setattr("tn.processor._UniqueOutputPathStream", fail_stream)
+    candidate = processor._normalization_candidates("input", 1)[0]
+
+    assert candidate == expected
+    assert processor.normalize("input") == expected.output
+    assert processor.normalize_with_mapping("input").output_text == expected.output
+
+
+def test_one_best_falls_back_when_the_best_tag_has_no_verbalization():
+    processor = UnverbalizedBestTagProcessor()
+
+    assert processor._best_candidate("input") is None
+    assert processor.normalize("input") == "SECOND"
+
+
 def test_weighted_field_restores_original_joint_path_costs():
     processor = WeightedFieldProcessor()
 
@@ -392,7 +776,24 @@ def test_weighted_stream_projects_unique_outputs_before_expanding():
     stream = _UniqueOutputPathStream(accep(escape(tagged)) @ verbalizer)
 
     assert [stream.pop().text, stream.pop().text] == ["A", "B"]
-    assert stream._limit == 2
+    assert stream.pop() is None
+
+
+def test_stream_enumerates_outputs_incrementally_by_weight():
+    tagged = 'counting { value: "input" }'
+    outputs = ["OUT{}".format(index) for index in range(64)]
+    verbalizer = union(*[add_weight(cross(tagged, output), 63 - index) for index, output in enumerate(outputs)])
+    stream = _UniqueOutputPathStream(accep(escape(tagged)) @ verbalizer)
+
+    first = stream.pop()
+    expanded = len(stream._arcs)
+    items = [first] + [stream.pop() for _ in range(63)]
+
+    assert [item.text for item in items] == outputs[::-1]
+    assert [item.weight for item in items] == pytest.approx(list(range(64)))
+    assert [item.rank for item in items] == list(range(64))
+    assert expanded < len(tagged) + 8
+    assert stream.peek() is None
 
 
 @pytest.mark.parametrize("nbest", [0, -1, 1.5, True, None])
@@ -403,6 +804,97 @@ def test_nbest_must_be_a_positive_integer(tmp_path, nbest):
         processor.normalize("", nbest=nbest)
 
 
+@pytest.mark.parametrize("cache_dir", ["bundle", False])
+def test_passthrough_lines_skip_tagger_composition(tmp_path, cache_dir):
+    processor = PassthroughProcessor(tmp_path if cache_dir == "bundle" else False)
+
+    assert processor.trigger_alphabet == frozenset("1")
+    for text in ("今天 晴", "今天12点", "2点", "1点"):
+        assert processor.normalize(text) == processor._joint_candidates(text, 1)[0].output
+    assert set(processor._passthrough_outputs) == set("今天 晴2点")
+    assert processor.normalize("今天12点") == "今天十二点"
+
+
+def test_trigger_alphabet_is_restored_from_the_bundle(tmp_path):
+    PassthroughProcessor(tmp_path)
+
+    restored = PassthroughProcessor(tmp_path)
+    with open(restored.cache_bundles[0].manifest_path, encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    assert restored.trigger_alphabet == frozenset("1")
+    assert restored.token_alphabet == frozenset("12")
+    assert manifest["metadata"] == {
+        "token_alphabet": "12",
+        "token_orders": restored.token_parser().orders,
+        "trigger_alphabet": "1",
+    }
+
+
+def test_long_inputs_are_split_after_characters_no_token_reads():
+    processor = PassthroughProcessor(False)
+    text = "今天12点，明天112点"
+    expected = processor.normalize(text)
+    expected_mapping = processor.normalize_with_mapping(text, include_identity=True)
+
+    processor.segment_length = 4
+
+    assert processor._segments(text) == ["今天12点", "，明天112点"]
+    assert processor.normalize(text) == expected == "今天十二点，明天1十二点"
+    assert processor.normalize_with_mapping(text, include_identity=True) == expected_mapping
+
+
+def test_stream_emits_text_once_no_token_can_extend_it():
+    processor = PassthroughProcessor(False)
+    stream = processor.stream()
+
+    assert stream.feed("今天1") == "今天"
+    assert stream.pending == "1"
+    assert stream.peek() == "1"
+    assert stream.feed("2") == ""
+    assert stream.feed("点，明天11") == "十二点，明天"
+    assert stream.feed("2点") == "1十二点"
+    assert stream.finalize() == ""
+    with pytest.raises(RuntimeError):
+        stream.feed("12")
+
+    text = "今天12点，明天112点"
+    stream = processor.stream()
+    assert "".join(stream.feed(character) for character in text) + stream.flush() == processor.normalize(text)
+
+
+def test_token_memo_verbalizes_each_distinct_token_once():
+    processor = PassthroughProcessor(False)
+    text = "12点12分"
+    expected = processor.normalize(text)
+    expected_mapping = processor.normalize_with_mapping(text, include_identity=True)
+
+    memo = processor.enable_token_memo()
+
+    assert processor.normalize(text) == expected == "十二点十二分"
+    assert processor.normalize_with_mapping(text, include_identity=True) == expected_mapping
+    assert processor.verbalize(processor.tag(text)) == expected
+    assert memo.stats().misses == 3
+    assert len(memo) == 3
+
+
+def test_token_memo_falls_back_for_non_best_mapping_outputs():
+    processor = WeightedFieldProcessor()
+    expected = processor.normalize_with_mapping("input", nbest=2)
+
+    processor.enable_token_memo()
+
+    assert processor.normalize_with_mapping("input", nbest=2) == expected
+    assert [result.output_text for result in expected] == ["BEST", "ALT"]
+
+
+def test_trigger_alphabet_is_unknown_when_a_rule_accepts_empty_input():
+    empty = type("Rule", (), {"tagger": cross("", "empty"), "verbalizer": cross("empty", "")})()
+    rules = (RuleSpec(empty, 1.0), RuleSpec(Char(), 100, passthrough=True))
+
+    assert Processor("empty").build_trigger_alphabet(rules) is None
+
+
 def test_rule_inventory_requires_a_tagger_and_verbalizer():
     from tn.processor import Processor, RuleSpec
 
@@ -108,3 +108,42 @@ class TestTokenParser:
     def test_malformed_input(self, tagged):
         with pytest.raises(TokenParseError):
             self.parser.reorder(tagged)
+
+    @pytest.mark.parametrize(
+        "tagged,message",
+        [
+            ("time", "expected ' { ' at position 3, got 'e'"),
+            ("time {", "expected ' { ' at position 4, got ' '"),
+            ('time { hour: "12', "unterminated value at position 15"),
+            ('time { hour: "12\\', "unterminated escape at position 16"),
+            ("time { hour: ", "expected ': \"' at position 11, got ':'"),
+            ('time { 1: "1" }', "invalid key at position 7"),
+            ('time { hour: "1"', "unterminated token 'time'"),
+        ],
+    )
+    def test_malformed_input_reports_reader_positions(self, tagged, message):
+        with pytest.raises(TokenParseError) as error:
+            TokenParser().parse(tagged)
+        assert str(error.value) == message
+
+    def test_token_offsets_cover_serialized_tokens(self):
+        tagged = ' char { value: "\\"" }  time { hour: "两点" }'
+        parser = TokenParser()
+        parser.parse(tagged)
+
+        assert [tagged[token.start:token.end] for token in parser.tokens] == [
+            'char { value: "\\"" }',
+            'time { hour: "两点" }',
+        ]
+
+    def test_reorder_reuses_the_parsed_tokens(self):
+        tagged = 'time { minute: "零二分" hour: "两点" }'
+        parser = TokenParser()
+
+        first = parser.reorder_with_spans(tagged)
+        tokens = parser.tokens
+
+        assert parser.reorder_with_spans(tagged) is first
+        assert parser.tokens is tokens
+        assert parser.reorder('char { value: "走" }') == 'char { value: "走" }'
+        assert parser.tokens is not tokens
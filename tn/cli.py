@@ -14,9 +14,17 @@
 """Shared command-line interface for text and inverse text normalization."""
 
 import argparse
+import json
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import islice
 
 LANGUAGES = ("zh", "en", "ja")
+OUTPUTS = ("normalized", "tagged", "both", "jsonl")
+DEFAULT_SERVER_ADDRESS = "127.0.0.1:8765"
 
 
 def _parse_bool(value):
@@ -30,6 +38,26 @@ def _parse_bool(value):
     raise argparse.ArgumentTypeError("expected True or False")
 
 
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError("expected a positive integer")
+    return number
+
+
+def _server_address(value):
+    from tn.server import parse_address
+
+    try:
+        parse_address(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+    return value
+
+
 def _add_boolean(parser, name, default, help):
     """Adds a Python 3.7-compatible boolean optional argument.
 
@@ -70,6 +98,33 @@ def _add_common_arguments(parser):
         help="rebuild the selected FST cache bundle",
     )
     parser.add_argument("--language", choices=LANGUAGES, default="zh", help="input language (default: zh)")
+    parser.add_argument(
+        "--output",
+        choices=OUTPUTS,
+        default="both",
+        help="print the normalized text, the tagged text, both (default), or JSON records with token mappings",
+    )
+    parser.add_argument(
+        "--nbest",
+        type=_positive_int,
+        default=1,
+        metavar="K",
+        help="with --output jsonl, print a list of the K best records per line (default: 1)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="normalize input lines in N worker processes, keeping input order (default: 1)",
+    )
+    parser.add_argument(
+        "--server",
+        type=_server_address,
+        default=None,
+        metavar="ADDRESS",
+        help="send input to a running `serve` process at HOST:PORT or unix:PATH",
+    )
 
 
 def _add_tn_arguments(parser, language):
@@ -116,6 +171,17 @@ def create_parser(direction, language="zh"):
     return parser
 
 
+def _pipeline_defaults(direction, language):
+    """Returns the default value of every pipeline option, keyed by name."""
+
+    parser = argparse.ArgumentParser(add_help=False)
+    if direction == "tn":
+        _add_tn_arguments(parser, language)
+    else:
+        _add_itn_arguments(parser, language)
+    return vars(parser.parse_args([]))
+
+
 def _selected_language(argv):
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("--language", choices=LANGUAGES, default="zh")
@@ -179,6 +245,186 @@ def create_processor(direction, args):
     return InverseNormalizer(**common)
 
 
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+
+def _parse_size(value):
+    from tn.cache import parse_size
+
+    try:
+        return parse_size(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError("expected a size such as 512M or 2G") from error
+
+
+def _parse_duration(value):
+    amount, unit = (value[:-1], value[-1]) if value[-1:] in _DURATION_UNITS else (value, "s")
+    try:
+        seconds = float(amount) * _DURATION_UNITS[unit]
+    except ValueError as error:
+        raise argparse.ArgumentTypeError("expected a duration such as 30d or 12h") from error
+    if not seconds >= 0:
+        raise argparse.ArgumentTypeError("expected a non-negative duration")
+    return seconds
+
+
+def create_cache_parser(direction="tn", language="zh"):
+    """Builds the parser for the ``cache`` maintenance subcommands.
+
+    ``direction`` and ``language`` select the pipeline options that
+    ``export`` accepts.
+    """
+
+    parser = argparse.ArgumentParser(description="WeTextProcessing FST cache maintenance")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    verify = commands.add_parser("verify", help="re-hash every cache bundle and refresh its integrity stamp")
+    listing = commands.add_parser("list", help="list cache entries, least recently used first")
+    stats = commands.add_parser("stats", help="summarize the number and size of cache entries")
+    gc = commands.add_parser("gc", help="evict least recently used cache entries")
+    gc.add_argument("--max_size", "--max-size", type=_parse_size, default=None, help="keep at most SIZE bytes, e.g. 2G")
+    gc.add_argument("--max_age",
+                    "--max-age",
+                    type=_parse_duration,
+                    default=None,
+                    help="evict entries unused for AGE, e.g. 30d or 12h")
+    purge = commands.add_parser("purge", help="remove every cache entry that is not in use")
+    export = commands.add_parser("export", help="build or load one pipeline and pack its bundles into a tar file")
+    export.add_argument("-o", "--output", required=True, help="archive path, e.g. bundle.tar")
+    runtime = commands.add_parser("export-runtime", help="build or load one pipeline and write its graphs for the C++ runtime")
+    runtime.add_argument("-o", "--output", required=True, help="output directory")
+    for command in (export, runtime):
+        command.add_argument("--direction", choices=("tn", "itn"), default="tn", help="pipeline direction (default: tn)")
+        command.add_argument("--language", choices=LANGUAGES, default="zh", help="pipeline language (default: zh)")
+        command.set_defaults(overwrite_cache=False)
+        if direction == "tn":
+            _add_tn_arguments(command, language)
+        else:
+            _add_itn_arguments(command, language)
+    imported = commands.add_parser("import", help="install the bundles of an exported tar file")
+    imported.add_argument("archive", help="archive written by cache export")
+    for command in (verify, listing, stats, gc, purge, export, runtime, imported):
+        command.add_argument("--cache_dir", "--cache-dir", default=None, help="FST cache root")
+    return parser
+
+
+def _selected_pipeline(argv):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--direction", choices=("tn", "itn"), default="tn")
+    parser.add_argument("--language", choices=LANGUAGES, default="zh")
+    args, _ = parser.parse_known_args(argv)
+    return args.direction, args.language
+
+
+def _print_evictions(results, stdout):
+    for entry, status in results:
+        print("{}\t{}".format(status, entry.path), file=stdout)
+    if any(status == "failed" for _, status in results):
+        raise SystemExit(1)
+    return results
+
+
+def run_cache(argv, stdout=None, processor_factory=create_processor):
+    """Runs a ``cache`` subcommand and returns its results."""
+
+    from tn.cache import (CacheError, collect_garbage, export_bundles, export_runtime, import_bundles, list_cache,
+                          verify_cache)
+
+    parser = create_cache_parser(*_selected_pipeline(argv))
+    args = parser.parse_args(argv)
+    stdout = sys.stdout if stdout is None else stdout
+    if args.command in ("export", "export-runtime", "import"):
+        try:
+            if args.command != "import":
+                processor = processor_factory(args.direction, args)
+                export = export_bundles if args.command == "export" else export_runtime
+                results = [(path, "exported") for path in export(processor.cache_bundles, args.output)]
+            else:
+                results = import_bundles(args.archive, args.cache_dir)
+        except (OSError, CacheError, ValueError) as error:
+            parser.error(str(error))
+        for path, status in results:
+            print("{}\t{}".format(status, path), file=stdout)
+        if any(status == "stale" for _, status in results):
+            raise SystemExit(1)
+        return results
+    if args.command == "verify":
+        results = verify_cache(args.cache_dir)
+        for path, status in results:
+            print("{}\t{}".format(status, path), file=stdout)
+        if any(status == "corrupt" for _, status in results):
+            raise SystemExit(1)
+        return results
+    if args.command == "gc":
+        if args.max_size is None and args.max_age is None:
+            parser.error("cache gc requires --max-size or --max-age")
+        return _print_evictions(collect_garbage(args.cache_dir, max_size=args.max_size, max_age=args.max_age), stdout)
+    if args.command == "purge":
+        return _print_evictions(collect_garbage(args.cache_dir, max_size=0), stdout)
+
+    entries = sorted(list_cache(args.cache_dir), key=lambda entry: entry.last_used)
+    if args.command == "list":
+        for entry in entries:
+            last_used = datetime.fromtimestamp(entry.last_used).isoformat(timespec="seconds")
+            print("{}\t{}\t{}\t{}".format(entry.kind, entry.size, last_used, entry.path), file=stdout)
+        return entries
+    totals = {}
+    for kind in ("bundle", "residual", "rule"):
+        selected = [entry for entry in entries if entry.kind == kind]
+        totals[kind] = (len(selected), sum(entry.size for entry in selected))
+    totals["total"] = (len(entries), sum(entry.size for entry in entries))
+    for kind, (count, size) in totals.items():
+        print("{}\t{}\t{}".format(kind, count, size), file=stdout)
+    return totals
+
+
+def _pipeline_spec(value):
+    direction, separator, language = value.partition(":")
+    if not separator or direction not in ("tn", "itn") or language not in LANGUAGES:
+        raise argparse.ArgumentTypeError("expected DIRECTION:LANGUAGE such as tn:zh")
+    return direction, language
+
+
+def create_serve_parser(direction="tn"):
+    parser = argparse.ArgumentParser(prog="serve", description="Serve preloaded normalization pipelines to CLI clients")
+    parser.add_argument("--listen",
+                        type=_server_address,
+                        default=DEFAULT_SERVER_ADDRESS,
+                        metavar="ADDRESS",
+                        help="HOST:PORT or unix:PATH to listen on (default: {})".format(DEFAULT_SERVER_ADDRESS))
+    parser.add_argument("--cache_dir", "--cache-dir", default=None, help="FST cache root")
+    parser.add_argument("--preload",
+                        action="append",
+                        type=_pipeline_spec,
+                        metavar="DIRECTION:LANGUAGE",
+                        help="load a pipeline with default options at start-up; repeatable (default: {}:zh)".format(direction))
+    return parser
+
+
+def run_serve(direction, argv, stdout=None, processor_factory=create_processor):
+    """Serves until interrupted; other pipelines load on their first request."""
+
+    from tn.server import NormalizationServer
+
+    parser = create_serve_parser(direction)
+    args = parser.parse_args(argv)
+    stdout = sys.stdout if stdout is None else stdout
+    try:
+        server = NormalizationServer(args.listen, args.cache_dir, processor_factory)
+    except OSError as error:
+        parser.error(str(error))
+    try:
+        for pipeline in args.preload or [(direction, "zh")]:
+            server.preload(*pipeline)
+        print("listening\t{}".format(server.address), file=stdout, flush=True)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return server
+
+
 def _without_line_ending(line):
     if line.endswith("\n"):
         line = line[:-1]
@@ -189,33 +435,150 @@ def _without_line_ending(line):
     return line
 
 
-def _process_line(processor, text, stdout):
+def _format_normalized(processor, text):
+    return processor.normalize(text) + "\n"
+
+
+def _format_tagged(processor, text):
+    return processor.tag(text) + "\n"
+
+
+def _format_both(processor, text):
     tagged = processor.tag(text)
-    print(tagged, file=stdout)
-    print(processor.verbalize(tagged), file=stdout)
+    return "{}\n{}\n".format(tagged, processor.verbalize(tagged))
+
+
+def _format_jsonl(processor, text, nbest=1):
+    result = processor.normalize_with_mapping(text, nbest=nbest)
+    record = result.as_dict() if nbest == 1 else [candidate.as_dict() for candidate in result]
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+_OUTPUT_FORMATS = {
+    "normalized": _format_normalized,
+    "tagged": _format_tagged,
+    "both": _format_both,
+    "jsonl": _format_jsonl,
+}
+
+
+def _line_formatter(args):
+    """Returns a picklable ``(processor, text) -> str`` for ``--output``.
+
+    Each mode runs only the stages it prints: ``normalized`` takes the joint
+    ``normalize`` path and ``tagged`` never runs the verbalizer.
+    """
+
+    if args.output == "jsonl":
+        return partial(_format_jsonl, nbest=args.nbest)
+    return _OUTPUT_FORMATS[args.output]
+
+
+# Lines are sent to workers or a server in chunks of this size, and at most
+# two chunks per worker are in flight, so memory stays bounded for any input.
+_CHUNK_LINES = 256
+_worker_processor = None
+_worker_formatter = None
+
+
+def _initialize_worker(processor, formatter):
+    global _worker_processor, _worker_formatter
+    _worker_processor = processor
+    _worker_formatter = formatter
+
+
+def _format_chunk(lines):
+    return "".join(_worker_formatter(_worker_processor, _without_line_ending(line)) for line in lines)
+
+
+def _chunks(lines):
+    lines = iter(lines)
+    return iter(lambda: list(islice(lines, _CHUNK_LINES)), [])
+
+
+def _process_lines(processor, formatter, lines, stdout, jobs):
+    if jobs == 1:
+        for line in lines:
+            stdout.write(formatter(processor, _without_line_ending(line)))
+        return
+
+    pending = deque()
+    # Each worker unpickles the processor once, which reloads its graphs
+    # from the published cache bundle instead of rebuilding them.
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_initialize_worker, initargs=(processor, formatter)) as executor:
+        try:
+            for chunk in _chunks(lines):
+                if len(pending) >= 2 * jobs:
+                    stdout.write(pending.popleft().result())
+                pending.append(executor.submit(_format_chunk, chunk))
+            while pending:
+                stdout.write(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _run_client(direction, args, stdin, stdout):
+    from tn.server import NormalizationClient, ServerError
+
+    parser = create_parser(direction, args.language)
+    if args.jobs != 1 or args.cache_dir is not None or args.overwrite_cache:
+        parser.error("--server cannot be combined with --jobs, --cache_dir or --overwrite_cache")
+    options = {name: getattr(args, name) for name in _pipeline_defaults(direction, args.language)}
+    client = NormalizationClient(args.server)
+
+    def send(texts):
+        stdout.write("".join(client.normalize(texts, direction, args.language, options, args.output, args.nbest)))
+
+    try:
+        if args.text is not None:
+            send([args.text])
+        elif args.file is not None:
+            with open(args.file, encoding="utf-8") as input_file:
+                for chunk in _chunks(input_file):
+                    send([_without_line_ending(line) for line in chunk])
+        else:
+            for chunk in _chunks(stdin):
+                send([_without_line_ending(line) for line in chunk])
+    except (OSError, ServerError) as error:
+        parser.error(str(error))
+    finally:
+        client.close()
+    return client
 
 
 def run(direction, argv=None, stdin=None, stdout=None, processor_factory=create_processor):
-    """Runs a CLI entry point and returns the constructed processor."""
+    """Runs a CLI entry point and returns the constructed processor.
 
+    ``serve`` returns the stopped server and ``--server`` the client.
+    """
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["cache"]:
+        return run_cache(argv[1:], stdout, processor_factory)
+    if argv[:1] == ["serve"]:
+        return run_serve(direction, argv[1:], stdout, processor_factory)
     args = parse_args(direction, argv)
     stdin = sys.stdin if stdin is None else stdin
     stdout = sys.stdout if stdout is None else stdout
+    if args.nbest > 1 and args.output != "jsonl":
+        create_parser(direction, args.language).error("--nbest requires --output jsonl")
+    if args.server is not None:
+        return _run_client(direction, args, stdin, stdout)
     processor = processor_factory(direction, args)
+    formatter = _line_formatter(args)
 
     if args.text is not None:
-        _process_line(processor, args.text, stdout)
+        stdout.write(formatter(processor, args.text))
         return processor
 
     if args.file is not None:
         try:
             with open(args.file, encoding="utf-8") as input_file:
-                for line in input_file:
-                    _process_line(processor, _without_line_ending(line), stdout)
+                _process_lines(processor, formatter, input_file, stdout, args.jobs)
         except OSError as error:
             create_parser(direction, args.language).error(str(error))
         return processor
 
-    for line in stdin:
-        _process_line(processor, _without_line_ending(line), stdout)
+    _process_lines(processor, formatter, stdin, stdout, args.jobs)
     return processor
@@ -46,21 +46,21 @@ class Normalizer(Processor):
         self.build_fst("en_tn", cache_dir, overwrite_cache, {})
 
     def build_tagger_and_verbalizer(self):
-        cardinal = Cardinal()
-        ordinal = Ordinal(cardinal=cardinal)
-        decimal = Decimal(cardinal=cardinal)
-        fraction = Fraction(cardinal=cardinal, ordinal=ordinal)
-        punctuation = Punctuation()
-        date = Date(cardinal=cardinal, ordinal=ordinal)
-        time = Time(cardinal=cardinal)
-        measure = Measure(cardinal=cardinal, decimal=decimal, fraction=fraction, ordinal=ordinal)
-        money = Money(cardinal=cardinal, decimal=decimal)
-        telephone = Telephone()
-        electronic = Electronic(cardinal=cardinal)
-        serial = Serial(cardinal=cardinal, ordinal=ordinal)
-        word = Word(punctuation=punctuation)
-        whitelist = WhiteList()
-        rang = Range(date=date, time=time)
+        cardinal = self.compile_rule(Cardinal)
+        ordinal = self.compile_rule(Ordinal, cardinal=cardinal)
+        decimal = self.compile_rule(Decimal, cardinal=cardinal)
+        fraction = self.compile_rule(Fraction, cardinal=cardinal, ordinal=ordinal)
+        punctuation = self.compile_rule(Punctuation)
+        date = self.compile_rule(Date, cardinal=cardinal, ordinal=ordinal)
+        time = self.compile_rule(Time, cardinal=cardinal)
+        measure = self.compile_rule(Measure, cardinal=cardinal, decimal=decimal, fraction=fraction, ordinal=ordinal)
+        money = self.compile_rule(Money, cardinal=cardinal, decimal=decimal)
+        telephone = self.compile_rule(Telephone)
+        electronic = self.compile_rule(Electronic, cardinal=cardinal)
+        serial = self.compile_rule(Serial, cardinal=cardinal, ordinal=ordinal)
+        word = self.compile_rule(Word, punctuation=punctuation)
+        whitelist = self.compile_rule(WhiteList)
+        rang = self.compile_rule(Range, date=date, time=time)
 
         rules = (
             RuleSpec(cardinal, 1.0),
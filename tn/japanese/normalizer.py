@@ -52,6 +52,7 @@ class Normalizer(Processor):
         tag_oov=False,
     ):
         super().__init__(name="ja_normalizer", token_orders=TOKEN_ORDERS)
+        self.enable_token_memo()
         self.transliterate = transliterate
         self.remove_interjections = remove_interjections
         self.remove_puncts = remove_puncts
@@ -68,25 +69,26 @@ class Normalizer(Processor):
                 "tag_oov": self.tag_oov,
                 "transliterate": self.transliterate,
             },
+            tagger_options=("full_to_half", "transliterate"),
         )
 
-    def build_tagger_and_verbalizer(self):
-        input_normalizer = PreProcessor(full_to_half=self.full_to_half).processor
-        cardinal = Cardinal(input_normalizer=input_normalizer)
-        char = Char()
-        range_rule = Range(input_normalizer=input_normalizer)
-        date = Date(cardinal=cardinal, input_normalizer=input_normalizer, range_tagger=range_rule.tagger)
-        fraction = Fraction(cardinal=cardinal, input_normalizer=input_normalizer)
-        math = Math(cardinal=cardinal, input_normalizer=input_normalizer)
-        measure = Measure(cardinal=cardinal, input_normalizer=input_normalizer)
-        money = Money(cardinal=cardinal, input_normalizer=input_normalizer)
-        sport = Sport(cardinal=cardinal, input_normalizer=input_normalizer)
-        time = Time(input_normalizer=input_normalizer, range_tagger=range_rule.tagger)
-        whitelist = Whitelist(input_normalizer=input_normalizer)
+    def build_rules(self):
+        input_normalizer = self.compile_rule(PreProcessor, full_to_half=self.full_to_half).processor
+        cardinal = self.compile_rule(Cardinal, input_normalizer=input_normalizer)
+        char = self.compile_rule(Char)
+        range_rule = self.compile_rule(Range, input_normalizer=input_normalizer)
+        date = self.compile_rule(Date, cardinal=cardinal, input_normalizer=input_normalizer, range_tagger=range_rule.tagger)
+        fraction = self.compile_rule(Fraction, cardinal=cardinal, input_normalizer=input_normalizer)
+        math = self.compile_rule(Math, cardinal=cardinal, input_normalizer=input_normalizer)
+        measure = self.compile_rule(Measure, cardinal=cardinal, input_normalizer=input_normalizer)
+        money = self.compile_rule(Money, cardinal=cardinal, input_normalizer=input_normalizer)
+        sport = self.compile_rule(Sport, cardinal=cardinal, input_normalizer=input_normalizer)
+        time = self.compile_rule(Time, input_normalizer=input_normalizer, range_tagger=range_rule.tagger)
+        whitelist = self.compile_rule(Whitelist, input_normalizer=input_normalizer)
 
         rules = [
             RuleSpec(cardinal, 1.06),
-            RuleSpec(char, 100),
+            RuleSpec(char, 100, passthrough=True),
             RuleSpec(date, 1.02),
             RuleSpec(fraction, 1.05),
             RuleSpec(math, 90),
@@ -98,14 +100,22 @@ class Normalizer(Processor):
             RuleSpec(range_rule),
         ]
         if self.transliterate:
-            transliteration = Transliteration(input_normalizer=input_normalizer)
+            transliteration = self.compile_rule(Transliteration, input_normalizer=input_normalizer)
             rules.append(RuleSpec(transliteration, 1.04))
+        return rules
+
+    def build_tagger(self):
+        rules = self.rule_specs()
         tagger = self.tagger_union(rules).star
         self.tagger = tagger @ self.build_rule(delete(" "), r="[EOS]")
+        self.trigger_alphabet = self.build_trigger_alphabet(rules)
+        self.token_alphabet = self.build_token_alphabet(rules)
 
-        verbalizer = self.verbalizer_union(rules)
+    def build_verbalizer(self):
+        verbalizer = self.verbalizer_union(self.rule_specs())
 
-        postprocessor = PostProcessor(
+        postprocessor = self.compile_rule(
+            PostProcessor,
             remove_interjections=self.remove_interjections,
             remove_puncts=self.remove_puncts,
             full_to_half=self.full_to_half,
@@ -14,16 +14,27 @@
 
 import heapq
 import logging
+import math
+import os
 import string
-from dataclasses import dataclass
+import struct
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import partial
 from typing import Optional
 
-from pynini import accep, cdrewrite, cross, difference, escape, invert, shortestpath, union
+from pynini import (accep, cdrewrite, cross, determinize, difference, escape, invert, shortestdistance, shortestpath, union)
 from pynini.lib import byte, utf8
 from pynini.lib.pynutil import add_weight, delete, insert
 
-from tn.alignment import NormalizationMapping, NormalizationResult, trace_input_spans, transduce_with_spans
+from tn.alignment import (NormalizationMapping, NormalizationResult, path_arcs, trace_input_spans, transduce_with_spans)
+from tn.async_executor import AsyncExecutor
 from tn.cache import CacheBundle, default_cache_dir, production_source_fingerprint
+from tn.result_cache import LRUCache
+from tn.rule_cache import RuleCache, configured_build_jobs
+from tn.streaming import NormalizationStream
 from tn.token_parser import TokenParser
 
 logger = logging.getLogger("wetext")
@@ -36,11 +47,16 @@ if not logger.handlers:
 
 @dataclass(frozen=True)
 class RuleSpec:
-    """One pipeline rule and its top-level classifier weight."""
+    """One pipeline rule and its top-level classifier weight.
+
+    ``passthrough`` marks the catch-all rule that tags one character per
+    token; every other rule contributes to the pipeline's trigger alphabet.
+    """
 
     rule: object
     tagger_weight: Optional[float] = None
     verbalize: bool = True
+    passthrough: bool = False
 
 
 @dataclass(frozen=True)
@@ -48,6 +64,8 @@ class _WeightedOutput:
     text: str
     weight: float
     rank: int
+    # ``path_arcs()`` of one path producing ``text``, when requested.
+    arcs: Optional[tuple] = field(default=None, compare=False, repr=False)
 
 
 @dataclass(frozen=True)
@@ -59,64 +77,241 @@ class _NormalizationCandidate:
     best_verbalizer_weight: float
     tagger_rank: int
     verbalizer_rank: int
+    # The parser that reordered ``tagged``; mapping reuses its tokens.
+    parser: Optional[TokenParser] = field(default=None, compare=False, repr=False)
+    # Selected tagger and verbalizer paths; span tracing reuses them.
+    tagger_arcs: Optional[tuple] = field(default=None, compare=False, repr=False)
+    verbalizer_arcs: Optional[tuple] = field(default=None, compare=False, repr=False)
 
     @property
     def weight(self):
-        return self.tagger_weight + self.verbalizer_weight - self.best_verbalizer_weight
+        # The best verbalization of each tag adds exactly zero.
+        return self.tagger_weight + (self.verbalizer_weight - self.best_verbalizer_weight)
+
+
+def _float32(weight):
+    """Returns the exact single-precision value OpenFst stores for a weight."""
+
+    return struct.unpack("f", struct.pack("f", float(weight)))[0]
+
+
+def _times(first, second):
+    """Multiplies tropical weights with OpenFst's single-precision rounding."""
+
+    return _float32(first + second)
+
+
+def _best_path(lattice, with_arcs=False):
+    """Returns the 1-best output and weight of a freshly composed lattice.
+
+    The lattice is projected in place rather than copied. The weight is
+    rounded to single precision, as OpenFst stores it. ``with_arcs`` also
+    keeps the arcs of the best unprojected path when it produces the same
+    output, so span tracing need not compose the lattice again.
+    """
+
+    arcs = None
+    if with_arcs:
+        transducer_path = shortestpath(lattice)
+        if transducer_path.start() != -1:
+            arcs = path_arcs(transducer_path)
+    lattice.project("output").rmepsilon()
+    path = shortestpath(lattice, nshortest=1, unique=True)
+    if path.start() == -1:
+        return None
+    paths = path.paths()
+    output = paths.ostring()
+    if arcs is not None and bytes(olabel for _, olabel in arcs if olabel) != output.encode("utf-8"):
+        arcs = None
+    return _WeightedOutput(output, _float32(paths.weight()), 0, arcs)
 
 
 class _UniqueOutputPathStream:
-    """Lazily expands exact unique-output shortest paths without a fixed beam."""
+    """Lazily enumerates unique-output paths in order of increasing weight.
+
+    The output projection is determinized once, so every output string has
+    exactly one path carrying its best weight. A best-first search guided by
+    exact distances to the final states then resumes on every ``pop()``:
+    n outputs cost one determinization plus n incremental path extensions
+    instead of repeated shortest-path searches from scratch. The first item
+    comes from ``shortestpath`` itself, so equal-weight ties resolve exactly
+    as in the 1-best result.
+    """
+
+    _COMPLETE = -1
 
     def __init__(self, lattice):
-        self._lattice = lattice.copy()
-        self._lattice.project("output").rmepsilon()
-        self._items = []
-        self._yielded = set()
+        self._first = _best_path(lattice)
+        self._fst = determinize(lattice)
+        self._distances = [float(weight) for weight in shortestdistance(self._fst, reverse=True)]
+        self._arcs = {}
+        self._heap = []
+        self._serial = 0
         self._next_rank = 0
-        self._limit = 0
-        self._exhausted = False
-
-    def _expand(self):
-        if self._exhausted:
-            return
-        limit = 1 if self._limit == 0 else self._limit * 2
-        shortest = shortestpath(self._lattice, nshortest=limit, unique=True)
-        paths = shortest.paths()
-        items = []
-        seen = set()
-        path_count = 0
-        while not paths.done():
-            path_count += 1
-            output = paths.ostring()
-            weight = float(paths.weight())
-            if output not in seen and output not in self._yielded:
-                seen.add(output)
-                items.append(_WeightedOutput(output, weight, -1))
-            paths.next()
-        self._items = items
-        self._limit = limit
-        if path_count < limit:
-            self._exhausted = True
+        self._item = None
+        start = self._fst.start()
+        if start != -1 and self._distance(start) != math.inf:
+            self._push(self._distance(start), start, 0.0, None)
+
+    def _distance(self, state):
+        return self._distances[state] if state < len(self._distances) else math.inf
+
+    def _push(self, priority, state, weight, labels):
+        heapq.heappush(self._heap, (priority, self._serial, state, weight, labels))
+        self._serial += 1
+
+    def _state_arcs(self, state):
+        arcs = self._arcs.get(state)
+        if arcs is None:
+            arcs = []
+            for arc in self._fst.arcs(state):
+                distance = self._distance(arc.nextstate)
+                if distance != math.inf:
+                    arcs.append((arc.olabel, _float32(arc.weight), arc.nextstate, distance))
+            self._arcs[state] = arcs
+        return arcs
+
+    def _advance(self):
+        if self._next_rank == 0:
+            return self._first
+        while self._heap:
+            priority, _, state, weight, labels = heapq.heappop(self._heap)
+            if state == self._COMPLETE:
+                output = bytearray()
+                while labels is not None:
+                    label, labels = labels
+                    output.append(label)
+                output.reverse()
+                text = output.decode("utf-8")
+                if text == self._first.text:
+                    continue
+                return _WeightedOutput(text, weight, self._next_rank)
+
+            final_weight = _float32(self._fst.final(state))
+            if final_weight != math.inf:
+                path_weight = _times(weight, final_weight)
+                self._push(path_weight, self._COMPLETE, path_weight, labels)
+            for label, arc_weight, nextstate, distance in self._state_arcs(state):
+                path_labels = (label, labels) if label else labels
+                path_weight = _times(weight, arc_weight)
+                self._push(path_weight + distance, nextstate, path_weight, path_labels)
+        return None
 
     def peek(self):
-        while not self._items and not self._exhausted:
-            self._expand()
-        if not self._items:
-            return None
-        item = self._items[0]
-        return _WeightedOutput(item.text, item.weight, self._next_rank)
+        if self._item is None:
+            self._item = self._advance()
+        return self._item
 
     def pop(self):
         item = self.peek()
         if item is not None:
-            self._yielded.add(item.text)
-            self._items.pop(0)
+            self._item = None
             self._next_rank += 1
         return item
 
 
+def _input_characters(acceptor, limit, first_only=False):
+    """Returns the characters read by an epsilon-free byte acceptor.
+
+    ``first_only`` restricts the result to characters that can start an
+    accepted string. Returns ``None`` when the acceptor accepts the empty
+    string, reads invalid UTF-8, or reads more than ``limit`` characters.
+    """
+
+    start = acceptor.start()
+    if start == -1:
+        return set()
+    if float(acceptor.final(start)) != math.inf:
+        return None
+    characters = set()
+    visited = {(start, b"")}
+    stack = [(start, b"")]
+    while stack:
+        state, prefix = stack.pop()
+        for arc in acceptor.arcs(state):
+            encoded = prefix + bytes((arc.ilabel, ))
+            try:
+                characters.add(encoded.decode("utf-8"))
+            except UnicodeDecodeError as error:
+                if error.reason != "unexpected end of data":
+                    return None
+                following = (arc.nextstate, encoded)
+            else:
+                if len(characters) > limit:
+                    return None
+                if first_only:
+                    continue
+                following = (arc.nextstate, b"")
+            if following not in visited:
+                visited.add(following)
+                stack.append(following)
+    return characters
+
+
+class _SharedGraphs:
+    """The loaded graphs of one bundle, shared by every processor using it.
+
+    Processors hold the strong references; the registry only maps a bundle
+    path, which ends in its digest, to a live holder, so graphs are freed
+    with their last processor.
+    """
+
+    __slots__ = ("graphs", "metadata", "__weakref__")
+
+    def __init__(self, graphs, metadata):
+        self.graphs = graphs
+        self.metadata = metadata
+
+
+_SHARED_GRAPHS = weakref.WeakValueDictionary()
+_SHARED_GRAPHS_LOCK = threading.Lock()
+
+
+def _share_graphs(bundle, graphs, replace=False):
+    shared = _SharedGraphs(dict(zip(bundle.graphs, graphs)), dict(bundle.metadata))
+    with _SHARED_GRAPHS_LOCK:
+        if replace:
+            _SHARED_GRAPHS[bundle.path] = shared
+            return shared
+        return _SHARED_GRAPHS.setdefault(bundle.path, shared)
+
+
+_MISSING = object()
+_ALPHABET_LIMIT = 65536
+_PASSTHROUGH_MEMO_LIMIT = 65536
+_worker_processor = None
+
+
+def _initialize_worker(processor):
+    global _worker_processor
+    _worker_processor = processor
+
+
+def _call_worker(method, kwargs, text):
+    return getattr(_worker_processor, method)(text, **kwargs)
+
+
 class Processor:
+    """Base class of every normalization pipeline.
+
+    Thread safety: once built, a processor may be shared by any number of
+    threads calling ``tag``, ``verbalize``, ``normalize``,
+    ``normalize_with_mapping``, their batch and async variants, and
+    ``stream``. Graphs are only read, each call keeps its search state local,
+    and the result cache and token memo are locked LRU caches. Building,
+    ``enable_*``/``disable_*``, ``configure_async`` and assigning attributes
+    are configuration and must not race with calls. A ``NormalizationStream``
+    belongs to one thread at a time.
+
+    Pynini holds the GIL during composition and shortest-path search, so
+    threads overlap waiting but not normalization work itself. For CPU
+    parallelism, use worker processes: ``normalize_batch``,
+    ``configure_async("process")`` or the CLI's ``--jobs``.
+    """
+
+    # Star pipelines with a token alphabet normalize longer 1-best inputs in
+    # segments of at least this many characters; ``None`` disables splitting.
+    segment_length = 256
 
     def __init__(self, name, ordertype="tn", token_orders=None):
         self.ALPHA = byte.ALPHA
@@ -146,6 +341,43 @@ class Processor:
         self.token_orders = token_orders
         self.tagger = None
         self.verbalizer = None
+        self.cache_bundles = ()
+        self._shared_graphs = ()
+        self._rule_specs = None
+        self._rule_cache = None
+        self.result_cache = None
+        self.trigger_alphabet = None
+        self.token_alphabet = None
+        self.token_memo = None
+        self._passthrough_outputs = {}
+        self._reset_transient()
+
+    # Per-process attributes that are neither pickled nor rule cached.
+    _TRANSIENT = ("_async_executor", "_async_executor_lock")
+
+    def _reset_transient(self):
+        self._async_executor = None
+        self._async_executor_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Graphs backed by a verified bundle are reloaded from disk rather
+        # than serialized, so worker processes share the published cache.
+        state = self.__dict__.copy()
+        state["_shared_graphs"] = ()
+        for name in self._TRANSIENT:
+            del state[name]
+        if state.get("cache_bundles"):
+            state["tagger"] = None
+            state["verbalizer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_transient()
+        if self.tagger is None:
+            for bundle in self.cache_bundles:
+                if not self._load_bundle(bundle):
+                    raise RuntimeError("cache bundle is no longer loadable: {}".format(bundle.path))
 
     @staticmethod
     def tagger_union(rule_specs):
@@ -165,6 +397,43 @@ class Processor:
             raise ValueError("rule inventory must contain at least one verbalizer")
         return union(*verbalizers).optimize()
 
+    def _rule_alphabet(self, rule_specs, first_only):
+        characters = set()
+        for spec in rule_specs:
+            if spec.tagger_weight is None:
+                continue
+            source = spec.rule.tagger.copy().project("input").rmepsilon()
+            if spec.passthrough:
+                # Single characters stay passthrough; longer inputs count.
+                source = difference(source, self.VCHAR).rmepsilon()
+            rule_characters = _input_characters(source, _ALPHABET_LIMIT, first_only)
+            if rule_characters is None:
+                return None
+            characters |= rule_characters
+        return frozenset(characters)
+
+    def build_trigger_alphabet(self, rule_specs):
+        """Returns every character that can start a non-passthrough token.
+
+        Only pipelines whose tagger is a star over this inventory and whose
+        verbalizer is a star over tokens may use it: a line without trigger
+        characters is then tagged one passthrough token per character, and
+        ``normalize`` can verbalize it character by character. Returns
+        ``None`` when no such bound can be proven.
+        """
+
+        return self._rule_alphabet(rule_specs, first_only=True)
+
+    def build_token_alphabet(self, rule_specs):
+        """Returns every character that a non-passthrough token can read.
+
+        Under the same conditions as ``build_trigger_alphabet``, no token
+        spans any other character, so long inputs can be split right after
+        one and normalized segment by segment.
+        """
+
+        return self._rule_alphabet(rule_specs, first_only=False)
+
     def token_parser(self):
         """Returns a parser configured by the owning pipeline."""
 
@@ -218,79 +487,191 @@ class Processor:
     def build_verbalizer(self):
         self.verbalizer = self.delete_tokens(self.verbalize_field("value"))
 
+    def rule_specs(self):
+        """Returns the pipeline's ``build_rules()`` inventory.
+
+        ``build_tagger`` and ``build_verbalizer`` share one inventory during
+        ``build_fst``, so building both constructs every rule once.
+        """
+
+        if self._rule_specs is None:
+            self._rule_specs = self.build_rules()
+        return self._rule_specs
+
+    def compile_rule(self, rule_type, *args, **kwargs):
+        """Returns ``rule_type(*args, **kwargs)`` for a pipeline's rules.
+
+        While ``build_fst`` builds into a persistent cache, the rule's graphs
+        are reused from the rule cache unless its data files, arguments, or
+        dependency rules changed, so editing one rule's data recompiles only
+        that rule and the rules built from it.
+
+        With ``WETEXTPROCESSING_BUILD_JOBS=N`` above one, rules are compiled
+        in N worker processes while the pipeline goes on; the returned rule
+        may then be a ``PendingRule`` whose attribute reads wait for it.
+        """
+
+        if self._rule_cache is None:
+            return rule_type(*args, **kwargs)
+        return self._rule_cache.compile(rule_type, args, kwargs)
+
+    _ALPHABET_METADATA = ("trigger_alphabet", "token_alphabet")
+
+    def _graph_metadata(self):
+        metadata = {}
+        for name in self._ALPHABET_METADATA:
+            alphabet = getattr(self, name)
+            if alphabet is not None:
+                metadata[name] = "".join(sorted(alphabet))
+        return metadata
+
+    def _restore_graph_metadata(self, metadata):
+        for name in self._ALPHABET_METADATA:
+            alphabet = metadata.get(name)
+            setattr(self, name, frozenset(alphabet) if isinstance(alphabet, str) else None)
+
     @staticmethod
-    def _source_fingerprint(prefix):
+    def _source_fingerprint(prefix, cache_root=None):
         del prefix
-        return production_source_fingerprint()
-
-    def build_fst(self, prefix, cache_dir, overwrite_cache, cache_config=None):
-        """Loads or atomically builds a content-addressed graph bundle.
+        return production_source_fingerprint(sidecar_dir=cache_root)
+
+    def _build_graphs(self, names):
+        logger.info("building {} fst for {} ...".format(" and ".join(names), self.name))
+        rule_cache = self._rule_cache
+        if rule_cache is not None:
+            reused, compiled = rule_cache.reused, rule_cache.compiled
+        if hasattr(self, 'build_tagger_and_verbalizer'):
+            self.build_tagger_and_verbalizer()
+        else:
+            for name in names:
+                getattr(self, "build_" + name)()
+        for name in names:
+            getattr(self, name).optimize()
+        if rule_cache is not None:
+            reused = rule_cache.reused - reused
+            total = reused + rule_cache.compiled - compiled
+            if total:
+                logger.info("reused {} of {} rules".format(reused, total))
+
+    def _cache_components(self, cache_config, tagger_options):
+        """Returns the ``(graphs, cache_config)`` of each bundle to load."""
+
+        if hasattr(self, 'build_tagger_and_verbalizer'):
+            return [(("tagger", "verbalizer"), cache_config)]
+        if tagger_options is None:
+            tagger_config = cache_config
+        else:
+            tagger_config = {name: cache_config[name] for name in tagger_options}
+        return [(("tagger", ), tagger_config), (("verbalizer", ), cache_config)]
+
+    def build_fst(self, prefix, cache_dir, overwrite_cache, cache_config=None, tagger_options=None):
+        """Loads or atomically builds content-addressed graph bundles.
 
         ``cache_dir=None`` selects the platform user cache and ``False`` keeps
         graphs in memory only. Explicit directories remain supported as cache
         roots. Legacy flat v1 files are intentionally left untouched because
         they cannot prove that their tagger and verbalizer belong together.
+
+        Pipelines with separate ``build_tagger`` and ``build_verbalizer``
+        methods cache each graph in its own bundle. The tagger is keyed only
+        on the ``tagger_options`` entries of ``cache_config`` (all of them
+        when ``None``) and the verbalizer on the whole config, so
+        configurations that differ in verbalizer options share one tagger.
+        ``build_tagger_and_verbalizer`` pipelines cache one bundle of both.
+        Rules constructed with ``compile_rule`` are also cached one by one.
         """
 
         cache_config = {} if cache_config is None else cache_config
+        try:
+            self._build_or_load_fst(prefix, cache_dir, overwrite_cache, cache_config, tagger_options)
+        finally:
+            # Rules are only needed while building; drop them with their graphs.
+            self._rule_specs = None
+            if self._rule_cache is not None:
+                self._rule_cache.close()
+                self._rule_cache = None
+
+    def _build_or_load_fst(self, prefix, cache_dir, overwrite_cache, cache_config, tagger_options):
+        jobs = configured_build_jobs()
         if cache_dir is False:
-            logger.info("building fst for {} ...".format(self.name))
-            if hasattr(self, 'build_tagger_and_verbalizer'):
-                self.build_tagger_and_verbalizer()
-            else:
-                self.build_tagger()
-                self.build_verbalizer()
-            self.tagger.optimize()
-            self.verbalizer.optimize()
+            if jobs > 1:
+                self._rule_cache = RuleCache(None, jobs=jobs)
+            self._build_graphs(("tagger", "verbalizer"))
             logger.info("done")
             return
 
         cache_root = default_cache_dir() if cache_dir is None else cache_dir
-        bundle = CacheBundle(
-            cache_root=cache_root,
-            prefix=prefix,
-            ordertype=self.ordertype,
-            cache_config=cache_config,
-            source_fingerprint=self._source_fingerprint(prefix),
-        )
-
-        if not overwrite_cache:
-            graphs = bundle.load()
-            if graphs is not None:
-                logger.info("found existing fst bundle: {}".format(bundle.path))
-                logger.info("skip building fst for {} ...".format(self.name))
-                self.tagger, self.verbalizer = graphs
-                return
+        self._rule_cache = RuleCache(cache_root, reuse=not overwrite_cache, jobs=jobs)
+        source_fingerprint = self._source_fingerprint(prefix, cache_root)
+        self.cache_bundles = tuple(
+            CacheBundle(
+                cache_root=cache_root,
+                prefix=prefix,
+                ordertype=self.ordertype,
+                cache_config=config,
+                source_fingerprint=source_fingerprint,
+                graphs=graphs,
+            ) for graphs, config in self._cache_components(cache_config, tagger_options))
+        for bundle in self.cache_bundles:
+            self._load_or_build_bundle(bundle, prefix, cache_root, overwrite_cache)
+
+    def _load_or_build_bundle(self, bundle, prefix, cache_root, overwrite_cache):
+        if not overwrite_cache and self._load_bundle(bundle):
+            logger.info("found existing fst bundle: {}".format(bundle.path))
+            logger.info("skip building {} fst for {} ...".format(" and ".join(bundle.graphs), self.name))
+            return
 
         with bundle.lock():
             bundle.recover_residuals()
             if not overwrite_cache:
-                graphs = bundle.load()
-                if graphs is not None:
+                if self._load_bundle(bundle):
                     logger.info("found existing fst bundle: {}".format(bundle.path))
-                    logger.info("skip building fst for {} ...".format(self.name))
-                    self.tagger, self.verbalizer = graphs
+                    logger.info("skip building {} fst for {} ...".format(" and ".join(bundle.graphs), self.name))
                     return
                 bundle.remove_invalid()
 
-            logger.info("building fst for {} ...".format(self.name))
-            if hasattr(self, 'build_tagger_and_verbalizer'):
-                self.build_tagger_and_verbalizer()
-            else:
-                self.build_tagger()
-                self.build_verbalizer()
-            self.tagger.optimize()
-            self.verbalizer.optimize()
-            if self._source_fingerprint(prefix) != bundle.source_fingerprint:
+            self._build_graphs(bundle.graphs)
+            if self._source_fingerprint(prefix, cache_root) != bundle.source_fingerprint:
                 raise RuntimeError("grammar sources changed while building the cache bundle")
-            bundle.publish(self.tagger, self.verbalizer)
+            metadata = self._graph_metadata() if "tagger" in bundle.graphs else {}
+            if "verbalizer" in bundle.graphs:
+                # Runtime exports hand this schema to the C++ token parser.
+                metadata["token_orders"] = self.token_parser().orders
+            bundle.publish(*(getattr(self, name) for name in bundle.graphs), metadata=metadata)
             graphs = bundle.load()
             if graphs is None:
                 raise RuntimeError("published cache bundle failed verification: {}".format(bundle.path))
-            self.tagger, self.verbalizer = graphs
+            self._adopt_graphs(bundle, _share_graphs(bundle, graphs, replace=True))
             logger.info("done")
             logger.info("fst bundle: {}".format(bundle.path))
 
+    def _load_bundle(self, bundle):
+        """Adopts a bundle's graphs, reusing them if another processor did.
+
+        Returns False when the bundle is neither shared nor loadable.
+        """
+
+        with _SHARED_GRAPHS_LOCK:
+            shared = _SHARED_GRAPHS.get(bundle.path)
+        if shared is None:
+            graphs = bundle.load()
+            if graphs is None:
+                return False
+            shared = _share_graphs(bundle, graphs)
+        self._adopt_graphs(bundle, shared)
+        return True
+
+    def _adopt_graphs(self, bundle, shared):
+        for name, graph in shared.graphs.items():
+            setattr(self, name, graph)
+        # Keep only the holders of graphs this processor still uses.
+        held = tuple(other for other in self._shared_graphs if other.graphs.keys().isdisjoint(shared.graphs))
+        self._shared_graphs = held + (shared, )
+        if "tagger" in shared.graphs:
+            # Alphabets are facts about the tagger's rules.
+            self._restore_graph_metadata(shared.metadata)
+        bundle.metadata = dict(shared.metadata)
+
     @staticmethod
     def _validate_nbest(nbest):
         if isinstance(nbest, bool) or not isinstance(nbest, int) or nbest < 1:
@@ -318,24 +699,144 @@ class Processor:
         output, _, _ = self._verbalize_tagged(input)
         return output
 
-    def _verbalize_tagged(self, tagged, trace_tokens=False, output_text=None):
-        parser = self.token_parser()
+    def _verbalize_tagged(self, tagged, trace_tokens=False, output_text=None, parser=None, arcs=None):
+        parser = self.token_parser() if parser is None else parser
         reordered, token_spans = parser.reorder_with_spans(tagged)
+        memo = self.token_memo
+        if memo is not None:
+            verbalized = self._verbalize_tokens(memo, reordered, token_spans, trace_tokens)
+            if verbalized is not None and (output_text is None or verbalized[0] == output_text):
+                output, _, output_spans = verbalized
+                return output, parser, output_spans if trace_tokens else ()
         output, output_spans = transduce_with_spans(
             reordered,
             self.verbalizer,
             token_spans if trace_tokens else (),
             output_text=output_text,
+            arcs=arcs,
         )
         return output, parser, output_spans
 
+    def enable_token_memo(self, maxsize=8192):
+        """Verbalizes each distinct serialized token once.
+
+        Only pipelines whose verbalizer is a star over single tokens may
+        enable it: the best verbalization of a token stream is then the
+        concatenation of its tokens' best verbalizations.
+        """
+
+        self.token_memo = LRUCache(maxsize)
+        return self.token_memo
+
+    def disable_token_memo(self):
+        self.token_memo = None
+
+    def _verbalize_tokens(self, memo, reordered, token_spans, trace_tokens=False):
+        """Returns the output, weight, and token output spans of a stream.
+
+        Returns ``None`` when any token has no verbalization.
+        """
+
+        outputs = []
+        output_spans = []
+        weight = 0.0
+        offset = 0
+        for start, end in token_spans:
+            token = reordered[start:end]
+            entry = memo.get(token, _MISSING)
+            if entry is _MISSING or (trace_tokens and entry is not None and entry[2] is None):
+                entry = self._verbalize_token(token, trace_tokens)
+                memo.put(token, entry)
+            if entry is None:
+                return None
+            output, token_weight, span = entry
+            outputs.append(output)
+            weight = _times(weight, token_weight)
+            if trace_tokens:
+                output_spans.append((offset + span[0], offset + span[1]))
+            offset += len(output)
+        return "".join(outputs), weight, tuple(output_spans)
+
+    def _verbalize_token(self, token, trace_tokens):
+        path = _best_path(accep(escape(token)) @ self.verbalizer)
+        if path is None:
+            return None
+        span = None
+        if trace_tokens:
+            _, (span, ) = transduce_with_spans(token, self.verbalizer, ((0, len(token)), ), output_text=path.text)
+        return path.text, path.weight, span
+
+    def enable_result_cache(self, maxsize=65536):
+        """Memoizes ``normalize`` and ``normalize_with_mapping`` results.
+
+        The cache is bounded, least-recently-used, and safe to share across
+        threads. ``result_cache.stats()`` reports hits, misses, and evictions.
+        """
+
+        self.result_cache = LRUCache(maxsize)
+        return self.result_cache
+
+    def disable_result_cache(self):
+        self.result_cache = None
+
+    def _memoized(self, key, compute):
+        cache = self.result_cache
+        if cache is None:
+            return compute()
+        key = (tuple(bundle.bundle_digest for bundle in self.cache_bundles), ) + key
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            cache.put(key, tuple(value) if isinstance(value, list) else value)
+        return list(value) if isinstance(value, tuple) else value
+
     def normalize(self, input, nbest=1):
         self._validate_nbest(nbest)
         if not input:
             return "" if nbest == 1 else [""]
+        return self._memoized(("normalize", input, nbest), lambda: self._normalize(input, nbest))
+
+    def _normalize(self, input, nbest):
+        if nbest == 1:
+            return "".join(self._normalize_segment(segment) for segment in self._segments(input))
         candidates = self._normalization_candidates(input, nbest)
-        outputs = [candidate.output for candidate in candidates]
-        return outputs[0] if nbest == 1 else outputs
+        return [candidate.output for candidate in candidates]
+
+    def _segments(self, input):
+        """Splits 1-best input after characters that no token can span.
+
+        Each segment is at least ``segment_length`` characters long except
+        the last. Tagger and verbalizer are stars over tokens, so the best
+        path of the whole input is the concatenation of the segments' best
+        paths while lattice size stays bounded by the segment length.
+        """
+
+        alphabet = self.token_alphabet
+        limit = self.segment_length
+        if alphabet is None or limit is None or len(input) <= limit:
+            return [input]
+        segments = []
+        start = 0
+        for end, character in enumerate(input, 1):
+            if end - start >= limit and character not in alphabet:
+                segments.append(input[start:end])
+                start = end
+        if start < len(input):
+            segments.append(input[start:])
+        return segments
+
+    def _normalize_segment(self, segment):
+        if self.trigger_alphabet is not None and self.trigger_alphabet.isdisjoint(segment):
+            return "".join(self._passthrough_output(character) for character in segment)
+        return self._normalization_candidates(segment, 1)[0].output
+
+    def _passthrough_output(self, character):
+        output = self._passthrough_outputs.get(character)
+        if output is None:
+            output = self._normalization_candidates(character, 1)[0].output
+            if len(self._passthrough_outputs) < _PASSTHROUGH_MEMO_LIMIT:
+                self._passthrough_outputs[character] = output
+        return output
 
     def normalize_with_mapping(self, input, nbest=1, include_identity=False):
         """Normalizes text and traces each tagged token through the WFSTs.
@@ -349,11 +850,162 @@ class Processor:
             result = NormalizationResult("", "", ())
             return result if nbest == 1 else [result]
 
-        candidates = self._normalization_candidates(input, nbest)
+        return self._memoized(
+            ("normalize_with_mapping", input, nbest, include_identity),
+            lambda: self._normalize_with_mapping(input, nbest, include_identity),
+        )
+
+    def _normalize_with_mapping(self, input, nbest, include_identity):
+        if nbest == 1:
+            segments = self._segments(input)
+            if len(segments) > 1:
+                return self._normalize_segments_with_mapping(input, segments, include_identity)
+        candidates = self._normalization_candidates(input, nbest, with_arcs=True)
         results = [self._normalize_candidate_with_mapping(input, candidate, include_identity) for candidate in candidates]
         return results[0] if nbest == 1 else results
 
-    def _normalization_candidates(self, input, nbest):
+    def _normalize_segments_with_mapping(self, input, segments, include_identity):
+        outputs = []
+        mappings = []
+        input_offset = 0
+        output_offset = 0
+        for segment in segments:
+            candidate = self._normalization_candidates(segment, 1, with_arcs=True)[0]
+            result = self._normalize_candidate_with_mapping(segment, candidate, include_identity)
+            mappings.extend(
+                replace(
+                    mapping,
+                    input_start=mapping.input_start + input_offset,
+                    input_end=mapping.input_end + input_offset,
+                    output_start=mapping.output_start + output_offset,
+                    output_end=mapping.output_end + output_offset,
+                ) for mapping in result.mappings)
+            outputs.append(result.output_text)
+            input_offset += len(segment)
+            output_offset += len(result.output_text)
+        return NormalizationResult(input, "".join(outputs), tuple(mappings))
+
+    def stream(self):
+        """Starts a ``NormalizationStream`` for incrementally arriving text.
+
+        Raises ``ValueError`` for pipelines without a token alphabet.
+        """
+
+        return NormalizationStream(self)
+
+    def normalize_batch(self, texts, nbest=1, workers=None, chunksize=64):
+        """Normalizes many texts in worker processes, preserving input order.
+
+        ``workers=None`` uses every CPU and ``workers=1`` runs in-process.
+        Workers reload bundle-backed graphs from the published cache.
+        """
+
+        self._validate_nbest(nbest)
+        return self._map_in_processes("normalize", texts, workers, chunksize, nbest=nbest)
+
+    def normalize_with_mapping_batch(self, texts, nbest=1, include_identity=False, workers=None, chunksize=64):
+        """Runs ``normalize_with_mapping`` over many texts like ``normalize_batch``."""
+
+        self._validate_nbest(nbest)
+        return self._map_in_processes(
+            "normalize_with_mapping",
+            texts,
+            workers,
+            chunksize,
+            nbest=nbest,
+            include_identity=include_identity,
+        )
+
+    def configure_async(self, executor="thread", max_concurrency=None, batch_window=None, max_batch_size=64):
+        """Replaces the ``AsyncExecutor`` behind ``anormalize`` and returns it.
+
+        Without this call, a thread executor with one slot per CPU is created
+        on first use. The previous executor is shut down without waiting.
+        """
+
+        previous = self._async_executor
+        self._async_executor = AsyncExecutor(self, executor, max_concurrency, batch_window, max_batch_size)
+        if previous is not None:
+            previous.shutdown(wait=False)
+        return self._async_executor
+
+    async def anormalize(self, input, nbest=1):
+        """Awaitable ``normalize`` that keeps the event loop free."""
+
+        self._validate_nbest(nbest)
+        return await self._async().call("normalize", input, nbest=nbest)
+
+    async def anormalize_with_mapping(self, input, nbest=1, include_identity=False):
+        """Awaitable ``normalize_with_mapping`` that keeps the event loop free."""
+
+        self._validate_nbest(nbest)
+        return await self._async().call("normalize_with_mapping", input, nbest=nbest, include_identity=include_identity)
+
+    def _async(self):
+        with self._async_executor_lock:
+            if self._async_executor is None:
+                self._async_executor = AsyncExecutor(self)
+            return self._async_executor
+
+    def _map_in_processes(self, method, texts, workers, chunksize, **kwargs):
+        texts = list(texts)
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if isinstance(workers, bool) or not isinstance(workers, int) or workers < 1:
+            raise ValueError("workers must be a positive integer")
+        if isinstance(chunksize, bool) or not isinstance(chunksize, int) or chunksize < 1:
+            raise ValueError("chunksize must be a positive integer")
+        workers = min(workers, -(-len(texts) // chunksize))
+        if workers <= 1:
+            function = getattr(self, method)
+            return [function(text, **kwargs) for text in texts]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(self, )) as executor:
+            return list(executor.map(partial(_call_worker, method, kwargs), texts, chunksize=chunksize))
+
+    def _best_candidate(self, input, with_arcs=False):
+        """Finds the joint 1-best candidate with one search per stage.
+
+        The best joint candidate always comes from the best tagger path,
+        because each tag's best verbalization adds zero to its joint weight.
+        Returns ``None`` when that tag has no verbalization, so the caller can
+        fall back to the joint search over later tags. ``with_arcs`` keeps
+        the selected paths for ``normalize_with_mapping``.
+        """
+
+        tagged_path = _best_path(accep(escape(input)) @ self.tagger, with_arcs)
+        if tagged_path is None:
+            return None
+        parser = self.token_parser()
+        reordered, token_spans = parser.reorder_with_spans(tagged_path.text)
+        memo = self.token_memo
+        if memo is not None:
+            verbalized = self._verbalize_tokens(memo, reordered, token_spans)
+            verbalized_path = None if verbalized is None else _WeightedOutput(verbalized[0], verbalized[1], 0)
+        else:
+            verbalized_path = _best_path(accep(escape(reordered)) @ self.verbalizer, with_arcs)
+        if verbalized_path is None:
+            return None
+        return _NormalizationCandidate(
+            tagged=tagged_path.text,
+            output=verbalized_path.text,
+            tagger_weight=tagged_path.weight,
+            verbalizer_weight=verbalized_path.weight,
+            best_verbalizer_weight=verbalized_path.weight,
+            tagger_rank=0,
+            verbalizer_rank=0,
+            parser=parser,
+            tagger_arcs=tagged_path.arcs,
+            verbalizer_arcs=verbalized_path.arcs,
+        )
+
+    def _normalization_candidates(self, input, nbest, with_arcs=False):
+        if nbest == 1:
+            candidate = self._best_candidate(input, with_arcs)
+            if candidate is not None:
+                return [candidate]
+        return self._joint_candidates(input, nbest)
+
+    def _joint_candidates(self, input, nbest):
         tagger_stream = _UniqueOutputPathStream(accep(escape(input)) @ self.tagger)
         frontier = []
         activated = 0
@@ -381,6 +1033,7 @@ class Processor:
                 best_verbalizer_weight=verbalized_path.weight,
                 tagger_rank=tagger_rank,
                 verbalizer_rank=verbalized_path.rank,
+                parser=parser,
             )
             heapq.heappush(
                 frontier,
@@ -426,6 +1079,7 @@ class Processor:
                     best_verbalizer_weight=candidate.best_verbalizer_weight,
                     tagger_rank=candidate.tagger_rank,
                     verbalizer_rank=next_verbalized.rank,
+                    parser=candidate.parser,
                 )
                 heapq.heappush(
                     frontier,
@@ -454,12 +1108,15 @@ class Processor:
             tagged,
             trace_tokens=True,
             output_text=candidate.output,
+            parser=candidate.parser,
+            arcs=candidate.verbalizer_arcs,
         )
         input_spans = trace_input_spans(
             input,
             tagged,
             self.tagger,
             ((token.start, token.end) for token in parser.tokens),
+            arcs=candidate.tagger_arcs,
         )
 
         mappings = []
@@ -0,0 +1,504 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Incremental build cache for the compiled graphs of individual rules."""
+
+import importlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+
+from pynini import Fst
+
+from tn.cache import (RULE_CACHE_DIRNAME, CacheError, _builder_identity, _canonical_json, _FST_MAX_BYTES, _hash_bytes,
+                      _mark_used, _read_regular_file, _write_all, production_source_fingerprint)
+
+logger = logging.getLogger("wetext")
+
+BUILD_JOBS_ENV = "WETEXTPROCESSING_BUILD_JOBS"
+_ENTRY_MAGIC = b"WETXRULE"
+_HEADER_MAX_BYTES = 16 * 1024 * 1024
+_CODE_SUFFIXES = frozenset((".py", ))
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_DATA_SCOPES = threading.local()
+# Module-level tables are read once at import, outside any rule, so every
+# rule conservatively depends on them.
+_UNSCOPED_DATA_FILES = set()
+_UNSCOPED_LOCK = threading.Lock()
+
+
+def record_data_file(path):
+    """Records that the rule being built reads the data file ``path``."""
+
+    scopes = getattr(_DATA_SCOPES, "stack", None)
+    if scopes:
+        scopes[-1].add(os.fspath(path))
+    else:
+        with _UNSCOPED_LOCK:
+            _UNSCOPED_DATA_FILES.add(os.fspath(path))
+
+
+@contextmanager
+def recording_data_files():
+    """Collects the data files read in this thread; nested scopes propagate."""
+
+    scopes = _DATA_SCOPES.__dict__.setdefault("stack", [])
+    files = set()
+    scopes.append(files)
+    try:
+        yield files
+    finally:
+        scopes.pop()
+        if scopes:
+            scopes[-1].update(files)
+
+
+def configured_build_jobs():
+    """Returns the number of processes that compile rules in a cold build."""
+
+    value = os.environ.get(BUILD_JOBS_ENV)
+    if value is None:
+        return 1
+    try:
+        jobs = int(value)
+    except ValueError as error:
+        raise ValueError("{} must be a positive integer".format(BUILD_JOBS_ENV)) from error
+    if jobs < 1:
+        raise ValueError("{} must be a positive integer".format(BUILD_JOBS_ENV))
+    return jobs
+
+
+class _Uncacheable(Exception):
+    pass
+
+
+class PendingRule:
+    """A rule that a worker process is compiling.
+
+    Pipelines pass it on to other rules like the compiled rule; reading any
+    of its attributes waits for the worker and returns the rule's attribute.
+    """
+
+    __slots__ = ("cache", "rule_type", "args", "kwargs", "rule")
+
+    def __init__(self, cache, rule_type, args, kwargs):
+        self.cache = cache
+        self.rule_type = rule_type
+        self.args = args
+        self.kwargs = kwargs
+        self.rule = None
+
+    def __getattr__(self, name):
+        if name in PendingRule.__slots__:
+            raise AttributeError(name)
+        return getattr(self.cache.result(self), name)
+
+
+def _qualified_name(value_type):
+    return "{}:{}".format(value_type.__module__, value_type.__qualname__)
+
+
+def _resolve_type(name):
+    module_name, _, qualname = name.partition(":")
+    value = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        value = getattr(value, part)
+    return value
+
+
+class RuleCache:
+    """Stores each rule's compiled graphs under a digest of its inputs.
+
+    A rule's key hashes the builder, the Python sources of ``tn`` and ``itn``,
+    the rule type, and its constructor arguments, where graphs count by
+    content and rules by their own digest. Entries also list the data files
+    the rule read, with their content hashes; a rule whose data changed is
+    rebuilt, and so is every rule that received it, since its digest
+    changes. Entries live in ``.rules`` under the cache root.
+    """
+
+    def __init__(self, cache_root, reuse=True, jobs=1):
+        self.directory = None if cache_root is None else Path(cache_root).expanduser() / RULE_CACHE_DIRNAME
+        self.cache_root = cache_root
+        self.reuse = reuse and self.directory is not None
+        self.jobs = jobs
+        self.builder = _builder_identity()
+        self._code_fingerprint = None
+        self.reused = 0
+        self.compiled = 0
+        self._digests = {}
+        self._rules = {}
+        self._fst_hashes = {}
+        self._file_hashes = {}
+        self._executor = None
+        self._waiting = []
+        self._running = {}
+
+    def compile(self, rule_type, args, kwargs):
+        """Returns ``rule_type(*args, **kwargs)``, reusing a cached build.
+
+        With more than one job, rules that are not cached are compiled in a
+        process pool and a ``PendingRule`` is returned; a rule that receives
+        pending rules is compiled once they are done.
+        """
+
+        if self.jobs > 1:
+            pending = PendingRule(self, rule_type, args, kwargs)
+            self._waiting.append(pending)
+            self._schedule()
+            return pending if pending.rule is None else pending.rule
+
+        key = self._cache_key(rule_type, args, kwargs)
+        if key is not None and self.reuse:
+            rule = self._load(key, rule_type)
+            if rule is not None:
+                self.reused += 1
+                return rule
+
+        start = time.perf_counter()
+        with recording_data_files() as files:
+            rule = rule_type(*args, **kwargs)
+        self._compiled(rule_type, time.perf_counter() - start)
+        if key is not None:
+            digest, dependencies = self._digest(key, files)
+            self._register(rule, digest)
+            self._store(key, digest, dependencies, rule)
+        return rule
+
+    def result(self, pending):
+        """Waits for a pending rule and returns the compiled rule."""
+
+        while pending.rule is None:
+            if not self._running:
+                raise RuntimeError("pending rule {} has no running dependency".format(pending.rule_type.__name__))
+            done, _ = wait(self._running, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._collect(future)
+            self._schedule()
+        return pending.rule
+
+    def close(self):
+        """Stops the worker pool, cancelling rules nobody waited for."""
+
+        if self._executor is not None:
+            for future in self._running:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._waiting = []
+        self._running = {}
+
+    def _schedule(self):
+        # Loading a cached rule can unblock the rules built from it.
+        progress = True
+        while progress:
+            progress = False
+            for pending in list(self._waiting):
+                arguments = self._resolved((pending.args, pending.kwargs))
+                if arguments is None:
+                    continue
+                self._waiting.remove(pending)
+                progress = True
+                pending.args, pending.kwargs = arguments
+                self._start(pending)
+
+    def _resolved(self, value):
+        """Replaces pending rules in arguments, or returns None if any is running."""
+
+        if isinstance(value, PendingRule):
+            return value.rule
+        if isinstance(value, (list, tuple)):
+            items = [self._resolved(item) for item in value]
+            if any(item is None and original is not None for item, original in zip(items, value)):
+                return None
+            return type(value)(items)
+        if isinstance(value, dict):
+            items = self._resolved(list(value.items()))
+            return None if items is None else dict(items)
+        return value
+
+    def _start(self, pending):
+        key = self._cache_key(pending.rule_type, pending.args, pending.kwargs)
+        if key is not None and self.reuse:
+            pending.rule = self._load(key, pending.rule_type)
+            if pending.rule is not None:
+                self.reused += 1
+                return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+        known_rules = [self._digests[id(value)] for value in self._rule_arguments(pending) if id(value) in self._digests]
+        future = self._executor.submit(_compile_in_worker, pending.rule_type, pending.args, pending.kwargs, known_rules)
+        self._running[future] = (pending, key)
+
+    def _rule_arguments(self, pending):
+        values = list(pending.args) + list(pending.kwargs.values())
+        while values:
+            value = values.pop()
+            if isinstance(value, (list, tuple)):
+                values.extend(value)
+            elif id(value) in self._digests:
+                yield value
+
+    def _collect(self, future):
+        pending, key = self._running.pop(future)
+        files, state, blobs, rule, elapsed = future.result()
+        if rule is None:
+            rule = self._restore(pending.rule_type, state, [Fst.read_from_string(blob) for blob in blobs])
+        self._compiled(pending.rule_type, elapsed)
+        scopes = getattr(_DATA_SCOPES, "stack", None)
+        if scopes:
+            scopes[-1].update(files)
+        if key is not None:
+            digest, dependencies = self._digest(key, set(files))
+            self._register(rule, digest)
+            if state is not None:
+                self._write_entry(key, digest, dependencies, pending.rule_type, state, blobs)
+        pending.rule = rule
+
+    def _compiled(self, rule_type, elapsed):
+        self.compiled += 1
+        logger.info("compiled {} rule in {:.2f}s".format(rule_type.__name__, elapsed))
+
+    def _cache_key(self, rule_type, args, kwargs):
+        try:
+            return self._rule_key(rule_type, args, kwargs)
+        except _Uncacheable:
+            return None
+
+    def _digest(self, key, files):
+        with _UNSCOPED_LOCK:
+            files |= _UNSCOPED_DATA_FILES
+        dependencies = [[name, self._file_hash(name)] for name in sorted(self._relative(path) for path in files)]
+        return _hash_bytes(_canonical_json([key, dependencies])), dependencies
+
+    def _rule_key(self, rule_type, args, kwargs):
+        if self._code_fingerprint is None and self.directory is not None:
+            self._code_fingerprint = production_source_fingerprint(sidecar_dir=self.cache_root, suffixes=_CODE_SUFFIXES)
+        identity = {
+            "args": [self._argument(value) for value in args],
+            "builder": self.builder,
+            "code": self._code_fingerprint,
+            "kwargs": {
+                name: self._argument(value)
+                for name, value in kwargs.items()
+            },
+            "rule": _qualified_name(rule_type),
+        }
+        return _hash_bytes(_canonical_json(identity))
+
+    def _argument(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, Fst):
+            return {"fst": self._fst_hash(value)}
+        if id(value) in self._digests:
+            return {"rule": self._digests[id(value)][1]}
+        if isinstance(value, (list, tuple)):
+            return {type(value).__name__: [self._argument(item) for item in value]}
+        raise _Uncacheable(value)
+
+    def _fst_hash(self, fst):
+        known = self._fst_hashes.get(id(fst))
+        if known is None or known[0] is not fst:
+            known = (fst, _hash_bytes(fst.write_to_string()))
+            self._fst_hashes[id(fst)] = known
+        return known[1]
+
+    def _register(self, rule, digest):
+        self._digests[id(rule)] = (rule, digest)
+        self._rules[digest] = rule
+
+    @staticmethod
+    def _relative(path):
+        path = os.path.abspath(path)
+        try:
+            return Path(path).relative_to(_PROJECT_ROOT).as_posix()
+        except ValueError:
+            return path
+
+    def _file_hash(self, name):
+        if name not in self._file_hashes:
+            try:
+                with open(_PROJECT_ROOT / name, "rb") as data_file:
+                    self._file_hashes[name] = _hash_bytes(data_file.read())
+            except OSError:
+                self._file_hashes[name] = None
+        return self._file_hashes[name]
+
+    def _entry_path(self, key):
+        return self.directory / "{}.rule".format(key)
+
+    def _load(self, key, rule_type):
+        try:
+            contents, _ = _read_regular_file(self._entry_path(key), max_size=_FST_MAX_BYTES)
+            rule, dependencies = self._decode_entry(key, rule_type, contents)
+        except (OSError, CacheError, UnicodeError, ValueError, KeyError, TypeError, AttributeError, ImportError):
+            return None
+        if rule is not None:
+            _mark_used(os.fspath(self._entry_path(key)))
+        scopes = getattr(_DATA_SCOPES, "stack", None)
+        if rule is not None and scopes:
+            scopes[-1].update(os.fspath(_PROJECT_ROOT / name) for name, _ in dependencies)
+        return rule
+
+    def _decode_entry(self, key, rule_type, contents):
+        magic_size = len(_ENTRY_MAGIC)
+        if bytes(contents[:magic_size]) != _ENTRY_MAGIC:
+            raise ValueError("not a rule cache entry")
+        header_size = int.from_bytes(contents[magic_size:magic_size + 8], "big")
+        if header_size > _HEADER_MAX_BYTES:
+            raise ValueError("rule cache header is too large")
+        offset = magic_size + 8 + header_size
+        header = json.loads(bytes(contents[magic_size + 8:offset]).decode("utf-8"))
+        if header["key"] != key or header["rule"] != _qualified_name(rule_type):
+            raise ValueError("rule cache entry belongs to another rule")
+        dependencies = header["dependencies"]
+        for name, content_hash in dependencies:
+            if self._file_hash(name) != content_hash:
+                return None, dependencies
+        digest = _hash_bytes(_canonical_json([key, dependencies]))
+        if header["digest"] != digest:
+            raise ValueError("rule cache digest does not match its inputs")
+
+        graphs = []
+        for size, content_hash in header["graphs"]:
+            blob = bytes(contents[offset:offset + size])
+            if len(blob) != size or _hash_bytes(blob) != content_hash:
+                raise ValueError("rule cache graph is corrupt")
+            graphs.append(Fst.read_from_string(blob))
+            offset += size
+        if offset != len(contents):
+            raise ValueError("rule cache entry has trailing data")
+        rule = self._restore(rule_type, header["state"], graphs)
+        self._register(rule, digest)
+        return rule, dependencies
+
+    def _store(self, key, digest, dependencies, rule):
+        if self.directory is None:
+            return
+        try:
+            blobs = []
+            state = self._encode_state(rule, blobs, {})
+        except _Uncacheable as error:
+            logger.debug("not caching rule {}: unsupported value {!r}".format(_qualified_name(type(rule)), error.args[0]))
+            return
+        self._write_entry(key, digest, dependencies, type(rule), state, blobs)
+
+    def _write_entry(self, key, digest, dependencies, rule_type, state, blobs):
+        if self.directory is None:
+            return
+        header = _canonical_json({
+            "dependencies": dependencies,
+            "digest": digest,
+            "graphs": [[len(blob), _hash_bytes(blob)] for blob in blobs],
+            "key": key,
+            "rule": _qualified_name(rule_type),
+            "state": state,
+        })
+        # Best effort: a read-only cache root only loses incremental builds.
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(prefix=".tmp-", dir=os.fspath(self.directory))
+        except OSError:
+            return
+        try:
+            try:
+                _write_all(descriptor, b"".join([_ENTRY_MAGIC, len(header).to_bytes(8, "big"), header] + blobs))
+            finally:
+                os.close(descriptor)
+            os.replace(temporary, os.fspath(self._entry_path(key)))
+        except OSError:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def _encode_state(self, rule, blobs, blob_indexes):
+        # Upper-case attributes are the constants every Processor rebuilds;
+        # transient ones are recreated by ``Processor.__init__`` on restore.
+        return {
+            name: self._encode(value, blobs, blob_indexes)
+            for name, value in vars(rule).items() if not name.isupper() and name not in rule._TRANSIENT
+        }
+
+    def _encode(self, value, blobs, blob_indexes):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, Fst):
+            if id(value) not in blob_indexes:
+                blob_indexes[id(value)] = len(blobs)
+                blobs.append(value.write_to_string())
+            return {"fst": blob_indexes[id(value)]}
+        if id(value) in self._digests:
+            return {"rule": self._digests[id(value)][1]}
+        if isinstance(value, (list, tuple)):
+            return {type(value).__name__: [self._encode(item, blobs, blob_indexes) for item in value]}
+        if isinstance(value, dict) and all(isinstance(name, str) for name in value):
+            return {"dict": {name: self._encode(item, blobs, blob_indexes) for name, item in value.items()}}
+        from tn.processor import Processor
+
+        if isinstance(value, Processor):
+            return {"object": [_qualified_name(type(value)), self._encode_state(value, blobs, blob_indexes)]}
+        raise _Uncacheable(value)
+
+    def _decode(self, value, graphs):
+        if not isinstance(value, dict):
+            return value
+        (kind, item), = value.items()
+        if kind == "fst":
+            return graphs[item]
+        if kind == "rule":
+            return self._rules[item]
+        if kind == "list":
+            return [self._decode(element, graphs) for element in item]
+        if kind == "tuple":
+            return tuple(self._decode(element, graphs) for element in item)
+        if kind == "dict":
+            return {name: self._decode(element, graphs) for name, element in item.items()}
+        if kind == "object":
+            return self._restore(_resolve_type(item[0]), item[1], graphs)
+        raise ValueError("unknown rule cache value: {}".format(kind))
+
+    def _restore(self, rule_type, state, graphs):
+        from tn.processor import Processor
+
+        rule = rule_type.__new__(rule_type)
+        Processor.__init__(rule, state["name"])
+        for name, value in state.items():
+            setattr(rule, name, self._decode(value, graphs))
+        return rule
+
+
+def _compile_in_worker(rule_type, args, kwargs, known_rules):
+    """Compiles one rule and returns its state in the rule cache encoding."""
+
+    cache = RuleCache(None)
+    for rule, digest in known_rules:
+        cache._register(rule, digest)
+    start = time.perf_counter()
+    with recording_data_files() as files:
+        rule = rule_type(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    blobs = []
+    try:
+        state = cache._encode_state(rule, blobs, {})
+    except _Uncacheable:
+        return files, None, [], rule, elapsed
+    return files, state, blobs, None, elapsed
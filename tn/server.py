@@ -0,0 +1,306 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local normalization server and its thin client.
+
+``wetn serve`` keeps processors loaded between CLI calls. Clients POST JSON
+batches to ``/normalize`` over HTTP/1.1 on a localhost port or a Unix-domain
+socket and receive, for each text, exactly what the CLI would print for it.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tn.cli import DEFAULT_SERVER_ADDRESS, LANGUAGES, OUTPUTS, _line_formatter, _pipeline_defaults, create_processor
+
+logger = logging.getLogger("wetext")
+
+_MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class ServerError(RuntimeError):
+    """A normalization server rejected or failed a request."""
+
+
+def parse_address(address):
+    """Parses ``HOST:PORT`` into a tuple or ``unix:PATH`` into a path."""
+
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        if not path:
+            raise ValueError("expected unix:PATH")
+        return path
+    host, separator, port = address.rpartition(":")
+    host = host[1:-1] if host.startswith("[") and host.endswith("]") else host
+    if not separator or not host or not port.isdigit() or int(port) > 65535:
+        raise ValueError("expected HOST:PORT or unix:PATH, got {!r}".format(address))
+    return host, int(port)
+
+
+def _remove_stale_socket(path):
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError("{} exists and is not a socket".format(path))
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise OSError("another server is listening on {}".format(path))
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._reply(404, {"error": "unknown path: {}".format(self.path)})
+            return
+        self._reply(200, {"status": "ok", "pipelines": self.server.normalization_server.pipelines()})
+
+    def do_POST(self):
+        if self.path != "/normalize":
+            self._reply(404, {"error": "unknown path: {}".format(self.path)})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            self._reply(411, {"error": "Content-Length is required"})
+            return
+        if length > _MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._reply(413, {"error": "request exceeds {} bytes".format(_MAX_REQUEST_BYTES)})
+            return
+
+        server = self.server.normalization_server
+        try:
+            batch = server.parse_request(json.loads(self.rfile.read(length).decode("utf-8")))
+        except ValueError as error:
+            self._reply(400, {"error": str(error)})
+            return
+        try:
+            # Loading a pipeline on first use may fail like any build does.
+            outputs = server.run_batch(*batch)
+        except Exception as error:
+            logger.exception("normalization request failed")
+            self._reply(500, {"error": "{}: {}".format(type(error).__name__, error)})
+            return
+        self._reply(200, {"outputs": outputs})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class NormalizationServer:
+    """Serves preloaded processors, one per direction, language and options.
+
+    Pipelines requested with other options are loaded on first use and kept.
+    Calls into one processor are serialized; different pipelines run
+    concurrently, one thread per client connection.
+    """
+
+    def __init__(self, address=DEFAULT_SERVER_ADDRESS, cache_dir=None, processor_factory=create_processor):
+        self.cache_dir = cache_dir
+        self.processor_factory = processor_factory
+        self._pipelines = {}
+        self._load_lock = threading.Lock()
+        self._socket_path = None
+        address = parse_address(address)
+        if isinstance(address, str):
+            _remove_stale_socket(address)
+            self._httpd = _UnixHTTPServer(address, _RequestHandler)
+            self._socket_path = address
+        else:
+            self._httpd = ThreadingHTTPServer(address, _RequestHandler)
+        self._httpd.normalization_server = self
+
+    @property
+    def address(self):
+        if self._socket_path is not None:
+            return "unix:" + self._socket_path
+        host, port = self._httpd.server_address[:2]
+        return "{}:{}".format("[{}]".format(host) if ":" in host else host, port)
+
+    def preload(self, direction, language="zh", options=None):
+        """Loads a pipeline before the first request needs it."""
+
+        return self._load(self._pipeline_key(direction, language, options or {}))[0]
+
+    def pipelines(self):
+        with self._load_lock:
+            keys = list(self._pipelines)
+        return [{
+            "direction": direction,
+            "language": language,
+            "options": dict(options)
+        } for direction, language, options in keys]
+
+    def _pipeline_key(self, direction, language, options):
+        if direction not in ("tn", "itn"):
+            raise ValueError("direction must be 'tn' or 'itn'")
+        if language not in LANGUAGES:
+            raise ValueError("unsupported language: {}".format(language))
+        resolved = _pipeline_defaults(direction, language)
+        unknown = sorted(set(options) - set(resolved))
+        if unknown:
+            raise ValueError("unsupported {} {} options: {}".format(language, direction, ", ".join(unknown)))
+        if not all(isinstance(value, bool) for value in options.values()):
+            raise ValueError("pipeline options must be booleans")
+        resolved.update(options)
+        return direction, language, tuple(sorted(resolved.items()))
+
+    def _load(self, key):
+        with self._load_lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is None:
+                direction, language, options = key
+                args = argparse.Namespace(language=language, cache_dir=self.cache_dir, overwrite_cache=False, **dict(options))
+                pipeline = (self.processor_factory(direction, args), threading.Lock())
+                self._pipelines[key] = pipeline
+        return pipeline
+
+    def parse_request(self, request):
+        """Validates a decoded ``/normalize`` request; raises ``ValueError``."""
+
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        texts = request.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise ValueError("texts must be a list of strings")
+        output = request.get("output", "normalized")
+        if output not in OUTPUTS:
+            raise ValueError("output must be one of: {}".format(", ".join(OUTPUTS)))
+        nbest = request.get("nbest", 1)
+        if isinstance(nbest, bool) or not isinstance(nbest, int) or nbest < 1:
+            raise ValueError("nbest must be a positive integer")
+        if nbest > 1 and output != "jsonl":
+            raise ValueError("nbest requires the jsonl output")
+        options = request.get("options", {})
+        if not isinstance(options, dict):
+            raise ValueError("options must be a JSON object")
+        key = self._pipeline_key(request.get("direction", "tn"), request.get("language", "zh"), options)
+        return key, _line_formatter(argparse.Namespace(output=output, nbest=nbest)), texts
+
+    def run_batch(self, key, formatter, texts):
+        """Loads the pipeline for ``key`` if needed and formats each text."""
+
+        processor, lock = self._load(key)
+        with lock:
+            return [formatter(processor, text) for text in texts]
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def shutdown(self):
+        """Stops ``serve_forever`` from another thread."""
+
+        self._httpd.shutdown()
+
+    def close(self):
+        self._httpd.server_close()
+        if self._socket_path is not None:
+            try:
+                os.unlink(self._socket_path)
+            except FileNotFoundError:
+                pass
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class NormalizationClient:
+    """Sends batches to a ``wetn serve`` process over one kept-alive connection."""
+
+    def __init__(self, address=DEFAULT_SERVER_ADDRESS, timeout=None):
+        self.address = address
+        address = parse_address(address)
+        if isinstance(address, str):
+            self._connection = _UnixHTTPConnection(address, timeout)
+        else:
+            self._connection = http.client.HTTPConnection(*address, timeout=timeout)
+
+    def normalize(self, texts, direction="tn", language="zh", options=None, output="normalized", nbest=1):
+        """Returns what the CLI would print for each text, in input order."""
+
+        body = json.dumps(
+            {
+                "direction": direction,
+                "language": language,
+                "options": options or {},
+                "output": output,
+                "nbest": nbest,
+                "texts": list(texts),
+            },
+            ensure_ascii=False).encode("utf-8")
+        try:
+            self._connection.request("POST", "/normalize", body, {"Content-Type": "application/json"})
+            response = self._connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError) as error:
+            self._connection.close()
+            raise ServerError("cannot reach the normalization server at {}: {}".format(self.address, error)) from error
+        try:
+            payload = json.loads(payload.decode("utf-8"))
+        except ValueError as error:
+            raise ServerError("malformed response from the normalization server") from error
+        if not isinstance(payload, dict):
+            raise ServerError("malformed response from the normalization server")
+        if response.status != 200:
+            raise ServerError(payload.get("error", response.reason))
+        return payload["outputs"]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
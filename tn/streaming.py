@@ -0,0 +1,75 @@
+# Copyright (c) 2026 Zhendong Peng (pzd17@tsinghua.org.cn)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class NormalizationStream:
+    """Normalizes text that arrives in pieces, such as ASR partial results.
+
+    ``feed`` returns the normalized text of the newly stable input prefix and
+    keeps the unstable tail pending; only that tail is normalized again when
+    more text arrives. ``flush`` normalizes and emits the pending tail, and
+    ``finalize`` flushes and closes the stream.
+
+    The stable prefix ends after the last character that no token can read,
+    so the emitted text always equals ``normalize`` of the whole input. Only
+    pipelines with a token alphabet (Chinese and Japanese) can prove such a
+    boundary; word-based pipelines (English) have rules that read arbitrary
+    words and are rejected.
+    """
+
+    def __init__(self, processor):
+        if processor.token_alphabet is None:
+            raise ValueError("streaming requires a pipeline with a token alphabet")
+        self.processor = processor
+        self.pending = ""
+        self.closed = False
+
+    def feed(self, text):
+        """Appends text and returns the normalization of the stable prefix."""
+
+        self._check_open()
+        self.pending += text
+        alphabet = self.processor.token_alphabet
+        pending = self.pending
+        boundary = len(pending)
+        while boundary > 0 and pending[boundary - 1] in alphabet:
+            boundary -= 1
+        if boundary == 0:
+            return ""
+        self.pending = pending[boundary:]
+        return self.processor.normalize(pending[:boundary])
+
+    def peek(self):
+        """Returns the normalization of the pending tail without emitting it."""
+
+        return self.processor.normalize(self.pending)
+
+    def flush(self):
+        """Emits the normalization of all pending text."""
+
+        self._check_open()
+        output = self.processor.normalize(self.pending)
+        self.pending = ""
+        return output
+
+    def finalize(self):
+        """Flushes pending text and closes the stream."""
+
+        output = self.flush()
+        self.closed = True
+        return output
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError("the normalization stream is finalized")
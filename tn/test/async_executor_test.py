@@ -0,0 +1,149 @@
+import asyncio
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tn.async_executor import AsyncExecutor
+from tn.chinese.test.processor_test import LetterProcessor
+
+
+class BlockingProcessor:
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def normalize(self, text, nbest=1):
+        with self._lock:
+            self.started.append(text)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        self.release.wait(5)
+        with self._lock:
+            self.active -= 1
+        if text == "bad":
+            raise ValueError(text)
+        return text.upper()
+
+
+class CountingExecutor(ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.jobs = 0
+
+    def submit(self, *args, **kwargs):
+        self.jobs += 1
+        return super().submit(*args, **kwargs)
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0.001)
+
+
+def test_anormalize_matches_normalize_and_survives_pickling(tmp_path):
+    processor = LetterProcessor(tmp_path)
+
+    async def main():
+        return await asyncio.gather(processor.anormalize("a"), processor.anormalize_with_mapping("b", nbest=2))
+
+    normalized, mapped = asyncio.run(main())
+    assert normalized == processor.normalize("a")
+    assert mapped == processor.normalize_with_mapping("b", nbest=2)
+    assert pickle.loads(pickle.dumps(processor)).normalize("c") == "C"
+    with pytest.raises(ValueError):
+        asyncio.run(processor.anormalize("a", nbest=0))
+
+
+def test_concurrency_limit_bounds_jobs_in_the_executor():
+    processor = BlockingProcessor()
+    executor = AsyncExecutor(processor, max_concurrency=2)
+
+    async def main():
+        calls = [asyncio.ensure_future(executor.call("normalize", text)) for text in "abcdef"]
+        await _until(lambda: len(processor.started) == 2)
+        await asyncio.sleep(0.02)
+        assert len(processor.started) == 2
+        processor.release.set()
+        return await asyncio.gather(*calls)
+
+    assert asyncio.run(main()) == list("ABCDEF")
+    assert processor.peak == 2
+    executor.shutdown()
+
+
+def test_cancelled_calls_never_start_and_running_ones_keep_their_slot():
+    processor = BlockingProcessor()
+    executor = AsyncExecutor(processor, max_concurrency=1)
+
+    async def main():
+        running = asyncio.ensure_future(executor.call("normalize", "a"))
+        await _until(lambda: processor.started)
+        waiting = asyncio.ensure_future(executor.call("normalize", "b"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        running.cancel()
+        later = asyncio.ensure_future(executor.call("normalize", "c"))
+        await asyncio.sleep(0.02)
+        assert processor.started == ["a"]
+        processor.release.set()
+        assert await later == "C"
+        return running.cancelled(), waiting.cancelled()
+
+    assert asyncio.run(main()) == (True, True)
+    assert processor.started == ["a", "c"]
+    executor.shutdown()
+
+
+def test_micro_batches_share_one_job_and_keep_errors_per_text():
+    processor = BlockingProcessor()
+    processor.release.set()
+    pool = CountingExecutor()
+    executor = AsyncExecutor(processor, pool, batch_window=0.05, max_batch_size=3)
+
+    async def main():
+        return await asyncio.gather(*[executor.call("normalize", text) for text in ("a", "bad", "c", "d", "e")],
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert results[0] == "A" and isinstance(results[1], ValueError) and results[2:] == ["C", "D", "E"]
+    assert pool.jobs == 2
+    executor.shutdown()
+    assert pool.submit(str, 1).result() == "1"
+    pool.shutdown()
+
+
+def test_process_executor_loads_the_bundle_in_workers(tmp_path):
+    processor = LetterProcessor(tmp_path)
+    executor = processor.configure_async("process", max_concurrency=2, batch_window=0.01)
+
+    async def main():
+        return await asyncio.gather(*[processor.anormalize_with_mapping(text) for text in "abcabc"])
+
+    try:
+        assert asyncio.run(main()) == [processor.normalize_with_mapping(text) for text in "abcabc"]
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{
+        "executor": "fork"
+    }, {
+        "max_concurrency": 0
+    }, {
+        "batch_window": -1
+    }, {
+        "max_batch_size": True
+    }],
+)
+def test_invalid_executor_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        AsyncExecutor(BlockingProcessor(), **options)
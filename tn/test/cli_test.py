@@ -1,7 +1,10 @@
 import io
+import json
+import os
 
 import pytest
 
+from tn.chinese.test.processor_test import AmbiguousProcessor, CountingProcessor, LetterProcessor
 from tn.cli import create_processor, parse_args, run
 
 
@@ -10,6 +13,7 @@ class FakeProcessor:
     def __init__(self):
         self.tag_calls = []
         self.verbalize_calls = []
+        self.normalize_calls = []
 
     def tag(self, text):
         self.tag_calls.append(text)
@@ -19,6 +23,10 @@ class FakeProcessor:
         self.verbalize_calls.append(tagged)
         return "[{}]".format(tagged)
 
+    def normalize(self, text):
+        self.normalize_calls.append(text)
+        return "[<{}>]".format(text)
+
 
 @pytest.mark.parametrize(
     "direction,language,module_name,class_name,extra_args,expected",
@@ -140,6 +148,50 @@ def test_text_is_tagged_once_and_verbalized_from_that_tag():
     assert stdout.getvalue() == "<  12  >\n[<  12  >]\n"
 
 
+@pytest.mark.parametrize(
+    "output,expected,calls",
+    [
+        ("normalized", "[<a>]\n[<b>]\n", (0, 0, 2)),
+        ("tagged", "<a>\n<b>\n", (2, 0, 0)),
+        ("both", "<a>\n[<a>]\n<b>\n[<b>]\n", (2, 2, 0)),
+    ],
+)
+def test_output_modes_run_only_the_stages_they_print(output, expected, calls):
+    processor = FakeProcessor()
+    stdout = io.StringIO()
+
+    run("tn", ["--output", output],
+        stdin=io.StringIO("a\nb\n"),
+        stdout=stdout,
+        processor_factory=lambda _direction, _args: processor)
+
+    assert stdout.getvalue() == expected
+    assert (len(processor.tag_calls), len(processor.verbalize_calls), len(processor.normalize_calls)) == calls
+
+
+def test_jsonl_output_writes_mapping_records(tmp_path):
+    processor = AmbiguousProcessor(tmp_path)
+    stdout = io.StringIO()
+    run("tn", ["--output", "jsonl", "--text", "input"], stdout=stdout, processor_factory=lambda _direction, _args: processor)
+    assert json.loads(stdout.getvalue()) == processor.normalize_with_mapping("input").as_dict()
+
+    stdout = io.StringIO()
+    run("tn", ["--output", "jsonl", "--nbest", "2", "--jobs", "2"],
+        stdin=io.StringIO("input\n\n"),
+        stdout=stdout,
+        processor_factory=lambda _direction, _args: processor)
+    records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [[record["output"] for record in line] for line in records] == [["FIRST", "SECOND"], [""]]
+    assert records[0][1]["mappings"][0]["output"]["text"] == "SECOND"
+
+
+def test_nbest_requires_jsonl_output(capsys):
+    with pytest.raises(SystemExit):
+        run("tn", ["--nbest", "2", "--text", "a"], processor_factory=lambda _direction, _args: FakeProcessor())
+
+    assert "--nbest requires --output jsonl" in capsys.readouterr().err
+
+
 def test_stdin_removes_only_line_endings():
     processor = FakeProcessor()
     stdout = io.StringIO()
@@ -170,6 +222,122 @@ def test_file_input_preserves_spaces(tmp_path):
     assert processor.tag_calls == ["  first  ", " second "]
 
 
+def test_jobs_keep_input_order_across_chunks(tmp_path):
+    processor = LetterProcessor(tmp_path)
+    lines = ["abc"[index % 3] if index % 7 else "c" for index in range(1000)]
+
+    stdout = io.StringIO()
+    run("tn", ["--jobs", "3"],
+        stdin=io.StringIO("\n".join(lines) + "\r\n"),
+        stdout=stdout,
+        processor_factory=lambda _direction, _args: processor)
+
+    expected = io.StringIO()
+    run("tn", [], stdin=io.StringIO("\n".join(lines)), stdout=expected, processor_factory=lambda _direction, _args: processor)
+    assert stdout.getvalue() == expected.getvalue()
+    assert stdout.getvalue().splitlines()[1::2] == [line.upper() for line in lines]
+
+
+@pytest.mark.parametrize("jobs", ["0", "-1", "two"])
+def test_invalid_jobs_are_rejected(jobs):
+    with pytest.raises(SystemExit):
+        parse_args("tn", ["--jobs", jobs])
+
+
 def test_text_and_file_are_mutually_exclusive():
     with pytest.raises(SystemExit):
         parse_args("tn", ["--text", "a", "--file", "input.txt"])
+
+
+def test_cache_verify_reports_each_bundle(tmp_path):
+    stdout = io.StringIO()
+    cache = tmp_path / "cache"
+    bundle = cache / "zh_tn" / "config" / "bundle"
+    bundle.mkdir(parents=True)
+    (bundle / "manifest.json").write_text("{", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as exit_info:
+        run("tn", ["cache", "verify", "--cache-dir", str(cache)], stdout=stdout)
+
+    assert exit_info.value.code == 1
+    assert stdout.getvalue() == "corrupt\t{}\n".format(bundle.resolve())
+
+
+def test_cache_list_stats_and_purge(tmp_path):
+    if os.name == "nt":
+        pytest.skip("Windows intentionally leaves cache entries untouched")
+    bundle = CountingProcessor(tmp_path).cache_bundles[0]
+    size = sum(path.stat().st_size for path in bundle.path.iterdir())
+
+    stdout = io.StringIO()
+    run("tn", ["cache", "list", "--cache-dir", str(tmp_path)], stdout=stdout)
+    kind, listed_size, _, path = stdout.getvalue().rstrip("\n").split("\t")
+    assert (kind, int(listed_size), path) == ("bundle", size, str(bundle.path))
+
+    stdout = io.StringIO()
+    run("tn", ["cache", "stats", "--cache-dir", str(tmp_path)], stdout=stdout)
+    assert stdout.getvalue().splitlines() == [
+        "bundle\t1\t{}".format(size),
+        "residual\t0\t0",
+        "rule\t0\t0",
+        "total\t1\t{}".format(size),
+    ]
+
+    stdout = io.StringIO()
+    run("tn", ["cache", "gc", "--max-age", "30d", "--cache-dir", str(tmp_path)], stdout=stdout)
+    assert stdout.getvalue() == ""
+
+    stdout = io.StringIO()
+    run("tn", ["cache", "purge", "--cache-dir", str(tmp_path)], stdout=stdout)
+    assert stdout.getvalue() == "removed\t{}\n".format(bundle.path)
+    assert not bundle.path.exists()
+
+
+@pytest.mark.parametrize("argv", [["gc"], ["gc", "--max-size", "lots"], ["gc", "--max-age", "soon"]])
+def test_cache_gc_requires_valid_limits(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run("tn", ["cache"] + argv)
+
+    assert exit_info.value.code == 2
+
+
+def test_cache_export_and_import_start_a_node_warm(tmp_path):
+
+    def counting_factory(direction, args):
+        assert (direction, args.language) == ("tn", "zh") and args.remove_erhua is False
+        return CountingProcessor(args.cache_dir)
+
+    archive = tmp_path / "bundle.tar"
+    stdout = io.StringIO()
+    argv = ["cache", "export", "--language", "zh", "--direction", "tn", "--no-remove-erhua"]
+    run("tn",
+        argv + ["-o", str(archive), "--cache-dir", str(tmp_path / "ci")],
+        stdout=stdout,
+        processor_factory=counting_factory)
+    status, exported = stdout.getvalue().rstrip("\n").split("\t")
+    assert status == "exported"
+
+    stdout = io.StringIO()
+    run("tn", ["cache", "import", str(archive), "--cache-dir", str(tmp_path / "node")], stdout=stdout)
+    status, installed = stdout.getvalue().rstrip("\n").split("\t")
+    assert status == "installed"
+    assert os.path.relpath(installed, tmp_path / "node") == os.path.relpath(exported, tmp_path / "ci")
+
+
+def test_cache_import_reports_a_missing_archive(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run("tn", ["cache", "import", str(tmp_path / "missing.tar"), "--cache-dir", str(tmp_path)])
+
+    assert exit_info.value.code == 2
+    assert "missing.tar" in capsys.readouterr().err
+
+
+def test_cache_export_runtime_writes_graphs_and_schema(tmp_path):
+    stdout = io.StringIO()
+    argv = ["cache", "export-runtime", "-o", str(tmp_path / "runtime"), "--cache-dir", str(tmp_path)]
+    run("tn", argv, stdout=stdout, processor_factory=lambda direction, args: CountingProcessor(args.cache_dir))
+
+    assert stdout.getvalue().splitlines() == [
+        "exported\t{}".format(tmp_path / "runtime" / name)
+        for name in ("zh_tn_tagger.fst", "zh_tn_verbalizer.fst", "zh_tn_token_orders.tsv")
+    ]
@@ -0,0 +1,64 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tn.result_cache import CacheStats, LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == CacheStats(hits=3, misses=1, evictions=1, size=2, maxsize=2)
+
+
+def test_clear_resets_entries_and_counters():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.get("a")
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.stats() == CacheStats(0, 0, 0, 0, 2)
+
+
+def test_pickled_cache_keeps_only_its_bound():
+    cache = LRUCache(3)
+    cache.put("a", 1)
+
+    restored = pickle.loads(pickle.dumps(cache))
+
+    assert restored.maxsize == 3
+    assert restored.get("a") is None
+
+
+def test_concurrent_access_keeps_the_bound():
+    cache = LRUCache(16)
+
+    def worker(offset):
+        for index in range(500):
+            key = (offset + index) % 64
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(worker, range(8)))
+
+    stats = cache.stats()
+    assert stats.size == 16
+    assert stats.hits + stats.misses == 8 * 500
+
+
+@pytest.mark.parametrize("maxsize", [0, -1, 1.5, True, None])
+def test_maxsize_must_be_a_positive_integer(maxsize):
+    with pytest.raises(ValueError, match="positive integer"):
+        LRUCache(maxsize)
@@ -0,0 +1,112 @@
+import io
+import json
+import socket
+import threading
+
+import pytest
+
+from tn.cache import CacheIntegrityError
+from tn.chinese.test.processor_test import AmbiguousProcessor
+from tn.cli import run
+from tn.server import NormalizationClient, NormalizationServer, ServerError, parse_address
+from tn.test.cli_test import FakeProcessor
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(address, processor_factory):
+        server = NormalizationServer(address, processor_factory=processor_factory)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        thread.join()
+        server.close()
+
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:8765") == ("127.0.0.1", 8765)
+    assert parse_address("[::1]:80") == ("::1", 80)
+    assert parse_address("unix:/tmp/wetn.sock") == "/tmp/wetn.sock"
+    for address in ("8765", "localhost:", "localhost:99999", "unix:"):
+        with pytest.raises(ValueError):
+            parse_address(address)
+
+
+def test_cli_client_reuses_one_preloaded_processor_per_config(serve):
+    calls = []
+
+    def factory(direction, args):
+        calls.append((direction, args.language, args.remove_erhua))
+        return FakeProcessor()
+
+    server = serve("127.0.0.1:0", factory)
+    server.preload("tn", "zh")
+    for _ in range(2):
+        stdout = io.StringIO()
+        run("tn", ["--server", server.address, "--no-remove-erhua"], stdin=io.StringIO(" a \r\nb\n"), stdout=stdout)
+        assert stdout.getvalue() == "< a >\n[< a >]\n<b>\n[<b>]\n"
+
+    stdout = io.StringIO()
+    run("tn", ["--server", server.address, "--output", "normalized", "--text", "c"], stdout=stdout)
+    assert stdout.getvalue() == "[<c>]\n"
+    assert calls == [("tn", "zh", True), ("tn", "zh", False)]
+    assert [pipeline["options"]["remove_erhua"] for pipeline in server.pipelines()] == [True, False]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix-domain sockets")
+def test_unix_socket_serves_jsonl_and_replaces_a_stale_socket(serve, tmp_path):
+    path = tmp_path / "wetn.sock"
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    processor = AmbiguousProcessor(tmp_path / "cache")
+
+    server = serve("unix:{}".format(path), lambda _direction, _args: processor)
+    with NormalizationClient(server.address) as client:
+        outputs = client.normalize(["input", ""], output="jsonl", nbest=2)
+
+    records = [json.loads(output) for output in outputs]
+    assert records[0] == [result.as_dict() for result in processor.normalize_with_mapping("input", nbest=2)]
+    assert records[1] == [{"input": "", "output": "", "mappings": []}]
+    with pytest.raises(OSError):
+        NormalizationServer(server.address)
+
+
+def test_invalid_requests_are_rejected_without_closing_the_connection(serve):
+    server = serve("127.0.0.1:0", lambda _direction, _args: FakeProcessor())
+
+    with NormalizationClient(server.address) as client:
+        with pytest.raises(ServerError, match="unsupported en tn options: remove_erhua"):
+            client.normalize(["a"], language="en", options={"remove_erhua": False})
+        with pytest.raises(ServerError, match="nbest requires"):
+            client.normalize(["a"], nbest=2)
+        assert client.normalize(["a"], language="en") == ["[<a>]\n"]
+
+
+def test_pipeline_load_failures_are_reported_as_server_errors(serve):
+
+    def factory(_direction, args):
+        if args.language == "ja":
+            raise CacheIntegrityError("bundle manifest is corrupt")
+        return FakeProcessor()
+
+    server = serve("127.0.0.1:0", factory)
+    with NormalizationClient(server.address) as client:
+        with pytest.raises(ServerError, match="CacheIntegrityError: bundle manifest is corrupt"):
+            client.normalize(["a"], language="ja")
+        assert client.normalize(["a"]) == ["[<a>]\n"]
+
+
+def test_cli_client_reports_an_unreachable_server(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        run("tn", ["--server", "unix:{}".format(tmp_path / "missing.sock"), "--text", "a"])
+
+    assert exit_info.value.code == 2
+    assert "missing.sock" in capsys.readouterr().err
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
 import string
 from collections.abc import Mapping
 
@@ -39,6 +40,13 @@ ITN_ORDERS = {
 # Backward-compatible defaults for directly instantiated rules. Top-level
 # production pipelines pass their own schema mapping to ``TokenParser``.
 
+_KEY = re.compile(r"[A-Za-z_]*")
+# Well-formed headers and escape-free fields; anything else takes the
+# careful path, which also produces the error messages.
+_HEADER = re.compile(r" *([A-Za-z_]+) \{ ")
+_FIELD = re.compile(r' *([A-Za-z_]+): "([^"\\]*)"')
+_VALUE_SPECIAL = re.compile(r'["\\]')
+
 
 def escape_value(value):
     """Escapes a raw field value for the tagged-token wire format."""
@@ -51,6 +59,8 @@ class TokenParseError(ValueError):
 
 class Token:
 
+    __slots__ = ("name", "start", "end", "order", "members")
+
     def __init__(self, name, start=None):
         self.name = name
         self.start = start
@@ -93,6 +103,9 @@ class TokenParser:
             self.orders = EN_TN_ORDERS
         else:
             raise NotImplementedError()
+        self.tokens = []
+        self._reordered_input = None
+        self._reordered = None
 
     def load(self, input):
         if not input:
@@ -101,6 +114,7 @@ class TokenParser:
         self.text = input
         self.char = input[0]
         self.tokens = []
+        self._reordered_input = None
 
     def read(self):
         if self.index < len(self.text) - 1:
@@ -171,28 +185,94 @@ class TokenParser:
                 self.read()
         return value
 
+    def _expect(self, text, position, exp):
+        if not text.startswith(exp, position):
+            # Report the position where the expected literal should start,
+            # clamped to the last character like the character reader.
+            position = min(position, len(text) - 1)
+            raise TokenParseError('expected {!r} at position {}, got {!r}'.format(exp, position, text[position]))
+        return position + len(exp)
+
+    @staticmethod
+    def _scan_key(text, position):
+        if text[position] in string.whitespace:
+            raise TokenParseError("expected key at position {}".format(position))
+        end = _KEY.match(text, position).end()
+        if end == position:
+            raise TokenParseError("invalid key at position {}".format(position))
+        return text[position:end], end
+
+    @staticmethod
+    def _scan_value(text, position):
+        last = len(text) - 1
+        if position > last:
+            raise TokenParseError("expected value at end of token stream")
+        parts = []
+        while True:
+            match = _VALUE_SPECIAL.search(text, position)
+            if match is None:
+                raise TokenParseError("unterminated value at position {}".format(last))
+            special = match.start()
+            parts.append(text[position:special])
+            if text[special] == '"':
+                return "".join(parts), special
+            if special == last:
+                raise TokenParseError("unterminated escape at position {}".format(last))
+            escaped = text[special + 1]
+            parts.append(escaped if escaped in ('"', "\\") else "\\" + escaped)
+            position = special + 2
+
     def parse(self, input):
-        self.load(input)
-        while self.parse_ws():
-            token_start = self.index
-            name = self.parse_key()
-            self.expect_chars(" { ")
+        """Parses a token stream in one pass over ``str`` slices.
+
+        Errors and token offsets match the character reader used by
+        ``load()`` and the ``parse_*`` helpers.
+        """
+
+        if not input:
+            raise TokenParseError("token stream must not be empty")
+        self.text = input
+        self.tokens = []
+        self._reordered_input = None
+        length = len(input)
+        position = 0
+        while True:
+            while position < length and input[position] == " ":
+                position += 1
+            if position == length:
+                break
+            token_start = position
+            match = _HEADER.match(input, position)
+            if match is not None:
+                name, position = match.group(1), match.end()
+            else:
+                name, position = self._scan_key(input, position)
+                position = self._expect(input, position, " { ")
 
             token = Token(name, token_start)
             closed = False
-            while self.parse_ws():
-                if self.char == "}":
-                    self.parse_char("}")
+            while True:
+                match = _FIELD.match(input, position)
+                if match is not None:
+                    token.append(match.group(1), match.group(2))
+                    position = match.end()
+                    continue
+                while position < length and input[position] == " ":
+                    position += 1
+                if position == length:
+                    break
+                if input[position] == "}":
+                    position += 1
                     closed = True
                     break
-                key = self.parse_key()
-                self.expect_chars(': "')
-                value = self.parse_value()
-                self.expect_chars('"')
+                key, position = self._scan_key(input, position)
+                position = self._expect(input, position, ': "')
+                value, position = self._scan_value(input, position)
                 token.append(key, value)
+                position += 1
             if not closed:
                 raise TokenParseError("unterminated token {!r}".format(name))
-            token.end = len(self.text) if self.char == EOS else self.index
+            token.end = position
             self.tokens.append(token)
 
     def reorder(self, input):
@@ -200,8 +280,14 @@ class TokenParser:
         return output
 
     def reorder_with_spans(self, input):
-        """Returns reordered text and each token's span in that text."""
+        """Returns reordered text and each token's span in that text.
+
+        Repeated calls with the same input reuse the parsed tokens, so one
+        parser can be shared by the reorder and mapping stages.
+        """
 
+        if self._reordered_input is not None and input == self._reordered_input:
+            return self._reordered
         self.parse(input)
         serialized = []
         spans = []
@@ -214,4 +300,6 @@ class TokenParser:
             offset += len(value)
             spans.append((start, offset))
             serialized.append(value)
-        return " ".join(serialized), tuple(spans)
+        self._reordered_input = input
+        self._reordered = " ".join(serialized), tuple(spans)
+        return self._reordered
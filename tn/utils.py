@@ -18,6 +18,8 @@ import os
 
 import pynini
 
+from tn.rule_cache import record_data_file
+
 
 def get_abs_path(rel_path):
     """
@@ -28,7 +30,9 @@ def get_abs_path(rel_path):
 
     Returns absolute path
     """
-    return os.path.dirname(os.path.abspath(__file__)) + "/" + rel_path
+    path = os.path.dirname(os.path.abspath(__file__)) + "/" + rel_path
+    record_data_file(path)
+    return path
 
 
 def load_labels(abs_path):